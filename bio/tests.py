@@ -1,10 +1,17 @@
+import gzip
 from unittest.mock import patch
 
 from django.test import TestCase
 from django.urls import reverse
 
+from . import views
+
 
 class BioViewTests(TestCase):
+    def setUp(self) -> None:
+        # The landing page is rendered once per process; start each test from scratch.
+        views._landing_page = None
+
     def test_root_url_returns_200_and_uses_bio_template(self) -> None:
         response = self.client.get("/")
         self.assertEqual(response.status_code, 200)
@@ -37,3 +44,14 @@ class BioViewTests(TestCase):
         with patch("bio.views.BIO_MARKDOWN_PATH", "bio/does_not_exist.md"):
             response = self.client.get("/")
         self.assertEqual(response.status_code, 404)
+
+    def test_landing_page_is_served_compressed_with_strong_etag(self) -> None:
+        response = self.client.get("/", headers={"accept-encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b"Get in touch", gzip.decompress(response.content))
+        self.assertFalse(response["ETag"].startswith("W/"))
+
+    def test_landing_page_revalidates_with_304(self) -> None:
+        etag = self.client.get("/")["ETag"]
+        response = self.client.get("/", headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
@@ -1,25 +1,33 @@
 import os
 
-import markdown2
 from django.conf import settings
 from django.http import Http404, HttpRequest, HttpResponse
-from django.shortcuts import render
-from django.utils.safestring import mark_safe
+from django.template.loader import render_to_string
+
+from content_store.markdown_store import render_markdown_file
+from content_store.precompressed import PrecompressedPage, precompressed_response
 
 # Constants
 BIO_MARKDOWN_PATH = "bio/bio.md"
 
+# The landing page doesn't depend on the visitor, so it is rendered and compressed once per version of the bio.
+_landing_page: tuple[str, PrecompressedPage] | None = None
+
 
 def bio(request: HttpRequest) -> HttpResponse:
     """Renders the bio markdown file as the site's landing page."""
-    path_to_bio = os.path.join(settings.BASE_DIR, BIO_MARKDOWN_PATH)
-    try:
-        with open(path_to_bio, encoding="utf-8") as bio_file:
-            bio_as_markdown = bio_file.read()
-    except IOError as exc:
-        raise Http404("Bio content not found.") from exc
+    global _landing_page
+    bio_as_html = render_markdown_file(
+        os.path.join(settings.BASE_DIR, BIO_MARKDOWN_PATH)
+    )
+    if bio_as_html is None:
+        raise Http404("Bio content not found.")
 
-    bio_as_html = markdown2.markdown(bio_as_markdown)
-    # Safe to render as HTML because I write the markdown myself.
-    context = {"bio_html": mark_safe(bio_as_html)}
-    return render(request, "bio/bio.html", context)
+    if _landing_page is None or _landing_page[0] != bio_as_html:
+        # Safe to render as HTML because I write the markdown myself.
+        page = render_to_string("bio/bio.html", {"bio_html": bio_as_html})
+        _landing_page = (
+            bio_as_html,
+            PrecompressedPage.build(page.encode("utf-8"), "text/html; charset=utf-8"),
+        )
+    return precompressed_response(request, _landing_page[1])
@@ -0,0 +1,5 @@
+from django.apps import AppConfig
+
+
+class ContentStoreConfig(AppConfig):
+    name = "content_store"
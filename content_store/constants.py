@@ -0,0 +1,11 @@
+# Rendered HTML is cached here (not checked in), one file per markdown source hash, so every worker and every restart
+# reuses a render instead of redoing it.
+RENDERED_MARKDOWN_DIR = "content_store/rendered/"
+
+# Precompressed bodies are built once per process, so it is worth compressing them as hard as possible.
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Content codings we precompress for, in the order we prefer them when a client accepts several.
+ENCODING_BROTLI = "br"
+ENCODING_GZIP = "gzip"
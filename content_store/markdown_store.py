@@ -0,0 +1,96 @@
+"""
+Markdown files rendered to HTML once, rather than on every request that displays them.
+
+render_markdown_file() keeps the HTML of each file in a process-level cache, keyed by the file's size and mtime, so a
+cache hit costs one stat() call. When the file has changed on disk, its contents are hashed: if the hash matches
+what was rendered before (the file was only touched), nothing is re-rendered. Otherwise the rendered HTML is looked up
+in a file-backed cache under RENDERED_MARKDOWN_DIR, keyed by the source hash, so the other gunicorn workers and the
+next restart reuse the render too. Only a source nobody has rendered yet goes through markdown2.
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+
+import markdown2
+from django.conf import settings
+from django.utils.safestring import SafeString, mark_safe
+
+from .constants import RENDERED_MARKDOWN_DIR
+
+
+@dataclass(frozen=True)
+class RenderedMarkdown:
+    """The HTML of a markdown file, and which version of the file it was rendered from."""
+
+    # (size, mtime) of the file when it was last checked
+    stat_key: tuple[int, int]
+    source_hash: str
+    html: SafeString
+
+
+_lock = threading.Lock()
+_rendered: dict[str, RenderedMarkdown] = {}
+
+
+def rendered_path(source_hash: str) -> str:
+    """Returns where the HTML rendered from a source with this hash is cached on disk."""
+    # An upgrade of markdown2 can change its output, so its version is part of the key.
+    key = hashlib.sha256(f"{markdown2.__version__}:{source_hash}".encode()).hexdigest()
+    return os.path.join(settings.BASE_DIR, RENDERED_MARKDOWN_DIR, key + ".html")
+
+
+def render_source(source: bytes, source_hash: str) -> str:
+    """Returns the HTML of a markdown source, from the file-backed cache if anyone has rendered it before."""
+    path = rendered_path(source_hash)
+    try:
+        with open(path, encoding="utf-8") as cached_file:
+            return cached_file.read()
+    except IOError:
+        pass
+
+    html = markdown2.markdown(source.decode("utf-8"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Several workers can render the same file at once; each writes its own temporary file and the last rename wins.
+    temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as cached_file:
+        cached_file.write(html)
+    os.replace(temporary_path, path)
+    return html
+
+
+def render_markdown_file(path: str) -> SafeString | None:
+    """Returns the file at path rendered from markdown to HTML and marked safe, or None if it doesn't exist.
+
+    Only use this for markdown I write myself, since the HTML isn't escaped."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    stat_key = (stat.st_size, stat.st_mtime_ns)
+    cached = _rendered.get(path)
+    if cached is not None and cached.stat_key == stat_key:
+        return cached.html
+
+    with _lock:
+        try:
+            with open(path, "rb") as source_file:
+                source = source_file.read()
+        except IOError:
+            return None
+        source_hash = hashlib.sha256(source).hexdigest()
+        cached = _rendered.get(path)
+        if cached is not None and cached.source_hash == source_hash:
+            html = cached.html
+        else:
+            html = mark_safe(render_source(source, source_hash))
+        _rendered[path] = RenderedMarkdown(stat_key, source_hash, html)
+        return html
+
+
+def clear_process_cache() -> None:
+    """Forgets every render held in memory; the file-backed cache is kept."""
+    with _lock:
+        _rendered.clear()
@@ -0,0 +1,92 @@
+"""
+Responses for pages whose body is identical for every visitor, compressed once instead of on every request.
+
+A PrecompressedPage holds the body as-is, gzipped and brotli-compressed, plus a strong ETag for each. Each coding gets
+its own ETag because they are different byte sequences, which a strong validator has to tell apart.
+precompressed_response() picks the best coding the client accepts and answers If-None-Match with a 304 without sending
+a body.
+"""
+
+import gzip
+import hashlib
+from dataclasses import dataclass
+
+import brotli
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+
+from .constants import BROTLI_QUALITY, ENCODING_BROTLI, ENCODING_GZIP, GZIP_LEVEL
+
+# Preferred first
+SUPPORTED_ENCODINGS = (ENCODING_BROTLI, ENCODING_GZIP)
+
+
+@dataclass(frozen=True)
+class PrecompressedPage:
+    """A response body in every content coding we serve, keyed by coding ("" is no coding)."""
+
+    content_type: str
+    bodies: dict[str, bytes]
+    etags: dict[str, str]
+
+    @classmethod
+    def build(cls, body: bytes, content_type: str) -> "PrecompressedPage":
+        """Compresses a body in every supported coding."""
+        bodies = {
+            "": body,
+            # mtime=0 keeps the gzip output (and so its ETag) the same every time the page is built.
+            ENCODING_GZIP: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+            ENCODING_BROTLI: brotli.compress(body, quality=BROTLI_QUALITY),
+        }
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        etags = {
+            encoding: quote_etag(f"{digest}-{encoding}" if encoding else digest)
+            for encoding in bodies
+        }
+        return cls(content_type=content_type, bodies=bodies, etags=etags)
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Returns the content codings an Accept-Encoding header allows, ignoring any with q=0."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        name, _, value = parameters.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(SUPPORTED_ENCODINGS)
+    return accepted
+
+
+def choose_encoding(request: HttpRequest) -> str:
+    """Returns the preferred coding the client accepts, or "" to send the body uncompressed."""
+    accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in accepted:
+            return encoding
+    return ""
+
+
+def precompressed_response(
+    request: HttpRequest, page: PrecompressedPage
+) -> HttpResponse:
+    """Serves a precompressed page in the best coding the client accepts, or a 304 if it already has that version."""
+    encoding = choose_encoding(request)
+    etag = page.etags[encoding]
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(page.bodies[encoding], content_type=page.content_type)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.headers["ETag"] = etag
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
@@ -0,0 +1,122 @@
+import gzip
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import brotli
+import markdown2
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .markdown_store import clear_process_cache, render_markdown_file
+from .precompressed import (
+    PrecompressedPage,
+    accepted_encodings,
+    precompressed_response,
+)
+
+
+class MarkdownStoreTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        settings_override = override_settings(BASE_DIR=self.base_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        clear_process_cache()
+        self.addCleanup(clear_process_cache)
+
+        self.path = os.path.join(self.base_dir, "page.md")
+        self.write("**Bold**")
+        render_patch = patch(
+            "content_store.markdown_store.markdown2.markdown",
+            wraps=markdown2.markdown,
+        )
+        self.render = render_patch.start()
+        self.addCleanup(render_patch.stop)
+
+    def write(self, text: str, mtime_ns: int = 1_000_000_000) -> None:
+        with open(self.path, "w", encoding="utf-8") as markdown_file:
+            markdown_file.write(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_renders_markdown(self) -> None:
+        self.assertIn("<strong>Bold</strong>", render_markdown_file(self.path))
+
+    def test_missing_file_returns_none(self) -> None:
+        self.assertIsNone(render_markdown_file(os.path.join(self.base_dir, "nope.md")))
+
+    def test_unchanged_file_is_rendered_once(self) -> None:
+        first = render_markdown_file(self.path)
+        self.assertIs(render_markdown_file(self.path), first)
+        self.assertEqual(self.render.call_count, 1)
+
+    def test_edited_file_is_rendered_again(self) -> None:
+        render_markdown_file(self.path)
+        self.write("*Italic*", mtime_ns=2_000_000_000)
+        self.assertIn("<em>Italic</em>", render_markdown_file(self.path))
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_touched_file_is_not_rendered_again(self) -> None:
+        render_markdown_file(self.path)
+        os.utime(self.path, ns=(2_000_000_000, 2_000_000_000))
+        self.assertIn("<strong>Bold</strong>", render_markdown_file(self.path))
+        self.assertEqual(self.render.call_count, 1)
+
+    def test_new_process_reuses_the_file_cache(self) -> None:
+        render_markdown_file(self.path)
+        # What a restarted (or another) worker sees: an empty process cache.
+        clear_process_cache()
+        self.assertIn("<strong>Bold</strong>", render_markdown_file(self.path))
+        self.assertEqual(self.render.call_count, 1)
+
+
+class PrecompressedResponseTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.body = b"<p>Hello, world!</p>" * 100
+        self.page = PrecompressedPage.build(self.body, "text/html; charset=utf-8")
+
+    def get(self, **headers: str) -> HttpResponse:
+        request = RequestFactory().get("/", headers=headers)
+        return precompressed_response(request, self.page)
+
+    def test_prefers_brotli(self) -> None:
+        response = self.get(accept_encoding="gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), self.body)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_gzip(self) -> None:
+        response = self.get(accept_encoding="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_uncompressed_without_accept_encoding(self) -> None:
+        response = self.get()
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.body)
+
+    def test_each_coding_has_its_own_strong_etag(self) -> None:
+        etags = [
+            self.get(accept_encoding=coding)["ETag"] for coding in ("br", "gzip", "")
+        ]
+        self.assertEqual(len(set(etags)), 3)
+        self.assertFalse(any(etag.startswith("W/") for etag in etags))
+
+    def test_matching_etag_is_not_modified(self) -> None:
+        etag = self.get(accept_encoding="br")["ETag"]
+        response = self.get(accept_encoding="br", if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        # A client switching codings gets the full body.
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+    def test_build_is_deterministic(self) -> None:
+        rebuilt = PrecompressedPage.build(self.body, "text/html; charset=utf-8")
+        self.assertEqual(rebuilt.etags, self.page.etags)
+
+    def test_accepted_encodings(self) -> None:
+        self.assertEqual(accepted_encodings("gzip;q=0.5, br;q=0"), {"gzip"})
+        self.assertEqual(accepted_encodings("*"), {"*", "br", "gzip"})
+        self.assertEqual(accepted_encodings(""), set())
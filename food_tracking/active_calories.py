@@ -0,0 +1,74 @@
+"""
+Active (Move ring) calories for each day, logged or estimated.
+
+Users don't log active calories every day, so a day without an entry is
+estimated from the days logged before it. The home page asks for one day and
+the trends page for a whole span; both go through get_active_calories_for_range
+so the estimation rules live in one place.
+"""
+
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+
+from food_tracking.constants import (
+    ACTIVE_CALORIES_WINDOW_DAYS,
+    DEFAULT_ACTIVE_CALORIES_ESTIMATE,
+    MIN_LOGGED_DAYS_FOR_ESTIMATE,
+)
+from food_tracking.models import DailyActiveCalories
+
+
+def get_active_calories_for_range(
+    user: User, start: date, end: date
+) -> dict[date, tuple[int, bool]]:
+    """Return the user's active (Move ring) calories for each day from start to end.
+
+    A day with a logged entry gets it. Otherwise it's estimated from the
+    average of logged days in the prior ACTIVE_CALORIES_WINDOW_DAYS (logged days
+    only — unlogged days are ignored rather than counted as zero). Until there
+    are at least MIN_LOGGED_DAYS_FOR_ESTIMATE logged days the sample is too thin
+    to trust, so we fall back to DEFAULT_ACTIVE_CALORIES_ESTIMATE.
+
+    The logged days the range needs are read in one query, and a window
+    sliding over them keeps the sum and count of the logged days before each
+    day, so the cost doesn't grow per day.
+
+    Returns a dict of day -> (value, is_estimate) tuples.
+    """
+    window_start = start - timedelta(days=ACTIVE_CALORIES_WINDOW_DAYS)
+    logged = dict(
+        DailyActiveCalories.objects.filter(
+            user=user, date__gte=window_start, date__lte=end
+        ).values_list("date", "active_calories")
+    )
+
+    result: dict[date, tuple[int, bool]] = {}
+    window_total = window_count = 0
+    for offset in range((end - window_start).days + 1):
+        day = window_start + timedelta(days=offset)
+        if day >= start:
+            if day in logged:
+                result[day] = logged[day], False
+            elif window_count < MIN_LOGGED_DAYS_FOR_ESTIMATE:
+                result[day] = DEFAULT_ACTIVE_CALORIES_ESTIMATE, True
+            else:
+                result[day] = round(window_total / window_count), True
+        # Slide the window on to the next day: this day joins it, and the day
+        # ACTIVE_CALORIES_WINDOW_DAYS before it leaves.
+        if day in logged:
+            window_total += logged[day]
+            window_count += 1
+        leaving = day - timedelta(days=ACTIVE_CALORIES_WINDOW_DAYS)
+        if leaving in logged:
+            window_total -= logged[leaving]
+            window_count -= 1
+    return result
+
+
+def get_active_calories_for_date(user: User, day: date) -> tuple[int, bool]:
+    """Return the user's active calories for a day (see get_active_calories_for_range).
+
+    Returns a (value, is_estimate) tuple.
+    """
+    return get_active_calories_for_range(user, day, day)[day]
@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from food_tracking.models import CalorieTarget, Consumption, DailyActiveCalories, Food
+from food_tracking.models import (
+    CalorieTarget,
+    Consumption,
+    DailyActiveCalories,
+    DailySummary,
+    EstimateJob,
+    Food,
+    LibraryFood,
+)
 
 
 @admin.register(CalorieTarget)
@@ -17,6 +25,16 @@ class DailyActiveCaloriesAdmin(admin.ModelAdmin):
     date_hierarchy = "date"
 
 
+@admin.register(DailySummary)
+class DailySummaryAdmin(admin.ModelAdmin):
+    list_display = ["user", "date", "total_calories", "updated_at"]
+    list_filter = ["user"]
+    search_fields = ["user__username"]
+    date_hierarchy = "date"
+    # Recomputed from the day's entries; see food_tracking.daily_summaries.
+    readonly_fields = ["total_calories", "food_quantities"]
+
+
 @admin.register(Food)
 class FoodAdmin(admin.ModelAdmin):
     list_display = [
@@ -52,3 +70,42 @@ class ConsumptionAdmin(admin.ModelAdmin):
         return f"{obj.total_calories():.2f}"
 
     total_calories.short_description = "Total Calories"  # type: ignore
+
+
+@admin.register(EstimateJob)
+class EstimateJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "user",
+        "kind",
+        "status",
+        "created_at",
+        "finished_at",
+        "cache_read_tokens",
+        "error",
+    ]
+    list_filter = ["status", "kind"]
+    search_fields = ["user__username"]
+    date_hierarchy = "created_at"
+    # The photo is raw bytes, which the admin can't usefully display or edit.
+    exclude = ["image"]
+
+    def cache_read_tokens(self, obj: EstimateJob) -> int | None:
+        """Display the prompt tokens the model call read from the prompt cache."""
+        return (obj.usage or {}).get("cache_read_input_tokens")
+
+    cache_read_tokens.short_description = "Cache Read Tokens"  # type: ignore
+
+
+@admin.register(LibraryFood)
+class LibraryFoodAdmin(admin.ModelAdmin):
+    list_display = [
+        "user",
+        "description",
+        "calories",
+        "times_logged",
+        "last_logged_at",
+    ]
+    list_filter = ["user"]
+    search_fields = ["user__username", "description"]
+    # Kept up to date from the user's entries; see food_tracking.food_library.
+    readonly_fields = ["key", "times_logged", "last_logged_at"]
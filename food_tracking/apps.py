@@ -5,3 +5,7 @@ class FoodTrackingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "food_tracking"
     verbose_name = "Food Tracking"
+
+    def ready(self) -> None:
+        # Connects the signal handlers.
+        from . import signals  # noqa: F401
@@ -0,0 +1,48 @@
+"""
+The tags that cached food tracking pages carry, so food_tracking.signals can invalidate exactly the ones a change
+affects.
+
+A day's page depends on that day's consumption (its day tag), the user's target and deficit (their user tag), the
+shared food grid, the user's food library, and the active calories logged over the days before it, which feed the
+estimate for an unlogged day. A user's trends span too many days for day tags, so they carry one tag of their own
+that any change to the user's entries or active calories invalidates.
+"""
+
+from datetime import date, timedelta
+
+from food_tracking.constants import (
+    ACTIVE_CALORIES_WINDOW_DAYS,
+    FOOD_DAY_CACHE_TAG,
+    FOOD_LIBRARY_CACHE_TAG,
+    FOOD_TRENDS_CACHE_TAG,
+    FOOD_USER_CACHE_TAG,
+    FOODS_CACHE_TAG,
+)
+
+
+def day_tag(user_id: int, day: date) -> str:
+    """Returns the tag of everything showing a user's consumption on a Pacific day."""
+    return FOOD_DAY_CACHE_TAG.format(user_id=user_id, day=day.isoformat())
+
+
+def user_tag(user_id: int) -> str:
+    """Returns the tag of everything showing a user's settings."""
+    return FOOD_USER_CACHE_TAG.format(user_id=user_id)
+
+
+def library_tag(user_id: int) -> str:
+    """Returns the tag of everything showing a user's food library."""
+    return FOOD_LIBRARY_CACHE_TAG.format(user_id=user_id)
+
+
+def trends_tag(user_id: int) -> str:
+    """Returns the tag of a user's trends, which change with any of their entries or active calories."""
+    return FOOD_TRENDS_CACHE_TAG.format(user_id=user_id)
+
+
+def active_calories_tags(user_id: int, day: date) -> list[str]:
+    """Returns the tags of the days whose active calories are, or are estimated from, a day's logged value."""
+    return [
+        day_tag(user_id, day + timedelta(days=offset))
+        for offset in range(ACTIVE_CALORIES_WINDOW_DAYS + 1)
+    ]
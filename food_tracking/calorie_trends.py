@@ -0,0 +1,134 @@
+"""
+Calorie trends over a span of days: rolling averages, how often the day's budget was kept, and which weekdays the
+user eats most on.
+
+The daily series is read with one query from DailySummary, and every statistic is computed on NumPy arrays holding
+one element per day. Days with nothing logged are NaN, so they're left out of averages rather than counted as zero.
+Rolling windows are differences of cumulative sums, so a year of history costs a handful of array operations rather
+than a loop over days. Each day's budget uses the active calories from
+food_tracking.active_calories.get_active_calories_for_range, which reads the span in one more query.
+
+Results are cached per user, Pacific day and span until the user's entries, active calories or target change (see
+cache_tags.trends_tag).
+"""
+
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+from django.contrib.auth.models import User
+
+from food_tracking import cache_tags
+from food_tracking.active_calories import get_active_calories_for_range
+from food_tracking.constants import TRENDS_LONG_WINDOW_DAYS, TRENDS_SHORT_WINDOW_DAYS
+from food_tracking.models import CalorieTarget, DailySummary
+from tagged_cache.cache import get_or_set
+
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def daily_values(
+    rows: list[tuple[date, Any]], start: date, num_days: int
+) -> np.ndarray:
+    """Spread (day, value) rows over an array of num_days days from start, NaN where a day has no row."""
+    values = np.full(num_days, np.nan)
+    if rows:
+        days, day_values = zip(*rows)
+        offsets = np.array([(day - start).days for day in days])
+        values[offsets] = np.array(day_values, dtype=float)
+    return values
+
+
+def window_totals(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the sum and count of the non-NaN values in each day's trailing window.
+
+    The window is the day and the window - 1 days before it.
+    """
+    logged = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(logged, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(logged)))
+    ends = np.arange(len(values)) + 1
+    starts = np.maximum(ends - window, 0)
+    return sums[ends] - sums[starts], counts[ends] - counts[starts]
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Average of the logged values in each day's trailing window, NaN where there are none."""
+    sums, counts = window_totals(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def as_list(values: np.ndarray) -> list[float | None]:
+    """Convert an array to a JSON-friendly list, NaN becoming None."""
+    return [None if np.isnan(value) else round(float(value), 1) for value in values]
+
+
+def compute_trends(
+    user: User, target: CalorieTarget, end: date, num_days: int
+) -> dict[str, Any]:
+    """Compute the user's trends over the num_days days ending with end."""
+    start = end - timedelta(days=num_days - 1)
+    # Earlier days feed the first days' rolling averages, so they're read too
+    # and trimmed off at the end.
+    history_start = start - timedelta(days=TRENDS_LONG_WINDOW_DAYS - 1)
+    history_days = (end - history_start).days + 1
+    shown = slice(history_days - num_days, None)
+
+    calories = daily_values(
+        list(
+            DailySummary.objects.filter(
+                user=user, date__gte=history_start, date__lte=end
+            ).values_list("date", "total_calories")
+        ),
+        history_start,
+        history_days,
+    )
+    active_by_day = get_active_calories_for_range(user, start, end)
+    active = np.array(
+        [active_by_day[start + timedelta(days=i)][0] for i in range(num_days)],
+        dtype=float,
+    )
+    budget = target.daily_calorie_target + active - target.goal_deficit
+    short_average = rolling_mean(calories, TRENDS_SHORT_WINDOW_DAYS)
+    long_average = rolling_mean(calories, TRENDS_LONG_WINDOW_DAYS)
+
+    calories = calories[shown]
+    logged = ~np.isnan(calories)
+    balance = budget[logged] - calories[logged]
+    weekdays = (start.weekday() + np.arange(num_days)) % 7
+    weekday_totals = np.bincount(
+        weekdays[logged], weights=calories[logged], minlength=7
+    )
+    weekday_counts = np.bincount(weekdays[logged], minlength=7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weekday_averages = weekday_totals / weekday_counts
+
+    return {
+        "days": [(start + timedelta(days=i)).isoformat() for i in range(num_days)],
+        "calories": as_list(calories),
+        "short_average": as_list(short_average[shown]),
+        "long_average": as_list(long_average[shown]),
+        "budget": as_list(budget),
+        "logged_days": int(logged.sum()),
+        "days_within_budget": int((balance >= 0).sum()),
+        "within_budget_percent": (
+            round(float((balance >= 0).mean()) * 100, 1) if balance.size else None
+        ),
+        "average_balance": round(float(balance.mean()), 1) if balance.size else None,
+        "weekday_averages": [
+            {"weekday": name, "average": average}
+            for name, average in zip(WEEKDAY_NAMES, as_list(weekday_averages))
+        ],
+    }
+
+
+def get_trends(
+    user: User, target: CalorieTarget, end: date, num_days: int
+) -> dict[str, Any]:
+    """Return the user's trends over the num_days days ending with end, cached until their data changes."""
+    return get_or_set(
+        f"food:trends:{user.pk}:{end.isoformat()}:{num_days}",
+        [cache_tags.user_tag(user.pk), cache_tags.trends_tag(user.pk)],
+        lambda: compute_trends(user, target, end, num_days),
+    )
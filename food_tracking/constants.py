@@ -1,6 +1,15 @@
 # Grid and display constants
 DEFAULT_RECENT_CONSUMPTION_LIMIT = 10
 DEFAULT_REPORT_DAYS = 7
+# Entries per page of the reports page's detail table
+REPORT_DETAIL_PAGE_SIZE = 50
+
+# The consumption export streams rows fetched this many at a time, so memory
+# stays flat however much history is exported.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMATS = [EXPORT_FORMAT_CSV, EXPORT_FORMAT_NDJSON]
 
 # Number of prior days averaged to estimate active calories on an unlogged day
 ACTIVE_CALORIES_WINDOW_DAYS = 14
@@ -9,6 +18,73 @@ ACTIVE_CALORIES_WINDOW_DAYS = 14
 MIN_LOGGED_DAYS_FOR_ESTIMATE = 3
 DEFAULT_ACTIVE_CALORIES_ESTIMATE = 500
 
+# Tags for pages cached with tagged_cache (see food_tracking.cache_tags)
+FOOD_DAY_CACHE_TAG = "food:user:{user_id}:day:{day}"
+FOOD_USER_CACHE_TAG = "food:user:{user_id}"
+FOODS_CACHE_TAG = "food:foods"
+FOOD_LIBRARY_CACHE_TAG = "food:user:{user_id}:library"
+FOOD_TRENDS_CACHE_TAG = "food:user:{user_id}:trends"
+
+# The personal food library (see food_tracking.food_library): how many of the
+# user's most logged foods the home page offers, and how many matches a search
+# returns.
+FOOD_LIBRARY_HOME_LIMIT = 8
+FOOD_LIBRARY_SEARCH_LIMIT = 10
+# How closely a search must match part of a description to count. pg_trgm's
+# default of 0.6 misses a single typo in a short word ("otmeal").
+FOOD_LIBRARY_MIN_WORD_SIMILARITY = 0.4
+
+
+# Calorie estimates run as jobs processed by `manage.py run_estimate_worker`
+class EstimateJobKind:
+    """What an estimate job estimates from."""
+
+    TEXT = "text"
+    IMAGE = "image"
+    RECIPE = "recipe"
+
+
+class EstimateJobStatus:
+    """Lifecycle of an estimate job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+# A job not finished this long after it was submitted is reported as failed;
+# the client stops polling at the same point.
+ESTIMATE_JOB_DEADLINE_SECONDS = 120
+# How long the worker sleeps when the queue is empty.
+ESTIMATE_WORKER_IDLE_SECONDS = 1
+# How often an idle worker fails overdue jobs and deletes old jobs and
+# expired cached estimates.
+ESTIMATE_WORKER_HOUSEKEEPING_SECONDS = 10 * 60
+# Finished jobs (which may hold a photo) are deleted after this long.
+ESTIMATE_JOB_RETENTION_HOURS = 24
+ESTIMATE_JOB_TIMEOUT_ERROR = "The estimate took too long — please try again."
+ESTIMATE_JOB_UNEXPECTED_ERROR = "The estimate failed — please try again."
+
+# Estimates are cached per user, keyed by their normalized input (see
+# food_tracking.estimate_cache). Entries expire after the TTL, and each user
+# keeps only their most recently used entries.
+ESTIMATE_CACHE_TTL_DAYS = 30
+ESTIMATE_CACHE_MAX_ENTRIES_PER_USER = 200
+
+# Uploaded photos are downscaled to fit this many pixels on their longer side
+# and re-encoded at this JPEG quality before being sent to the model (see
+# food_tracking.image_preprocessing). Matches the resizing done in the browser.
+ESTIMATE_IMAGE_MAX_SIDE = 1024
+ESTIMATE_IMAGE_JPEG_QUALITY = 80
+
+# The trends page (see food_tracking.calorie_trends): how many days it can
+# cover, and the windows of its two rolling averages.
+TRENDS_DAY_OPTIONS = [28, 90, 365]
+TRENDS_DEFAULT_DAYS = 90
+TRENDS_SHORT_WINDOW_DAYS = 7
+TRENDS_LONG_WINDOW_DAYS = 28
+
 # Calorie aggregation periods
 PERIOD_DAY = "day"
 PERIOD_WEEK = "week"
@@ -0,0 +1,106 @@
+"""
+Keeps each user's DailySummary rows in step with their consumption.
+
+A day's summary is recomputed from that day's entries, in SQL, whenever one of
+them is logged, edited or deleted. food_tracking.signals calls refresh_day, and
+the views that log and delete entries wrap the write in a transaction so the
+entry and its summary are committed together. The summary row is locked while
+it's recomputed, so concurrent writes to the same day can't lose each other's
+entries. Writes that skip signals (bulk updates, raw SQL) leave summaries
+stale; `manage.py rebuild_daily_summaries` recomputes them all.
+"""
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet, Sum
+
+from food_tracking.dates import PACIFIC_TZ, get_pacific_day_bounds
+from food_tracking.models import CONSUMPTION_CALORIES, Consumption, DailySummary
+
+
+def summary_day(consumption: Consumption) -> date:
+    """Return the Pacific day a consumption counts towards."""
+    return consumption.consumed_at.astimezone(PACIFIC_TZ).date()
+
+
+def summarize(entries: QuerySet[Consumption]) -> tuple[Decimal, dict[str, str]]:
+    """Return the total calories of entries and the servings of each Food in them."""
+    rows = (
+        entries.order_by()
+        .values("food_id")
+        .annotate(servings=Sum("quantity"), food_calories=Sum(CONSUMPTION_CALORIES))
+    )
+    total = Decimal("0")
+    quantities = {}
+    for row in rows:
+        total += row["food_calories"]
+        if row["food_id"] is not None:
+            quantities[str(row["food_id"])] = str(row["servings"])
+    return total, quantities
+
+
+def refresh_day(user_id: int, day: date) -> None:
+    """Recompute a user's summary of a day from its entries."""
+    day_start, day_end = get_pacific_day_bounds(day)
+    entries = Consumption.objects.filter(
+        user_id=user_id, consumed_at__gte=day_start, consumed_at__lt=day_end
+    )
+    summaries = DailySummary.objects.select_for_update().filter(
+        user_id=user_id, date=day
+    )
+    with transaction.atomic():
+        # The entries are read after the summary is locked, so they include
+        # those of any other write to the day that got the lock first.
+        summary = summaries.first()
+        if not entries.exists():
+            if summary is not None:
+                summary.delete()
+            return
+        if summary is None:
+            summary, _ = summaries.get_or_create(user_id=user_id, date=day)
+        summary.total_calories, summary.food_quantities = summarize(entries)
+        summary.save()
+
+
+def rebuild_summaries(users: QuerySet[User] | None = None) -> int:
+    """Recompute the summaries of users (default everyone) from their consumption.
+
+    Returns the number of summaries built.
+    """
+    consumptions = Consumption.objects.select_related("food")
+    summaries = DailySummary.objects.all()
+    if users is not None:
+        consumptions = consumptions.filter(user__in=users)
+        summaries = summaries.filter(user__in=users)
+
+    totals: defaultdict[tuple[int, date], Decimal] = defaultdict(Decimal)
+    quantities: defaultdict[tuple[int, date], dict[int, Decimal]] = defaultdict(dict)
+    for consumption in consumptions.iterator(chunk_size=2000):
+        key = (consumption.user_id, summary_day(consumption))
+        totals[key] += consumption.total_calories()
+        if consumption.food_id is not None:
+            servings = quantities[key]
+            servings[consumption.food_id] = (
+                servings.get(consumption.food_id, Decimal("0")) + consumption.quantity
+            )
+
+    rebuilt = [
+        DailySummary(
+            user_id=user_id,
+            date=day,
+            total_calories=total,
+            food_quantities={
+                str(food_id): str(quantity)
+                for food_id, quantity in quantities[(user_id, day)].items()
+            },
+        )
+        for (user_id, day), total in totals.items()
+    ]
+    with transaction.atomic():
+        summaries.delete()
+        DailySummary.objects.bulk_create(rebuilt, batch_size=1000)
+    return len(rebuilt)
@@ -0,0 +1,30 @@
+"""
+Pacific-time calendar days, which every food tracking page, summary and cache
+tag is keyed on.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import pytz
+from django.utils import timezone
+
+# Use Pacific timezone for all date calculations
+PACIFIC_TZ = pytz.timezone("America/Los_Angeles")
+
+
+def get_pacific_today_start() -> datetime:
+    """Get the start of today (midnight) in Pacific timezone."""
+    now_pacific = timezone.now().astimezone(PACIFIC_TZ)
+    today_start_pacific = now_pacific.replace(hour=0, minute=0, second=0, microsecond=0)
+    return today_start_pacific
+
+
+def get_pacific_day_bounds(day: date) -> tuple[datetime, datetime]:
+    """Return the [start, end) datetimes of a Pacific calendar day.
+
+    Both bounds are localized midnights rather than start + 24h, so days that
+    contain a DST transition (23 or 25 hours long) keep correct boundaries.
+    """
+    start = PACIFIC_TZ.localize(datetime.combine(day, time.min))
+    end = PACIFIC_TZ.localize(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
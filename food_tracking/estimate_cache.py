@@ -0,0 +1,83 @@
+"""
+Per-user cache of calorie estimates, keyed by a hash of the normalized input.
+
+Typing the same breakfast as yesterday (give or take case and spacing), or
+re-sending the same photo, returns the earlier estimate without calling the
+model. The key also covers the model, the effort setting and
+estimation.PROMPT_VERSION, so changing any of them re-estimates everything.
+A refinement's key includes the previous estimate and the correction, so the
+same correction to the same estimate is reused and anything else misses.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from food_tracking import estimation
+from food_tracking.constants import (
+    ESTIMATE_CACHE_MAX_ENTRIES_PER_USER,
+    ESTIMATE_CACHE_TTL_DAYS,
+)
+from food_tracking.models import CachedEstimate
+from food_tracking.text import normalize_text
+
+
+def cache_key(kind: str, params: dict[str, Any], image: bytes | None = None) -> str:
+    """Return the cache key of an estimate job's input (see submit_job)."""
+    normalized: dict[str, Any] = {
+        "kind": kind,
+        "model": estimation.ESTIMATION_MODEL,
+        "effort": estimation.ESTIMATION_EFFORT,
+        "prompt_version": estimation.PROMPT_VERSION,
+    }
+    for name, value in params.items():
+        normalized[name] = normalize_text(value) if isinstance(value, str) else value
+    if image is not None:
+        normalized["image"] = hashlib.sha256(image).hexdigest()
+    # sort_keys makes the previous estimate of a refinement hash the same
+    # however the client ordered its fields.
+    encoded = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def get_cached_result(user: User, key: str) -> dict[str, Any] | None:
+    """Return the user's unexpired estimate for key, marking it recently used."""
+    cutoff = timezone.now() - timedelta(days=ESTIMATE_CACHE_TTL_DAYS)
+    entry = CachedEstimate.objects.filter(
+        user=user, key=key, created_at__gte=cutoff
+    ).first()
+    if entry is None:
+        return None
+    CachedEstimate.objects.filter(id=entry.id).update(last_used_at=timezone.now())
+    return entry.result
+
+
+def store_result(user_id: int, key: str, result: dict[str, Any]) -> None:
+    """Cache an estimate, evicting the user's least recently used entries over the cap."""
+    CachedEstimate.objects.update_or_create(
+        user_id=user_id,
+        key=key,
+        defaults={
+            "result": result,
+            "created_at": timezone.now(),
+            "last_used_at": timezone.now(),
+        },
+    )
+    stale_ids = list(
+        CachedEstimate.objects.filter(user_id=user_id)
+        .order_by("-last_used_at")
+        .values_list("id", flat=True)[ESTIMATE_CACHE_MAX_ENTRIES_PER_USER:]
+    )
+    if stale_ids:
+        CachedEstimate.objects.filter(id__in=stale_ids).delete()
+
+
+def delete_expired_entries() -> int:
+    """Delete entries past the TTL; returns how many."""
+    cutoff = timezone.now() - timedelta(days=ESTIMATE_CACHE_TTL_DAYS)
+    deleted, _ = CachedEstimate.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,178 @@
+"""
+A database-backed queue of calorie estimate jobs.
+
+The estimate views call submit_job() and return at once. `manage.py
+run_estimate_worker` claims jobs one at a time with SELECT ... FOR UPDATE SKIP
+LOCKED, so several workers can share the queue without running a job twice,
+and calls the model outside of any transaction. Clients poll the job until it
+is done, failed, or past its deadline. The model's response is streamed, and
+each breakdown item is saved on the job as soon as it's complete, so polling
+shows progress well before the estimate is finished. Inputs the user has had
+estimated before are answered from food_tracking.estimate_cache at submission,
+without a trip through the queue.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from food_tracking import estimate_cache, estimation
+from food_tracking.constants import (
+    ESTIMATE_JOB_DEADLINE_SECONDS,
+    ESTIMATE_JOB_RETENTION_HOURS,
+    ESTIMATE_JOB_TIMEOUT_ERROR,
+    ESTIMATE_JOB_UNEXPECTED_ERROR,
+    EstimateJobKind,
+    EstimateJobStatus,
+)
+from food_tracking.models import EstimateJob
+
+UNFINISHED_STATUSES = [EstimateJobStatus.PENDING, EstimateJobStatus.RUNNING]
+
+
+def submit_job(
+    user: User, kind: str, params: dict[str, Any], image: bytes | None = None
+) -> EstimateJob:
+    """Queue an estimate; params are passed to the estimation function for kind.
+
+    If the user has had the same input estimated before, the job is created
+    already done, with the cached estimate.
+    """
+    key = estimate_cache.cache_key(kind, params, image)
+    job = EstimateJob(
+        user=user,
+        kind=kind,
+        params=params,
+        cache_key=key,
+        deadline=timezone.now() + timedelta(seconds=ESTIMATE_JOB_DEADLINE_SECONDS),
+    )
+    cached = estimate_cache.get_cached_result(user, key)
+    if cached is None:
+        job.image = image
+    else:
+        job.status = EstimateJobStatus.DONE
+        job.result = cached
+        job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def expire_overdue_jobs(jobs: QuerySet[EstimateJob] | None = None) -> int:
+    """Fail every unfinished job (of jobs, default all) past its deadline; returns how many."""
+    if jobs is None:
+        jobs = EstimateJob.objects.all()
+    return jobs.filter(
+        status__in=UNFINISHED_STATUSES, deadline__lt=timezone.now()
+    ).update(
+        status=EstimateJobStatus.FAILED,
+        error=ESTIMATE_JOB_TIMEOUT_ERROR,
+        finished_at=timezone.now(),
+    )
+
+
+def get_job_for_user(job_id: int, user: User) -> EstimateJob:
+    """Return one of the user's jobs, failing it first if it is overdue.
+
+    Raises EstimateJob.DoesNotExist for other users' jobs.
+    """
+    jobs = EstimateJob.objects.filter(id=job_id, user=user)
+    expire_overdue_jobs(jobs)
+    return jobs.get()
+
+
+def claim_next_job() -> EstimateJob | None:
+    """Mark the oldest pending job as running and return it, if there is one."""
+    with transaction.atomic():
+        job = (
+            EstimateJob.objects.select_for_update(skip_locked=True)
+            .filter(status=EstimateJobStatus.PENDING, deadline__gte=timezone.now())
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = EstimateJobStatus.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def record_progress(job: EstimateJob, items: list[dict[str, Any]]) -> None:
+    """Save the breakdown items streamed so far on a running job."""
+    EstimateJob.objects.filter(id=job.id, status=EstimateJobStatus.RUNNING).update(
+        progress=items
+    )
+
+
+def run_estimate(job: EstimateJob) -> estimation.EstimateResult:
+    """Call the estimation function matching the job's kind."""
+    params = job.params
+    options: dict[str, Any] = {
+        "previous_estimate": params.get("previous_estimate"),
+        "correction": params.get("correction", ""),
+        "on_items": lambda items: record_progress(job, items),
+    }
+    if job.kind == EstimateJobKind.IMAGE:
+        return estimation.estimate_from_image(
+            bytes(job.image or b""),
+            params.get("media_type", ""),
+            params.get("note", ""),
+            **options,
+        )
+    if job.kind == EstimateJobKind.RECIPE:
+        return estimation.estimate_recipe(
+            params["recipe_text"], params["fraction"], **options
+        )
+    return estimation.estimate_from_text(params["text"], **options)
+
+
+def finish_job(job: EstimateJob, **fields: Any) -> bool:
+    """Record a job's outcome; returns False if it was expired meanwhile."""
+    return bool(
+        EstimateJob.objects.filter(id=job.id, status=EstimateJobStatus.RUNNING).update(
+            finished_at=timezone.now(), **fields
+        )
+    )
+
+
+def process_job(job: EstimateJob) -> None:
+    """Run a claimed job and store its estimate or a user-facing error."""
+    try:
+        result = run_estimate(job)
+    except ValueError as e:
+        # estimation raises ValueError with a message meant for the user.
+        finish_job(job, status=EstimateJobStatus.FAILED, error=str(e)[:255])
+    except Exception:
+        logging.exception(f"Estimate job {job.id} failed")
+        finish_job(
+            job, status=EstimateJobStatus.FAILED, error=ESTIMATE_JOB_UNEXPECTED_ERROR
+        )
+    else:
+        finish_job(
+            job,
+            status=EstimateJobStatus.DONE,
+            result=result.to_dict(),
+            usage=result.usage,
+        )
+        estimate_cache.store_result(job.user_id, job.cache_key, result.to_dict())
+
+
+def process_pending_jobs() -> int:
+    """Run queued jobs until the queue is empty; returns how many ran."""
+    processed = 0
+    while (job := claim_next_job()) is not None:
+        process_job(job)
+        processed += 1
+    return processed
+
+
+def delete_old_jobs() -> int:
+    """Delete jobs (and their photos) past the retention period; returns how many."""
+    cutoff = timezone.now() - timedelta(hours=ESTIMATE_JOB_RETENTION_HOURS)
+    deleted, _ = EstimateJob.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
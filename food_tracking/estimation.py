@@ -4,16 +4,28 @@ AI-powered calorie estimation using the Anthropic API.
 Provides estimates from a food photo, a free-text description (e.g. dictated
 voice notes), or a pasted recipe plus the fraction eaten. Each helper returns a
 typed EstimateResult; callers decide whether to persist it as a Consumption.
+Callers that pass on_items get the breakdown streamed to them item by item
+while the model is still writing the rest of the estimate.
+
+Requests use prompt caching: the tools and system prompt, and the user's
+original input, are marked as cacheable, so a refinement sent soon after the
+first estimate reads that prefix (often mostly a photo) from the cache
+instead of paying for it again. Each EstimateResult carries the request's
+token usage, including how much was written to and read from the cache.
 """
 
 import base64
 import json
 import os
+import re
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
 
 from anthropic import Anthropic
 
+from http_clients import clients
+
 # Constants
 # Defaults to the current Sonnet generation; override (e.g. to bump to a newer
 # model) via the FOOD_ESTIMATION_MODEL environment variable, no code change.
@@ -29,6 +41,25 @@ MAX_TOKENS = 8192
 # blow past the web server's request timeout (surfacing as 500s).
 ESTIMATION_EFFORT = os.environ.get("FOOD_ESTIMATION_EFFORT", "low")
 ESTIMATE_TOOL_NAME = "record_estimate"
+# Part of the key of cached estimates (see estimate_cache). Bump it whenever the
+# prompts or the tool schema change, so inputs are re-estimated with them.
+PROMPT_VERSION = 1
+
+# Finds the start of the items array in the streamed record_estimate input.
+ITEMS_ARRAY_START = re.compile(r'"items"\s*:\s*\[')
+
+# Marks the end of a cacheable prompt prefix. The cache lives for 5 minutes
+# after its last use, which covers correcting an estimate right after seeing it.
+# Prefixes under the model's minimum cacheable length (1024 tokens for Sonnet;
+# on its own, the system prompt and tool are shorter) are simply not cached.
+CACHE_CONTROL = {"type": "ephemeral"}
+# Token counts copied from the response's usage into EstimateResult.usage.
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
 
 SUPPORTED_IMAGE_MEDIA_TYPES = frozenset(
     {"image/jpeg", "image/png", "image/webp", "image/gif"}
@@ -85,6 +116,9 @@ ESTIMATE_TOOL: dict[str, Any] = {
 }
 
 
+ItemsCallback = Callable[[list[dict[str, Any]]], None]
+
+
 @dataclass
 class EstimateResult:
     """A structured calorie estimate returned by the model."""
@@ -93,6 +127,9 @@ class EstimateResult:
     calories: int
     confidence: str
     items: list[dict[str, Any]] = field(default_factory=list)
+    # Token counts of the request (see USAGE_FIELDS). Not part of to_dict():
+    # they describe the call, not the estimate, and aren't cached with it.
+    usage: dict[str, int] = field(default_factory=dict)
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -104,8 +141,8 @@ class EstimateResult:
 
 
 def _get_client() -> Anthropic:
-    """Construct an Anthropic client from the environment."""
-    return Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
+    """Return the process's shared Anthropic client (see http_clients)."""
+    return clients.get_anthropic_client()
 
 
 def _parse_estimate(data: Any) -> EstimateResult:
@@ -139,8 +176,12 @@ def _build_messages(
     A fresh estimate is a single user turn. A refinement replays the original
     request as a two-shot conversation: the prior estimate is restated as an
     assistant turn, then the user's correction asks for a revised tool call.
+
+    The original content always ends in a cache breakpoint: a fresh estimate
+    writes it to the cache, and a refinement of it reads it back.
     """
-    messages: list[dict[str, Any]] = [{"role": "user", "content": content}]
+    cached_content = content[:-1] + [{**content[-1], "cache_control": CACHE_CONTROL}]
+    messages: list[dict[str, Any]] = [{"role": "user", "content": cached_content}]
     if previous_estimate is None:
         return messages
 
@@ -168,10 +209,70 @@ def _build_messages(
     return messages
 
 
+def _usage(response: Any) -> dict[str, int]:
+    """Return a response's token counts, treating counts the API left out as 0."""
+    return {name: getattr(response.usage, name, None) or 0 for name in USAGE_FIELDS}
+
+
+def _complete_items(
+    partial_input: str, position: int | None = None
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Return the items completed in a partial tool input since position.
+
+    partial_input is the record_estimate input JSON as streamed so far, and
+    position is what the previous call returned (None until the items array
+    has started). Only the complete objects from position on are decoded; the
+    item still being written is left for a later call. Returns the new items
+    and the position to pass next time.
+    """
+    if position is None:
+        match = ITEMS_ARRAY_START.search(partial_input)
+        if match is None:
+            return [], None
+        position = match.end()
+    decoder = json.JSONDecoder()
+    items: list[dict[str, Any]] = []
+    while True:
+        while position < len(partial_input) and partial_input[position] in " \t\r\n,":
+            position += 1
+        if position >= len(partial_input) or partial_input[position] == "]":
+            return items, position
+        try:
+            item, position = decoder.raw_decode(partial_input, position)
+        except json.JSONDecodeError:
+            return items, position
+        if isinstance(item, dict):
+            items.append(item)
+
+
+def _stream_response(
+    client: Anthropic, request: dict[str, Any], on_items: ItemsCallback
+) -> Any:
+    """Stream a Messages request, calling on_items whenever another item of the
+    estimate's breakdown is complete, and return the final message."""
+    tool_input = ""
+    # Where the next item starts, so each delta only decodes what's new.
+    position: int | None = None
+    items: list[dict[str, Any]] = []
+    with client.messages.stream(**request) as stream:
+        for event in stream:
+            # input_json events carry the tool call's arguments as they are
+            # generated; thinking and text deltas are skipped.
+            if event.type != "input_json":
+                continue
+            tool_input += event.partial_json
+            new_items, position = _complete_items(tool_input, position)
+            if new_items:
+                items = items + new_items
+                on_items(items)
+        return stream.get_final_message()
+
+
 def _run_estimate(
     content: list[dict[str, Any]],
     previous_estimate: dict[str, Any] | None = None,
     correction: str = "",
+    on_items: ItemsCallback | None = None,
 ) -> EstimateResult:
     """Send a user content payload to Claude and parse the tool call.
 
@@ -179,26 +280,36 @@ def _run_estimate(
     before committing to numbers; thinking is incompatible with a forced tool
     choice, so the system prompt (not tool_choice) ensures the tool gets called.
     When previous_estimate/correction are given, the request becomes a
-    refinement conversation (see _build_messages).
+    refinement conversation (see _build_messages). With on_items, the response
+    is streamed and on_items gets the breakdown as it grows.
     """
     client = _get_client()
-    response = client.messages.create(
-        model=ESTIMATION_MODEL,
-        max_tokens=MAX_TOKENS,
-        system=SYSTEM_PROMPT,
-        thinking={"type": "adaptive"},
-        output_config={"effort": ESTIMATION_EFFORT},
-        tools=[ESTIMATE_TOOL],
-        tool_choice={"type": "auto"},
-        messages=_build_messages(content, previous_estimate, correction),
-    )
+    request: dict[str, Any] = {
+        "model": ESTIMATION_MODEL,
+        "max_tokens": MAX_TOKENS,
+        # The breakpoint on the system prompt covers the tools before it.
+        "system": [
+            {"type": "text", "text": SYSTEM_PROMPT, "cache_control": CACHE_CONTROL}
+        ],
+        "thinking": {"type": "adaptive"},
+        "output_config": {"effort": ESTIMATION_EFFORT},
+        "tools": [ESTIMATE_TOOL],
+        "tool_choice": {"type": "auto"},
+        "messages": _build_messages(content, previous_estimate, correction),
+    }
+    if on_items is None:
+        response = client.messages.create(**request)
+    else:
+        response = _stream_response(client, request, on_items)
 
     if response.stop_reason == "max_tokens":
         raise ValueError("The estimate was cut off — please try again.")
 
     for block in response.content:
         if block.type == "tool_use" and block.name == ESTIMATE_TOOL_NAME:
-            return _parse_estimate(block.input)
+            result = _parse_estimate(block.input)
+            result.usage = _usage(response)
+            return result
 
     raise ValueError("Claude did not return a calorie estimate.")
 
@@ -209,6 +320,7 @@ def estimate_from_image(
     note: str = "",
     previous_estimate: dict[str, Any] | None = None,
     correction: str = "",
+    on_items: ItemsCallback | None = None,
 ) -> EstimateResult:
     """Estimate calories from a food photo, with an optional text note."""
     if media_type not in SUPPORTED_IMAGE_MEDIA_TYPES:
@@ -230,13 +342,14 @@ def estimate_from_image(
         },
         {"type": "text", "text": prompt},
     ]
-    return _run_estimate(content, previous_estimate, correction)
+    return _run_estimate(content, previous_estimate, correction, on_items)
 
 
 def estimate_from_text(
     text: str,
     previous_estimate: dict[str, Any] | None = None,
     correction: str = "",
+    on_items: ItemsCallback | None = None,
 ) -> EstimateResult:
     """Estimate calories from a free-text food description."""
     prompt = (
@@ -244,7 +357,7 @@ def estimate_from_text(
         f"every food mentioned: {text}"
     )
     return _run_estimate(
-        [{"type": "text", "text": prompt}], previous_estimate, correction
+        [{"type": "text", "text": prompt}], previous_estimate, correction, on_items
     )
 
 
@@ -253,6 +366,7 @@ def estimate_recipe(
     fraction: float,
     previous_estimate: dict[str, Any] | None = None,
     correction: str = "",
+    on_items: ItemsCallback | None = None,
 ) -> EstimateResult:
     """Estimate calories for the portion of a recipe the user actually ate.
 
@@ -268,5 +382,5 @@ def estimate_recipe(
         f"Recipe:\n{recipe_text}"
     )
     return _run_estimate(
-        [{"type": "text", "text": prompt}], previous_estimate, correction
+        [{"type": "text", "text": prompt}], previous_estimate, correction, on_items
     )
@@ -0,0 +1,155 @@
+"""
+Each user's library of the ad-hoc foods (estimates and recipes) they've logged.
+
+Every distinct description, compared with case and spacing folded, is one
+LibraryFood holding the calories it was last logged with and how often it's
+been logged. The home page offers the most logged ones, and anything typed
+into the estimate box is searched for, so a usual breakfast can be logged
+again in one tap without asking the model. food_tracking.signals keeps the
+library up to date as ad-hoc entries are logged and deleted, and
+`manage.py rebuild_food_library` recomputes it from scratch (edits made in
+the admin aren't tracked).
+
+Search matches the typed text as a substring or, to forgive typos and
+reordered words, by trigram word similarity. Both are served by a trigram GIN
+index on the key, so lookups stay fast however long the library gets.
+"""
+
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection, transaction
+from django.db.models import F, Q, QuerySet
+
+from food_tracking.constants import (
+    FOOD_LIBRARY_HOME_LIMIT,
+    FOOD_LIBRARY_MIN_WORD_SIMILARITY,
+    FOOD_LIBRARY_SEARCH_LIMIT,
+)
+from food_tracking.models import Consumption, LibraryFood
+from food_tracking.text import normalize_text
+
+
+def library_key(description: str) -> str:
+    """Return the key descriptions are matched on."""
+    return normalize_text(description)[:255]
+
+
+def belongs_in_library(consumption: Consumption) -> bool:
+    """Whether a consumption is an ad-hoc entry the library collects."""
+    return (
+        consumption.food_id is None
+        and bool(consumption.description.strip())
+        and consumption.calories is not None
+    )
+
+
+def record_logged(consumption: Consumption) -> None:
+    """Count a newly logged ad-hoc entry, adding it to the library if it's new.
+
+    The entry's description and calories become the library's unless an entry
+    logged for a later time already set them.
+    """
+    if not belongs_in_library(consumption):
+        return
+    entry, created = LibraryFood.objects.get_or_create(
+        user_id=consumption.user_id,
+        key=library_key(consumption.description),
+        defaults={
+            "description": consumption.description,
+            "calories": consumption.calories,
+            "times_logged": 1,
+            "last_logged_at": consumption.consumed_at,
+        },
+    )
+    if created:
+        return
+    updates = {"times_logged": F("times_logged") + 1}
+    if consumption.consumed_at >= entry.last_logged_at:
+        updates.update(
+            description=consumption.description,
+            calories=consumption.calories,
+            last_logged_at=consumption.consumed_at,
+        )
+    LibraryFood.objects.filter(id=entry.id).update(**updates)
+
+
+def record_deleted(consumption: Consumption) -> None:
+    """Uncount a deleted ad-hoc entry, dropping it from the library at zero."""
+    if not belongs_in_library(consumption):
+        return
+    entries = LibraryFood.objects.filter(
+        user_id=consumption.user_id, key=library_key(consumption.description)
+    )
+    entries.update(times_logged=F("times_logged") - 1)
+    entries.filter(times_logged__lte=0).delete()
+
+
+def top_foods(user: User, limit: int = FOOD_LIBRARY_HOME_LIMIT) -> list[LibraryFood]:
+    """Return the user's most logged foods, most recently logged first among ties."""
+    return list(
+        LibraryFood.objects.filter(user=user).order_by(
+            "-times_logged", "-last_logged_at"
+        )[:limit]
+    )
+
+
+def search(
+    user: User, query: str, limit: int = FOOD_LIBRARY_SEARCH_LIMIT
+) -> list[LibraryFood]:
+    """Return the user's library entries best matching query.
+
+    An empty query returns their most logged foods instead.
+    """
+    key = library_key(query)
+    if not key:
+        return top_foods(user, limit)
+    matches = (
+        LibraryFood.objects.filter(user=user)
+        .filter(Q(key__contains=key) | Q(key__trigram_word_similar=key))
+        .annotate(similarity=TrigramWordSimilarity(key, "key"))
+        .order_by("-similarity", "-times_logged", "-last_logged_at")[:limit]
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        # trigram_word_similar compares against this setting; set_config's
+        # last argument limits the change to this transaction.
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(FOOD_LIBRARY_MIN_WORD_SIMILARITY)],
+        )
+        return list(matches)
+
+
+def rebuild_library(users: QuerySet[User] | None = None) -> int:
+    """Recompute the libraries of users (default everyone) from their consumption.
+
+    Returns the number of entries built.
+    """
+    consumptions = Consumption.objects.filter(
+        food=None, calories__isnull=False
+    ).exclude(description="")
+    libraries = LibraryFood.objects.all()
+    if users is not None:
+        consumptions = consumptions.filter(user__in=users)
+        libraries = libraries.filter(user__in=users)
+
+    entries: dict[tuple[int, str], LibraryFood] = {}
+    rows = consumptions.order_by("consumed_at").values_list(
+        "user_id", "description", "calories", "consumed_at"
+    )
+    for user_id, description, calories, consumed_at in rows.iterator():
+        key = library_key(description)
+        if not key:
+            continue
+        entry = entries.setdefault(
+            (user_id, key), LibraryFood(user_id=user_id, key=key, times_logged=0)
+        )
+        # Rows come oldest first, so the last one seen sets the calories.
+        entry.description = description
+        entry.calories = calories
+        entry.last_logged_at = consumed_at
+        entry.times_logged += 1
+
+    with transaction.atomic():
+        libraries.delete()
+        LibraryFood.objects.bulk_create(entries.values(), batch_size=1000)
+    return len(entries)
@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from food_tracking.daily_summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recomputes every user's daily calorie summaries from their consumption."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        built = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {built} daily summaries."))
@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from food_tracking.food_library import rebuild_library
+
+
+class Command(BaseCommand):
+    help = "Recomputes every user's food library from their ad-hoc entries."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        built = rebuild_library()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {built} library foods."))
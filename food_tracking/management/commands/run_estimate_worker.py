@@ -0,0 +1,51 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from food_tracking.constants import (
+    ESTIMATE_WORKER_HOUSEKEEPING_SECONDS,
+    ESTIMATE_WORKER_IDLE_SECONDS,
+)
+from food_tracking.estimate_cache import delete_expired_entries
+from food_tracking.estimate_jobs import (
+    delete_old_jobs,
+    expire_overdue_jobs,
+    process_pending_jobs,
+)
+from http_clients.clients import log_connection_stats
+
+
+class Command(BaseCommand):
+    help = "Runs queued calorie estimate jobs. Runs forever unless --once is given."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs queued right now, then exit.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["once"]:
+            processed = process_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Ran {processed} estimate jobs."))
+            return
+
+        last_housekeeping = 0.0
+        while True:
+            # The worker outlives any one database connection; drop broken ones.
+            close_old_connections()
+            if process_pending_jobs():
+                continue
+            if (
+                time.monotonic() - last_housekeeping
+                > ESTIMATE_WORKER_HOUSEKEEPING_SECONDS
+            ):
+                expire_overdue_jobs()
+                delete_old_jobs()
+                delete_expired_entries()
+                log_connection_stats()
+                last_housekeeping = time.monotonic()
+            time.sleep(ESTIMATE_WORKER_IDLE_SECONDS)
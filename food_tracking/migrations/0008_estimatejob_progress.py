@@ -0,0 +1,22 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food_tracking", "0007_estimatejob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="estimatejob",
+            name="progress",
+            field=models.JSONField(
+                blank=True,
+                help_text="The estimate's breakdown items streamed so far, while running.",
+                null=True,
+            ),
+        ),
+    ]
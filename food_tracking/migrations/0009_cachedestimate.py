@@ -0,0 +1,65 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food_tracking", "0008_estimatejob_progress"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="estimatejob",
+            name="cache_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Hash of the normalized input; see food_tracking.estimate_cache.",
+                max_length=64,
+            ),
+        ),
+        migrations.CreateModel(
+            name="CachedEstimate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                ("result", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Cached Estimate",
+                "verbose_name_plural": "Cached Estimates",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "last_used_at"],
+                        name="food_tracki_user_id_b43139_idx",
+                    )
+                ],
+                "unique_together": {("user", "key")},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food_tracking", "0009_cachedestimate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="estimatejob",
+            name="usage",
+            field=models.JSONField(
+                blank=True,
+                help_text="Token counts of the model call, including prompt cache writes and reads.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:24
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food_tracking", "0010_estimatejob_usage"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.CreateModel(
+            name="LibraryFood",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=255)),
+                (
+                    "description",
+                    models.CharField(
+                        help_text="The description as it was last logged.",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "calories",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Calories the last time this was logged.",
+                        max_digits=7,
+                    ),
+                ),
+                ("times_logged", models.PositiveIntegerField(default=0)),
+                ("last_logged_at", models.DateTimeField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Library Food",
+                "verbose_name_plural": "Library Foods",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-times_logged", "-last_logged_at"],
+                        name="food_tracki_user_id_fbbeb1_idx",
+                    ),
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["key"],
+                        name="food_library_key_trgm",
+                        opclasses=["gin_trgm_ops"],
+                    ),
+                ],
+                "unique_together": {("user", "key")},
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:33
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food_tracking", "0011_library_food"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(help_text="The Pacific day summarized.")),
+                (
+                    "total_calories",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0"), max_digits=9
+                    ),
+                ),
+                (
+                    "food_quantities",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Servings logged of each grid Food that day, by food id.",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Summary",
+                "verbose_name_plural": "Daily Summaries",
+                "ordering": ["-date"],
+                "unique_together": {("user", "date")},
+            },
+        ),
+    ]
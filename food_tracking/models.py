@@ -2,9 +2,14 @@ from decimal import Decimal
 from typing import Any
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from food_tracking.constants import EstimateJobKind, EstimateJobStatus
+
 # Constants
 DEFAULT_DAILY_CALORIE_TARGET = 2000
 DEFAULT_GOAL_DEFICIT = 500
@@ -86,6 +91,40 @@ class DailyActiveCalories(models.Model):
         }
 
 
+class DailySummary(models.Model):
+    """A user's totals for one Pacific day, so pages needn't add up the day's entries.
+
+    Recomputed from the day's Consumptions whenever one is logged, edited or
+    deleted, in the same transaction (see food_tracking.daily_summaries). Days
+    with nothing logged have no summary.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    date = models.DateField(help_text="The Pacific day summarized.")
+    total_calories = models.DecimalField(
+        max_digits=9, decimal_places=2, default=Decimal("0")
+    )
+    food_quantities = models.JSONField(
+        default=dict,
+        help_text="Servings logged of each grid Food that day, by food id.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        verbose_name = "Daily Summary"
+        verbose_name_plural = "Daily Summaries"
+        # Serves the home page's single-day lookup and the reports' range scan.
+        unique_together = ("user", "date")
+
+    def __str__(self) -> str:
+        return f"{self.user.username}: {self.total_calories} cal on {self.date}"
+
+    def quantity_of(self, food_id: int) -> Decimal:
+        """Servings of a grid Food logged that day."""
+        return Decimal(self.food_quantities.get(str(food_id), "0"))
+
+
 class Food(models.Model):
     """Represents a trackable food item with nutritional information."""
 
@@ -194,3 +233,171 @@ class Consumption(models.Model):
             "total_calories": float(self.total_calories()),
             "notes": self.notes,
         }
+
+
+# Consumption.total_calories() in SQL: a grid entry's servings times its
+# Food's calories, otherwise the calories stored on an ad-hoc entry.
+CONSUMPTION_CALORIES = Coalesce(
+    ExpressionWrapper(
+        F("food__calories_per_serving") * F("quantity"),
+        output_field=DecimalField(max_digits=12, decimal_places=4),
+    ),
+    F("calories"),
+    Value(Decimal("0")),
+    output_field=DecimalField(max_digits=12, decimal_places=4),
+)
+
+
+class EstimateJob(models.Model):
+    """A queued request for an AI calorie estimate.
+
+    The estimate views only store the request and return its id; the model is
+    called by `manage.py run_estimate_worker` (see food_tracking.estimate_jobs)
+    and the client polls for the result, so slow estimates never tie up a web
+    worker. While it runs, the breakdown items the model has written so far are
+    stored in progress, so the client can show them before the total is in.
+    Nothing is logged until the user confirms the result.
+    """
+
+    KIND_CHOICES = [
+        (EstimateJobKind.TEXT, "Text"),
+        (EstimateJobKind.IMAGE, "Photo"),
+        (EstimateJobKind.RECIPE, "Recipe"),
+    ]
+    STATUS_CHOICES = [
+        (EstimateJobStatus.PENDING, "Pending"),
+        (EstimateJobStatus.RUNNING, "Running"),
+        (EstimateJobStatus.DONE, "Done"),
+        (EstimateJobStatus.FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=EstimateJobStatus.PENDING
+    )
+    params = models.JSONField(
+        default=dict,
+        help_text="Arguments for the estimation call (text, note, recipe, refinement).",
+    )
+    image = models.BinaryField(null=True, blank=True)
+    cache_key = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the normalized input; see food_tracking.estimate_cache.",
+    )
+    progress = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="The estimate's breakdown items streamed so far, while running.",
+    )
+    result = models.JSONField(null=True, blank=True)
+    usage = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Token counts of the model call, including prompt cache writes and reads.",
+    )
+    error = models.CharField(max_length=255, blank=True)
+    deadline = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Estimate Job"
+        verbose_name_plural = "Estimate Jobs"
+        indexes = [
+            # The worker's queue scan: oldest pending job first.
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user.username}: {self.kind} estimate ({self.status})"
+
+    def to_dict_for_api(self) -> dict[str, Any]:
+        """Serialize the job's state (and result, once done) for polling."""
+        data: dict[str, Any] = {"id": self.id, "status": self.status}
+        if self.status == EstimateJobStatus.RUNNING and self.progress:
+            data["items"] = self.progress
+        elif self.status == EstimateJobStatus.DONE:
+            data["estimate"] = self.result
+        elif self.status == EstimateJobStatus.FAILED:
+            data["error"] = self.error
+        return data
+
+
+class CachedEstimate(models.Model):
+    """A user's earlier estimate, reused when they submit the same input again.
+
+    key hashes the normalized input together with the model and prompt version
+    (see food_tracking.estimate_cache), so any change to those misses.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    key = models.CharField(max_length=64)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Cached Estimate"
+        verbose_name_plural = "Cached Estimates"
+        unique_together = ("user", "key")
+        indexes = [
+            # Finding a user's least recently used entries to evict.
+            models.Index(fields=["user", "last_used_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user.username}: {self.result.get('description', '')}"
+
+
+class LibraryFood(models.Model):
+    """Something a user has logged as an ad-hoc entry, offered for re-logging.
+
+    One row per distinct description (compared by key, the description with
+    case and spacing folded), kept up to date as ad-hoc Consumptions are logged
+    and deleted (see food_tracking.food_library). Re-logging from the library
+    copies the calories from the last time it was logged, without an estimate.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    description = models.CharField(
+        max_length=255, help_text="The description as it was last logged."
+    )
+    calories = models.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        help_text="Calories the last time this was logged.",
+    )
+    times_logged = models.PositiveIntegerField(default=0)
+    last_logged_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Library Food"
+        verbose_name_plural = "Library Foods"
+        unique_together = ("user", "key")
+        indexes = [
+            # The home page's list of the user's most logged foods.
+            models.Index(fields=["user", "-times_logged", "-last_logged_at"]),
+            # Substring and fuzzy search on the description.
+            GinIndex(
+                fields=["key"],
+                opclasses=["gin_trgm_ops"],
+                name="food_library_key_trgm",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user.username}: {self.description}"
+
+    def to_dict_for_api(self) -> dict[str, Any]:
+        """Serialize the entry for the home page's library list."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "calories": float(self.calories),
+            "times_logged": self.times_logged,
+        }
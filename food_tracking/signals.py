@@ -0,0 +1,165 @@
+"""
+Invalidates cached food tracking pages when the rows they show change, and
+keeps each user's daily summaries and food library in step with their entries.
+
+Connected in FoodTrackingConfig.ready().
+"""
+
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from food_tracking import cache_tags, daily_summaries, food_library
+from food_tracking.constants import FOODS_CACHE_TAG
+from food_tracking.dates import PACIFIC_TZ
+from food_tracking.models import (
+    CalorieTarget,
+    Consumption,
+    DailyActiveCalories,
+    DailySummary,
+    Food,
+)
+from tagged_cache.cache import invalidate_tags
+
+
+@receiver(post_save, sender=Consumption)
+@receiver(post_delete, sender=Consumption)
+def invalidate_consumption_day(
+    sender: type[Consumption], instance: Consumption, **kwargs: Any
+) -> None:
+    """Invalidate the day a consumption was logged on."""
+    tags = [
+        cache_tags.day_tag(
+            instance.user_id, instance.consumed_at.astimezone(PACIFIC_TZ).date()
+        )
+    ]
+    if kwargs.get("created") is False:
+        # An edit may have moved the entry from another day, which we can't
+        # see any more, so every page of the user's goes.
+        tags.append(cache_tags.user_tag(instance.user_id))
+    invalidate_tags(*tags)
+
+
+# Set on a Consumption being edited: the (user id, day) it counted towards
+# before the edit, whose summary has to be recomputed too.
+PREVIOUS_SUMMARY_ATTR = "_previous_summary"
+
+
+@receiver(pre_save, sender=Consumption)
+def remember_previous_summary(
+    sender: type[Consumption], instance: Consumption, **kwargs: Any
+) -> None:
+    """Note which summary an edited consumption is about to leave."""
+    if instance.pk is None or kwargs.get("raw"):
+        return
+    previous = Consumption.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        setattr(
+            instance,
+            PREVIOUS_SUMMARY_ATTR,
+            (previous.user_id, daily_summaries.summary_day(previous)),
+        )
+
+
+@receiver(post_save, sender=Consumption)
+@receiver(post_delete, sender=Consumption)
+def refresh_daily_summary(
+    sender: type[Consumption], instance: Consumption, **kwargs: Any
+) -> None:
+    """Recompute the summary of the day a consumption was logged on (and left)."""
+    if kwargs.get("raw"):
+        return
+    days = {(instance.user_id, daily_summaries.summary_day(instance))}
+    previous = getattr(instance, PREVIOUS_SUMMARY_ATTR, None)
+    if previous is not None:
+        days.add(previous)
+        delattr(instance, PREVIOUS_SUMMARY_ATTR)
+    for user_id, day in days:
+        daily_summaries.refresh_day(user_id, day)
+    invalidate_tags(*{cache_tags.trends_tag(user_id) for user_id, _ in days})
+
+
+@receiver(post_save, sender=Consumption)
+def add_to_food_library(
+    sender: type[Consumption], instance: Consumption, created: bool, **kwargs: Any
+) -> None:
+    """Count a newly logged ad-hoc entry in the user's food library."""
+    # Edits aren't followed; rebuild_food_library catches up with them.
+    if created and not kwargs.get("raw") and food_library.belongs_in_library(instance):
+        food_library.record_logged(instance)
+        invalidate_tags(cache_tags.library_tag(instance.user_id))
+
+
+@receiver(post_delete, sender=Consumption)
+def remove_from_food_library(
+    sender: type[Consumption], instance: Consumption, **kwargs: Any
+) -> None:
+    """Uncount a deleted ad-hoc entry in the user's food library."""
+    if food_library.belongs_in_library(instance):
+        food_library.record_deleted(instance)
+        invalidate_tags(cache_tags.library_tag(instance.user_id))
+
+
+@receiver(post_save, sender=DailyActiveCalories)
+@receiver(post_delete, sender=DailyActiveCalories)
+def invalidate_active_calories_days(
+    sender: type[DailyActiveCalories], instance: DailyActiveCalories, **kwargs: Any
+) -> None:
+    """Invalidate the day, the later days whose estimate it feeds into, and the trends."""
+    invalidate_tags(
+        *cache_tags.active_calories_tags(instance.user_id, instance.date),
+        cache_tags.trends_tag(instance.user_id),
+    )
+
+
+@receiver(post_save, sender=CalorieTarget)
+@receiver(post_delete, sender=CalorieTarget)
+def invalidate_target(
+    sender: type[CalorieTarget], instance: CalorieTarget, **kwargs: Any
+) -> None:
+    """Invalidate every page of a user whose target or deficit changed."""
+    invalidate_tags(cache_tags.user_tag(instance.user_id))
+
+
+# Set on a Food whose calories per serving are being changed.
+CALORIES_CHANGED_ATTR = "_calories_changed"
+
+
+@receiver(pre_save, sender=Food)
+def remember_calories_changed(
+    sender: type[Food], instance: Food, **kwargs: Any
+) -> None:
+    """Note whether a food's calories per serving are changing."""
+    if instance.pk is None or kwargs.get("raw"):
+        return
+    stored = (
+        Food.objects.filter(pk=instance.pk)
+        .values_list("calories_per_serving", flat=True)
+        .first()
+    )
+    if stored is not None and stored != instance.calories_per_serving:
+        setattr(instance, CALORIES_CHANGED_ATTR, True)
+
+
+@receiver(post_save, sender=Food)
+def refresh_food_summaries(sender: type[Food], instance: Food, **kwargs: Any) -> None:
+    """Recompute the summaries of the days a food was logged on when its calories change."""
+    if not getattr(instance, CALORIES_CHANGED_ATTR, False):
+        return
+    delattr(instance, CALORIES_CHANGED_ATTR)
+    days = list(
+        DailySummary.objects.filter(
+            food_quantities__has_key=str(instance.id)
+        ).values_list("user_id", "date")
+    )
+    for user_id, day in days:
+        daily_summaries.refresh_day(user_id, day)
+    invalidate_tags(*{cache_tags.trends_tag(user_id) for user_id, _ in days})
+
+
+@receiver(post_save, sender=Food)
+@receiver(post_delete, sender=Food)
+def invalidate_foods(sender: type[Food], **kwargs: Any) -> None:
+    """Invalidate every page showing the food grid."""
+    invalidate_tags(FOODS_CACHE_TAG)
@@ -194,6 +194,61 @@ async function postForm(url, formData) {
     return data;
 }
 
+// Estimates run as background jobs on the server; this is how often we ask
+// how one is getting on.
+const ESTIMATE_POLL_INTERVAL_MS = 500;
+
+/**
+ * Show the items of an estimate that the model has worked out so far.
+ * @param {Array<Object>} items - [{ name, calories }, ...]
+ */
+function showEstimateProgress(items) {
+    const found = items.map(item => item.name + ' (' + item.calories + ' cal)');
+    setEstimateStatus('Estimating… ' + found.join(', '));
+}
+
+/**
+ * Wait for a queued estimate job to finish. Resolves to { success, estimate }
+ * once it's done; rejects with the job's error if it failed. The server fails
+ * jobs that miss their deadline, so this always ends. While the job runs,
+ * onItems gets the breakdown items streamed so far.
+ * @param {Object} job - { id, status } as returned by an estimate endpoint.
+ * @param {function(Array<Object>)} onItems
+ * @returns {Promise<Object>}
+ */
+async function waitForEstimate(job, onItems) {
+    while (job.status === 'pending' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, ESTIMATE_POLL_INTERVAL_MS));
+        let response;
+        try {
+            response = await fetch('/food/estimate/' + job.id + '/');
+        } catch (e) {
+            throw new Error('Network error — check your connection.');
+        }
+        if (!response.ok) {
+            throw new Error('Server error (HTTP ' + response.status + ').');
+        }
+        job = (await response.json()).job;
+        if (job.items) {
+            onItems(job.items);
+        }
+    }
+    if (job.status !== 'done') {
+        throw new Error(job.error || 'Could not estimate.');
+    }
+    return { success: true, estimate: job.estimate };
+}
+
+/**
+ * Queue an estimate and wait for its result.
+ * @param {string} url - An estimate endpoint.
+ * @param {FormData} formData
+ * @returns {Promise<Object>} - { success, estimate }
+ */
+function submitEstimate(url, formData) {
+    return postForm(url, formData).then(data => waitForEstimate(data.job, showEstimateProgress));
+}
+
 /**
  * Show or hide the small status line in the estimate panel.
  * @param {string} message - Empty string hides it.
@@ -313,7 +368,7 @@ function estimateFromPhoto(input) {
             formData.append('image', blob, 'photo.jpg');
             formData.append('note', note);
             setEstimateStatus('Estimating from photo…');
-            return postForm('/food/estimate/', formData);
+            return submitEstimate('/food/estimate/', formData);
         })
         .then(handleEstimateResponse)
         .catch(err => setEstimateStatus('Estimate failed: ' + err.message));
@@ -333,7 +388,7 @@ function estimateFromText() {
     formData.append('text', text);
 
     setEstimateStatus('Estimating…');
-    postForm('/food/estimate/', formData)
+    submitEstimate('/food/estimate/', formData)
         .then(handleEstimateResponse)
         .catch(err => setEstimateStatus('Estimate failed: ' + err.message));
 }
@@ -354,7 +409,7 @@ function estimateFromRecipe() {
     formData.append('fraction', fraction);
 
     setEstimateStatus('Estimating recipe…');
-    postForm('/food/estimate-recipe/', formData)
+    submitEstimate('/food/estimate-recipe/', formData)
         .then(handleEstimateResponse)
         .catch(err => setEstimateStatus('Estimate failed: ' + err.message));
 }
@@ -417,7 +472,7 @@ function refineEstimate() {
     formData.append('previous_estimate', JSON.stringify(lastEstimate));
 
     setEstimateStatus('Updating estimate…');
-    postForm(url, formData)
+    submitEstimate(url, formData)
         .then(data => {
             if (data.success) {
                 document.getElementById('refine-input').value = '';
@@ -438,6 +493,75 @@ function cancelEstimate() {
     setEstimateStatus('');
 }
 
+/* ------------------------------------------------------------------ */
+/* Food library                                                       */
+/* ------------------------------------------------------------------ */
+
+// Wait this long after the last keystroke before searching the library.
+const LIBRARY_SEARCH_DELAY_MS = 200;
+let librarySearchTimer = null;
+// Only the newest search's results are shown, whatever order they arrive in.
+let librarySearchCount = 0;
+
+/**
+ * Replace the library buttons under the estimate box.
+ * @param {Array<Object>} foods - [{ id, description, calories }, ...]
+ */
+function showLibraryFoods(foods) {
+    const list = document.getElementById('library-foods');
+    list.replaceChildren(...foods.map(food => {
+        const button = document.createElement('button');
+        button.className = 'library-food';
+        button.textContent = food.description + ' ';
+        button.onclick = () => logLibraryFood(food.id);
+        const calories = document.createElement('span');
+        calories.className = 'library-food-calories';
+        calories.textContent = Math.round(food.calories) + ' cal';
+        button.appendChild(calories);
+        return button;
+    }));
+}
+
+/**
+ * Search the library for what's typed in the estimate box, so something
+ * logged before can be logged again without an estimate.
+ */
+function searchLibraryFoods() {
+    clearTimeout(librarySearchTimer);
+    librarySearchTimer = setTimeout(() => {
+        const query = document.getElementById('text-input').value.trim();
+        const searchNumber = ++librarySearchCount;
+        fetch('/food/library/?q=' + encodeURIComponent(query))
+            .then(response => response.json())
+            .then(data => {
+                if (data.success && searchNumber === librarySearchCount) {
+                    showLibraryFoods(data.foods);
+                }
+            })
+            .catch(error => console.error('Error:', error));
+    }, LIBRARY_SEARCH_DELAY_MS);
+}
+
+/**
+ * Log a library food again, with the calories it was last logged with.
+ * @param {number} libraryFoodId
+ */
+function logLibraryFood(libraryFoodId) {
+    const formData = new FormData();
+    formData.append('library_food_id', libraryFoodId);
+    appendViewDate(formData);
+
+    postForm('/food/library/log/', formData)
+        .then(data => {
+            if (data.success) {
+                location.reload();
+            } else {
+                alert('Error: ' + (data.error || 'Could not log.'));
+            }
+        })
+        .catch(() => alert('Failed to log. Please try again.'));
+}
+
 /**
  * Prompt for and save a new daily calorie target.
  */
@@ -0,0 +1,176 @@
+"""Unit tests for the calorie trends."""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+from freezegun import freeze_time
+
+from food_tracking import calorie_trends
+from food_tracking.active_calories import get_active_calories_for_date
+from food_tracking.models import CalorieTarget, Consumption, DailyActiveCalories
+from food_tracking.views import resolve_consumed_at
+
+# Noon on 2024-03-31 (a Sunday), Pacific time.
+NOW = "2024-03-31 19:00:00"
+TODAY = date(2024, 3, 31)
+
+
+class RollingMeanTests(SimpleTestCase):
+    """Tests for the vectorized window arithmetic."""
+
+    def test_matches_a_loop_over_days(self):
+        """Test that rolling means skip unlogged days, like averaging each window by hand."""
+        rng = np.random.default_rng(0)
+        values = rng.uniform(1000, 3000, 60)
+        values[rng.random(60) < 0.3] = np.nan
+        means = calorie_trends.rolling_mean(values, 7)
+        for i in range(60):
+            window = values[max(0, i - 6) : i + 1]
+            window = window[~np.isnan(window)]
+            expected = window.mean() if window.size else np.nan
+            np.testing.assert_allclose(means[i], expected)
+
+
+@freeze_time(NOW)
+class CalorieTrendsTests(TestCase):
+    """Tests for the trends computed from the user's summaries and active calories."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="trending", password="testpass")
+        cls.target = CalorieTarget.objects.create(
+            user=cls.user, daily_calorie_target=1800, goal_deficit=300
+        )
+
+    def log(self, day: date, calories: int) -> None:
+        Consumption.objects.create(
+            user=self.user,
+            description="Meal",
+            calories=Decimal(calories),
+            consumed_at=resolve_consumed_at(day),
+        )
+
+    def trends(self, num_days: int = 28) -> dict:
+        return calorie_trends.compute_trends(self.user, self.target, TODAY, num_days)
+
+    def test_rolling_averages_and_adherence(self):
+        """Test the averages, and days within the default budget (1800 + 500 - 300)."""
+        self.log(TODAY - timedelta(days=2), 1500)
+        self.log(TODAY - timedelta(days=1), 2500)
+        self.log(TODAY, 2000)
+        trends = self.trends()
+        self.assertEqual(len(trends["days"]), 28)
+        self.assertEqual(trends["days"][-1], "2024-03-31")
+        self.assertEqual(trends["calories"][-4:], [None, 1500.0, 2500.0, 2000.0])
+        self.assertEqual(trends["short_average"][-1], 2000.0)
+        self.assertEqual(trends["short_average"][-2], 2000.0)
+        self.assertIsNone(trends["short_average"][-5])
+        self.assertEqual(trends["budget"][-1], 2000.0)
+        self.assertEqual(trends["logged_days"], 3)
+        self.assertEqual(trends["days_within_budget"], 2)
+        self.assertEqual(trends["within_budget_percent"], 66.7)
+        self.assertEqual(trends["average_balance"], 0.0)
+
+    def test_averages_reach_back_before_the_span(self):
+        """Test that the first day's 28-day average includes days before the span."""
+        self.log(TODAY - timedelta(days=30), 3000)
+        self.assertEqual(self.trends()["long_average"][0], 3000.0)
+
+    def test_weekday_averages(self):
+        """Test that days are averaged by weekday, skipping unlogged ones."""
+        self.log(TODAY, 2000)  # Sunday
+        self.log(TODAY - timedelta(days=7), 3000)  # Sunday
+        self.log(TODAY - timedelta(days=6), 1000)  # Monday
+        averages = {
+            row["weekday"]: row["average"] for row in self.trends()["weekday_averages"]
+        }
+        self.assertEqual(averages["Sun"], 2500.0)
+        self.assertEqual(averages["Mon"], 1000.0)
+        self.assertIsNone(averages["Tue"])
+
+    def test_active_calories_match_the_daily_estimate(self):
+        """Test that each day's budget uses the same active calories as the home page."""
+        rng = random.Random(1)
+        for offset in range(60):
+            if rng.random() < 0.4:
+                DailyActiveCalories.objects.create(
+                    user=self.user,
+                    date=TODAY - timedelta(days=offset),
+                    active_calories=rng.randint(200, 900),
+                )
+        trends = self.trends(num_days=40)
+        for day, budget in zip(trends["days"], trends["budget"]):
+            active, _ = get_active_calories_for_date(self.user, date.fromisoformat(day))
+            self.assertEqual(budget, 1800 + active - 300, day)
+
+    def test_trends_are_two_queries(self):
+        """Test that a year of trends reads the summaries and active calories once each."""
+        with self.assertNumQueries(2):
+            self.trends(num_days=365)
+
+    def test_empty_history(self):
+        """Test that a user with nothing logged gets no averages."""
+        trends = self.trends()
+        self.assertEqual(trends["logged_days"], 0)
+        self.assertIsNone(trends["within_budget_percent"])
+        self.assertEqual(set(trends["short_average"]), {None})
+
+    def test_cached_until_data_changes(self):
+        """Test that trends are served from the cache until an entry or active calories change."""
+        cache.clear()
+        calorie_trends.get_trends(self.user, self.target, TODAY, 28)
+        with self.assertNumQueries(0):
+            calorie_trends.get_trends(self.user, self.target, TODAY, 28)
+
+        self.log(TODAY, 2000)
+        trends = calorie_trends.get_trends(self.user, self.target, TODAY, 28)
+        self.assertEqual(trends["logged_days"], 1)
+
+        DailyActiveCalories.objects.create(
+            user=self.user, date=TODAY, active_calories=100
+        )
+        trends = calorie_trends.get_trends(self.user, self.target, TODAY, 28)
+        self.assertEqual(trends["budget"][-1], 1600.0)
+
+
+@freeze_time(NOW)
+class TrendsViewTests(TestCase):
+    """Tests for the trends page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="trending", password="testpass")
+
+    def setUp(self):
+        """Set up test client and login."""
+        cache.clear()
+        self.client = Client()
+        self.client.login(username="trending", password="testpass")
+
+    def test_trends_page(self):
+        """Test that the page renders the trends for the chosen span."""
+        Consumption.objects.create(
+            user=self.user, description="Meal", calories=Decimal("1800")
+        )
+        response = self.client.get(reverse("food_tracking:trends"), {"days": 365})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["days"], 365)
+        self.assertEqual(len(response.context["trends"]["days"]), 365)
+        self.assertContains(response, "trends-data")
+
+    def test_invalid_span_falls_back_to_default(self):
+        """Test that unsupported spans show the default."""
+        for days in ("7", "many"):
+            with self.subTest(days=days):
+                response = self.client.get(
+                    reverse("food_tracking:trends"), {"days": days}
+                )
+                self.assertEqual(response.context["days"], 90)
@@ -0,0 +1,189 @@
+"""Unit tests for the per-day calorie summaries."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from freezegun import freeze_time
+
+from food_tracking.models import Consumption, DailySummary, Food
+from food_tracking.views import resolve_consumed_at
+
+# Noon on 2024-01-15, Pacific time.
+NOW = "2024-01-15 20:00:00"
+TODAY = date(2024, 1, 15)
+
+
+@freeze_time(NOW)
+class DailySummaryTests(TestCase):
+    """Tests for keeping the summaries in step with the user's entries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="summarized", password="testpass")
+        cls.food = Food.objects.create(
+            name="Test Food S",
+            icon="🌰",
+            serving_size="1 oz",
+            calories_per_serving=Decimal("200.00"),
+        )
+
+    def log(self, day: date = TODAY, **kwargs) -> Consumption:
+        """Log an entry on a Pacific day."""
+        return Consumption.objects.create(
+            user=self.user, consumed_at=resolve_consumed_at(day), **kwargs
+        )
+
+    def summary(self, day: date = TODAY) -> DailySummary:
+        return DailySummary.objects.get(user=self.user, date=day)
+
+    def test_entries_are_added_up(self):
+        """Test that grid and ad-hoc entries count towards the day's totals."""
+        self.log(food=self.food, quantity=Decimal("1.5"))
+        self.log(food=self.food, quantity=Decimal("1"))
+        self.log(description="Salad", calories=Decimal("350"))
+        summary = self.summary()
+        self.assertEqual(summary.total_calories, Decimal("850"))
+        self.assertEqual(summary.quantity_of(self.food.id), Decimal("2.5"))
+
+    def test_backdated_entries_count_towards_their_day(self):
+        """Test that an entry logged for an earlier day updates that day only."""
+        self.log(day=TODAY - timedelta(days=3), description="Toast", calories=100)
+        self.assertEqual(
+            self.summary(TODAY - timedelta(days=3)).total_calories, Decimal("100")
+        )
+        self.assertFalse(DailySummary.objects.filter(date=TODAY).exists())
+
+    def test_deleting_every_entry_removes_the_summary(self):
+        """Test that deleting entries subtracts them, and an empty day has no summary."""
+        first = self.log(food=self.food)
+        second = self.log(description="Salad", calories=Decimal("350"))
+        first.delete()
+        self.assertEqual(self.summary().total_calories, Decimal("350"))
+        self.assertEqual(self.summary().quantity_of(self.food.id), Decimal("0"))
+        second.delete()
+        self.assertFalse(DailySummary.objects.exists())
+
+    def test_moving_an_entry_updates_both_days(self):
+        """Test that editing an entry onto another day moves its calories there."""
+        entry = self.log(description="Salad", calories=Decimal("350"))
+        self.log(description="Toast", calories=Decimal("100"))
+        yesterday = TODAY - timedelta(days=1)
+        entry.consumed_at = resolve_consumed_at(yesterday)
+        entry.save()
+        self.assertEqual(self.summary().total_calories, Decimal("100"))
+        self.assertEqual(self.summary(yesterday).total_calories, Decimal("350"))
+
+    def test_changing_a_foods_calories_updates_its_days(self):
+        """Test that summaries follow a Food's new calories per serving."""
+        self.log(food=self.food, quantity=Decimal("2"))
+        self.food.calories_per_serving = Decimal("150.00")
+        self.food.save()
+        self.assertEqual(self.summary().total_calories, Decimal("300"))
+
+    def test_deleting_the_user_deletes_their_summaries(self):
+        """Test that summaries aren't recreated while a user's entries are deleted."""
+        user = User.objects.create_user(username="leaving", password="testpass")
+        Consumption.objects.create(user=user, food=self.food)
+        user.delete()
+        self.assertFalse(DailySummary.objects.exists())
+
+    def test_rebuild_matches_incremental_updates(self):
+        """Test that rebuild_daily_summaries recomputes the same summaries from scratch."""
+        self.log(food=self.food, quantity=Decimal("1.5"))
+        self.log(description="Salad", calories=Decimal("350"))
+        self.log(day=TODAY - timedelta(days=1), food=self.food)
+        fields = ("user_id", "date", "total_calories", "food_quantities")
+        expected = [
+            tuple(row)
+            for row in DailySummary.objects.order_by("date").values_list(*fields)
+        ]
+        # Drifted, as after writes that skip signals.
+        DailySummary.objects.update(total_calories=Decimal("0"), food_quantities={})
+        out = StringIO()
+        call_command("rebuild_daily_summaries", stdout=out)
+        self.assertIn("Rebuilt 2 daily summaries.", out.getvalue())
+        self.assertEqual(
+            [
+                tuple(row)
+                for row in DailySummary.objects.order_by("date").values_list(*fields)
+            ],
+            expected,
+        )
+
+
+@freeze_time(NOW)
+class DailySummaryViewTests(TestCase):
+    """Tests for the pages reading the summaries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="summarized", password="testpass")
+        cls.food = Food.objects.create(
+            name="Test Food S",
+            icon="🌰",
+            serving_size="1 oz",
+            calories_per_serving=Decimal("200.00"),
+        )
+
+    def setUp(self):
+        """Set up test client and login."""
+        # Pages are cached across requests (and tests); start clean.
+        cache.clear()
+        self.client = Client()
+        self.client.login(username="summarized", password="testpass")
+
+    def test_logging_views_update_the_summary(self):
+        """Test that logging and deleting through the views keeps the summary current."""
+        self.client.post(
+            reverse("food_tracking:log_consumption"), {"food_id": self.food.id}
+        )
+        response = self.client.post(
+            reverse("food_tracking:log_estimate"),
+            {"description": "Salad", "calories": "350", "date": "2024-01-14"},
+        )
+        summaries = DailySummary.objects.filter(user=self.user)
+        self.assertEqual(
+            dict(summaries.values_list("date", "total_calories")),
+            {TODAY: Decimal("200"), date(2024, 1, 14): Decimal("350")},
+        )
+        self.client.post(
+            reverse("food_tracking:delete_consumption"),
+            {"consumption_id": response.json()["consumption"]["id"]},
+        )
+        self.assertEqual(list(summaries.values_list("date", flat=True)), [TODAY])
+
+    def test_home_reads_the_summary(self):
+        """Test that the home page's total and badges come from the day's summary."""
+        Consumption.objects.create(user=self.user, food=self.food)
+        DailySummary.objects.filter(user=self.user).update(
+            total_calories=Decimal("1234"), food_quantities={str(self.food.id): "3"}
+        )
+        response = self.client.get(reverse("food_tracking:home"))
+        self.assertEqual(response.context["today_total_calories"], Decimal("1234"))
+        food = next(f for f in response.context["foods"] if f.id == self.food.id)
+        self.assertEqual(food.today_count, Decimal("3"))
+
+    def test_home_of_an_empty_day(self):
+        """Test that a day with nothing logged shows no calories."""
+        response = self.client.get(reverse("food_tracking:home"))
+        self.assertEqual(response.context["today_total_calories"], Decimal("0"))
+
+    def test_reports_read_the_summaries(self):
+        """Test that report totals are the days' summaries."""
+        Consumption.objects.create(user=self.user, food=self.food)
+        DailySummary.objects.filter(user=self.user).update(
+            total_calories=Decimal("1234")
+        )
+        response = self.client.get(reverse("food_tracking:reports"))
+        self.assertEqual(
+            response.context["totals"],
+            [{"period": "2024-01-15", "total_calories": Decimal("1234")}],
+        )
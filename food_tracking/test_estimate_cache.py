@@ -0,0 +1,140 @@
+"""Unit tests for the per-user cache of calorie estimates."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from food_tracking import estimate_cache, estimate_jobs
+from food_tracking.constants import (
+    ESTIMATE_CACHE_TTL_DAYS,
+    EstimateJobKind,
+    EstimateJobStatus,
+)
+from food_tracking.estimation import EstimateResult
+from food_tracking.models import CachedEstimate
+
+APPLE = EstimateResult(description="Apple", calories=95, confidence="high")
+
+
+class CacheKeyTests(TestCase):
+    """Tests for normalizing inputs into cache keys."""
+
+    def key(self, **params):
+        """Key of a text estimate with the given params."""
+        return estimate_cache.cache_key(EstimateJobKind.TEXT, params)
+
+    def test_case_and_whitespace_are_ignored(self):
+        """Test that the same description typed differently has the same key."""
+        self.assertEqual(
+            self.key(text="Two eggs and  toast"), self.key(text=" two EGGS and toast")
+        )
+
+    def test_different_inputs_differ(self):
+        """Test that different foods have different keys."""
+        self.assertNotEqual(self.key(text="two eggs"), self.key(text="three eggs"))
+
+    def test_refinements_have_their_own_keys(self):
+        """Test that a refinement never reuses the unrefined estimate, but repeats of it match."""
+        plain = self.key(text="pizza", previous_estimate=None, correction="")
+        refined = self.key(
+            text="pizza",
+            previous_estimate={"description": "Pizza", "calories": 285},
+            correction="two slices",
+        )
+        reordered = self.key(
+            text="pizza",
+            previous_estimate={"calories": 285, "description": "Pizza"},
+            correction="Two slices",
+        )
+        self.assertNotEqual(plain, refined)
+        self.assertEqual(refined, reordered)
+
+    def test_image_bytes_are_part_of_the_key(self):
+        """Test that different photos with the same note have different keys."""
+        params = {"media_type": "image/jpeg", "note": ""}
+        self.assertNotEqual(
+            estimate_cache.cache_key(EstimateJobKind.IMAGE, params, b"one"),
+            estimate_cache.cache_key(EstimateJobKind.IMAGE, params, b"two"),
+        )
+
+    def test_prompt_version_is_part_of_the_key(self):
+        """Test that bumping the prompt version invalidates every entry."""
+        before = self.key(text="pizza")
+        with patch("food_tracking.estimation.PROMPT_VERSION", 999):
+            self.assertNotEqual(self.key(text="pizza"), before)
+
+    def test_model_is_part_of_the_key(self):
+        """Test that switching models invalidates every entry."""
+        before = self.key(text="pizza")
+        with patch("food_tracking.estimation.ESTIMATION_MODEL", "another-model"):
+            self.assertNotEqual(self.key(text="pizza"), before)
+
+
+class EstimateCacheTests(TestCase):
+    """Tests for storing, reusing and evicting estimates."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="cacher", password="testpass")
+        cls.other_user = User.objects.create_user(username="other", password="pw")
+
+    def submit(self, user=None, text="Two eggs"):
+        """Submit a text estimate."""
+        return estimate_jobs.submit_job(
+            user or self.user, EstimateJobKind.TEXT, {"text": text}
+        )
+
+    @patch("food_tracking.estimation.estimate_from_text", return_value=APPLE)
+    def test_repeated_input_is_answered_from_the_cache(self, mock_estimate):
+        """Test that the second identical submission is done at once, without the model."""
+        self.submit()
+        estimate_jobs.process_pending_jobs()
+        job = self.submit(text="two eggs ")
+        self.assertEqual(job.status, EstimateJobStatus.DONE)
+        self.assertEqual(job.to_dict_for_api()["estimate"], APPLE.to_dict())
+        self.assertEqual(mock_estimate.call_count, 1)
+
+    @patch("food_tracking.estimation.estimate_from_text", return_value=APPLE)
+    def test_cache_is_per_user(self, mock_estimate):
+        """Test that one user's estimates are never served to another."""
+        self.submit()
+        estimate_jobs.process_pending_jobs()
+        self.assertEqual(
+            self.submit(user=self.other_user).status, EstimateJobStatus.PENDING
+        )
+
+    @patch("food_tracking.estimation.estimate_from_text")
+    def test_failures_are_not_cached(self, mock_estimate):
+        """Test that a failed estimate is retried next time."""
+        mock_estimate.side_effect = ValueError("bad")
+        self.submit()
+        estimate_jobs.process_pending_jobs()
+        self.assertEqual(self.submit().status, EstimateJobStatus.PENDING)
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are neither used nor kept."""
+        key = estimate_cache.cache_key(EstimateJobKind.TEXT, {"text": "Two eggs"})
+        with freeze_time(timezone.now() - timedelta(days=ESTIMATE_CACHE_TTL_DAYS + 1)):
+            estimate_cache.store_result(self.user.id, key, APPLE.to_dict())
+        self.assertIsNone(estimate_cache.get_cached_result(self.user, key))
+        self.assertEqual(estimate_cache.delete_expired_entries(), 1)
+
+    @patch("food_tracking.estimate_cache.ESTIMATE_CACHE_MAX_ENTRIES_PER_USER", 2)
+    def test_least_recently_used_entries_are_evicted(self):
+        """Test that storing past the cap drops the entry used longest ago."""
+        start = timezone.now()
+        for minutes, key in enumerate(["a", "b"]):
+            with freeze_time(start + timedelta(minutes=minutes)):
+                estimate_cache.store_result(self.user.id, key, APPLE.to_dict())
+        with freeze_time(start + timedelta(minutes=2)):
+            estimate_cache.get_cached_result(self.user, "a")
+        with freeze_time(start + timedelta(minutes=3)):
+            estimate_cache.store_result(self.user.id, "c", APPLE.to_dict())
+        self.assertEqual(
+            set(CachedEstimate.objects.values_list("key", flat=True)), {"a", "c"}
+        )
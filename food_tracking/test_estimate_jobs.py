@@ -0,0 +1,186 @@
+"""Unit tests for the queue of calorie estimate jobs."""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from freezegun import freeze_time
+
+from food_tracking import estimate_jobs
+from food_tracking.constants import (
+    ESTIMATE_JOB_DEADLINE_SECONDS,
+    ESTIMATE_JOB_RETENTION_HOURS,
+    ESTIMATE_JOB_TIMEOUT_ERROR,
+    EstimateJobKind,
+    EstimateJobStatus,
+)
+from food_tracking.estimation import EstimateResult
+from food_tracking.models import EstimateJob
+
+APPLE = EstimateResult(description="Apple", calories=95, confidence="high")
+
+
+class EstimateJobQueueTests(TestCase):
+    """Tests for claiming, running and expiring jobs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="jobuser", password="testpass")
+
+    def submit(self, text: str = "an apple") -> EstimateJob:
+        """Queue a text estimate."""
+        return estimate_jobs.submit_job(self.user, EstimateJobKind.TEXT, {"text": text})
+
+    def test_jobs_are_claimed_oldest_first(self):
+        """Test that the worker runs jobs in the order they were submitted."""
+        first = self.submit()
+        self.submit()
+        claimed = estimate_jobs.claim_next_job()
+        self.assertEqual(claimed, first)
+        self.assertEqual(claimed.status, EstimateJobStatus.RUNNING)
+
+    def test_empty_queue(self):
+        """Test that claiming from an empty queue returns None."""
+        self.assertIsNone(estimate_jobs.claim_next_job())
+
+    @patch("food_tracking.estimation.estimate_from_text", return_value=APPLE)
+    def test_process_pending_jobs_stores_results(self, mock_estimate):
+        """Test that every queued job is run and its estimate stored."""
+        jobs = [self.submit("an apple"), self.submit("a pear")]
+        self.assertEqual(estimate_jobs.process_pending_jobs(), 2)
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, EstimateJobStatus.DONE)
+            self.assertEqual(job.result["calories"], 95)
+            self.assertIsNotNone(job.finished_at)
+
+    @patch("food_tracking.estimation.estimate_from_text")
+    def test_token_usage_is_stored(self, mock_estimate):
+        """Test that the model call's token counts, prompt cache included, are kept on the job."""
+        usage = {"input_tokens": 20, "cache_read_input_tokens": 1500}
+        mock_estimate.return_value = EstimateResult(
+            description="Apple", calories=95, confidence="high", usage=usage
+        )
+        job = self.submit()
+        estimate_jobs.process_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.usage, usage)
+        self.assertNotIn("usage", job.result)
+
+    @patch("food_tracking.estimation.estimate_from_text")
+    def test_overdue_jobs_are_not_run(self, mock_estimate):
+        """Test that a job nobody is waiting for anymore is never sent to the model."""
+        job = self.submit()
+        with freeze_time(
+            timezone.now() + timedelta(seconds=ESTIMATE_JOB_DEADLINE_SECONDS + 1)
+        ):
+            self.assertEqual(estimate_jobs.process_pending_jobs(), 0)
+            self.assertEqual(estimate_jobs.expire_overdue_jobs(), 1)
+        mock_estimate.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.status, EstimateJobStatus.FAILED)
+        self.assertEqual(job.error, ESTIMATE_JOB_TIMEOUT_ERROR)
+
+    def test_expired_job_keeps_its_timeout(self):
+        """Test that a result arriving after the job was expired doesn't overwrite it."""
+        job = self.submit()
+        estimate_jobs.claim_next_job()
+        EstimateJob.objects.filter(id=job.id).update(
+            status=EstimateJobStatus.FAILED, error=ESTIMATE_JOB_TIMEOUT_ERROR
+        )
+        self.assertFalse(
+            estimate_jobs.finish_job(job, status=EstimateJobStatus.DONE, result={})
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, EstimateJobStatus.FAILED)
+
+    @patch("food_tracking.estimation.estimate_from_text")
+    def test_streamed_items_are_saved_while_running(self, mock_estimate):
+        """Test that items reported by the model show up on the running job."""
+        job = self.submit()
+        seen = []
+
+        def estimate(text, on_items, **kwargs):
+            on_items([{"name": "apple", "calories": 95}])
+            seen.append(EstimateJob.objects.get(id=job.id).to_dict_for_api())
+            return APPLE
+
+        mock_estimate.side_effect = estimate
+        estimate_jobs.process_pending_jobs()
+        self.assertEqual(seen[0]["status"], "running")
+        self.assertEqual(seen[0]["items"], [{"name": "apple", "calories": 95}])
+        job.refresh_from_db()
+        self.assertNotIn("items", job.to_dict_for_api())
+
+    def test_delete_old_jobs(self):
+        """Test that jobs past the retention period are deleted."""
+        with freeze_time(
+            timezone.now() - timedelta(hours=ESTIMATE_JOB_RETENTION_HOURS + 1)
+        ):
+            self.submit()
+        recent = self.submit()
+        self.assertEqual(estimate_jobs.delete_old_jobs(), 1)
+        self.assertEqual(list(EstimateJob.objects.all()), [recent])
+
+    @patch("food_tracking.estimation.estimate_from_text", return_value=APPLE)
+    def test_worker_command_once(self, mock_estimate):
+        """Test that run_estimate_worker --once drains the queue and exits."""
+        self.submit()
+        out = StringIO()
+        call_command("run_estimate_worker", "--once", stdout=out)
+        self.assertIn("Ran 1 estimate jobs.", out.getvalue())
+
+
+class EstimateJobViewTests(TestCase):
+    """Tests for polling a job."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="poller", password="testpass")
+        cls.other_user = User.objects.create_user(username="other", password="testpass")
+
+    def setUp(self):
+        """Set up test client and login."""
+        self.client = Client()
+        self.client.login(username="poller", password="testpass")
+
+    def poll(self, job: EstimateJob):
+        """GET the job's status."""
+        return self.client.get(reverse("food_tracking:estimate_job", args=[job.id]))
+
+    def test_pending_job(self):
+        """Test that a job the worker hasn't reached yet reports pending."""
+        job = estimate_jobs.submit_job(self.user, EstimateJobKind.TEXT, {"text": "x"})
+        response = self.poll(job)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["job"], {"id": job.id, "status": "pending"})
+
+    def test_overdue_job_is_reported_failed(self):
+        """Test that polling past the deadline reports a timeout, even if no worker is running."""
+        job = estimate_jobs.submit_job(self.user, EstimateJobKind.TEXT, {"text": "x"})
+        with freeze_time(
+            timezone.now() + timedelta(seconds=ESTIMATE_JOB_DEADLINE_SECONDS + 1)
+        ):
+            data = self.poll(job).json()["job"]
+        self.assertEqual(data["status"], "failed")
+        self.assertEqual(data["error"], ESTIMATE_JOB_TIMEOUT_ERROR)
+
+    def test_other_users_jobs_are_hidden(self):
+        """Test that a user can't poll someone else's job."""
+        job = estimate_jobs.submit_job(
+            self.other_user, EstimateJobKind.TEXT, {"text": "x"}
+        )
+        self.assertEqual(self.poll(job).status_code, 404)
+
+    def test_poll_requires_login(self):
+        """Test that polling requires login."""
+        job = estimate_jobs.submit_job(self.user, EstimateJobKind.TEXT, {"text": "x"})
+        self.client.logout()
+        self.assertEqual(self.poll(job).status_code, 302)
@@ -1,22 +1,34 @@
 """Unit tests for the AI calorie estimation service."""
 
+import json
 import os
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from django.test import TestCase
 
 from food_tracking import estimation
 from food_tracking.estimation import EstimateResult
+from http_clients import clients
 
 
 class GetClientTests(TestCase):
     """Tests for Anthropic client construction."""
 
-    @patch("food_tracking.estimation.Anthropic")
+    def setUp(self):
+        clients.get_anthropic_client.cache_clear()
+        self.addCleanup(clients.get_anthropic_client.cache_clear)
+
+    @patch("http_clients.clients.Anthropic")
     def test_get_client_uses_api_key(self, mock_anthropic):
         with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "secret"}):
             estimation._get_client()
-        mock_anthropic.assert_called_once_with(api_key="secret")
+        self.assertEqual(mock_anthropic.call_args.kwargs["api_key"], "secret")
+
+    @patch("http_clients.clients.Anthropic")
+    def test_get_client_reuses_the_client(self, mock_anthropic):
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "secret"}):
+            self.assertIs(estimation._get_client(), estimation._get_client())
+        mock_anthropic.assert_called_once()
 
 
 def _make_tool_use_response(
@@ -38,6 +50,12 @@ def _make_tool_use_response(
     response = Mock()
     response.content = [block]
     response.stop_reason = "tool_use"
+    response.usage = Mock(
+        input_tokens=40,
+        output_tokens=300,
+        cache_creation_input_tokens=1500,
+        cache_read_input_tokens=None,
+    )
     return response
 
 
@@ -295,3 +313,130 @@ class RefinementTests(TestCase):
         self.assertEqual(len(messages), 3)
         self.assertIn("50%", messages[0]["content"][0]["text"])
         self.assertIn("turkey", messages[2]["content"])
+
+
+class PromptCachingTests(TestCase):
+    """Tests for the prompt cache breakpoints and token usage."""
+
+    def _create_kwargs(self, mock_get_client, **estimate_kwargs) -> dict:
+        """Run a photo estimate against a fake client and return the request sent."""
+        client = Mock()
+        client.messages.create.return_value = _make_tool_use_response()
+        mock_get_client.return_value = client
+        estimation.estimate_from_image(b"img", "image/png", **estimate_kwargs)
+        _, kwargs = client.messages.create.call_args
+        return kwargs
+
+    @patch("food_tracking.estimation._get_client")
+    def test_system_prompt_and_input_are_cacheable(self, mock_get_client):
+        kwargs = self._create_kwargs(mock_get_client)
+        self.assertEqual(kwargs["system"][-1]["cache_control"], {"type": "ephemeral"})
+        content = kwargs["messages"][0]["content"]
+        self.assertEqual(content[-1]["cache_control"], {"type": "ephemeral"})
+        self.assertNotIn("cache_control", content[0])
+
+    @patch("food_tracking.estimation._get_client")
+    def test_refinement_starts_with_the_cached_prefix(self, mock_get_client):
+        fresh = self._create_kwargs(mock_get_client)
+        refinement = self._create_kwargs(
+            mock_get_client,
+            previous_estimate={"description": "Salad", "calories": 300},
+            correction="no dressing",
+        )
+        self.assertEqual(refinement["system"], fresh["system"])
+        self.assertEqual(refinement["tools"], fresh["tools"])
+        self.assertEqual(refinement["messages"][0], fresh["messages"][0])
+
+    @patch("food_tracking.estimation._get_client")
+    def test_usage_is_recorded(self, mock_get_client):
+        client = Mock()
+        client.messages.create.return_value = _make_tool_use_response()
+        mock_get_client.return_value = client
+        result = estimation.estimate_from_text("salad")
+        self.assertEqual(
+            result.usage,
+            {
+                "input_tokens": 40,
+                "output_tokens": 300,
+                "cache_creation_input_tokens": 1500,
+                "cache_read_input_tokens": 0,
+            },
+        )
+        self.assertNotIn("usage", result.to_dict())
+
+
+class StreamingEstimateTests(TestCase):
+    """Tests for streaming the estimate's breakdown through on_items."""
+
+    def _stream(self, chunks: list[str], final_response: Mock) -> MagicMock:
+        """Build a fake messages.stream() context that yields tool input chunks."""
+        thinking_event = Mock(type="thinking")
+        events = [thinking_event] + [
+            Mock(type="input_json", partial_json=chunk) for chunk in chunks
+        ]
+        stream = MagicMock()
+        stream.__enter__.return_value = stream
+        stream.__iter__.return_value = iter(events)
+        stream.get_final_message.return_value = final_response
+        return stream
+
+    @patch("food_tracking.estimation._get_client")
+    def test_items_are_reported_as_they_complete(self, mock_get_client):
+        chunks = [
+            '{"description": "Burrito bowl", "items": [{"name": "rice", ',
+            '"calories": 200}, {"name": "be',
+            'ans", "calories": 150}',
+            '], "total_calories": 350, "confidence": "medium"}',
+        ]
+        client = Mock()
+        client.messages.stream.return_value = self._stream(
+            chunks, _make_tool_use_response(total_calories=350)
+        )
+        mock_get_client.return_value = client
+        reported = []
+
+        result = estimation.estimate_from_text("burrito bowl", on_items=reported.append)
+
+        self.assertEqual(
+            reported,
+            [
+                [{"name": "rice", "calories": 200}],
+                [
+                    {"name": "rice", "calories": 200},
+                    {"name": "beans", "calories": 150},
+                ],
+            ],
+        )
+        self.assertEqual(result.calories, 350)
+        client.messages.create.assert_not_called()
+
+    @patch("food_tracking.estimation._get_client")
+    def test_streamed_truncation_raises_value_error(self, mock_get_client):
+        response = _make_tool_use_response()
+        response.stop_reason = "max_tokens"
+        client = Mock()
+        client.messages.stream.return_value = self._stream([], response)
+        mock_get_client.return_value = client
+
+        with self.assertRaises(ValueError):
+            estimation.estimate_from_text("feast", on_items=lambda items: None)
+
+    def test_complete_items_ignores_brackets_in_strings(self):
+        partial = '{"items": [{"name": "rice [white], cooked", "calories": 200}, {"na'
+        items, _ = estimation._complete_items(partial)
+        self.assertEqual(items, [{"name": "rice [white], cooked", "calories": 200}])
+
+    def test_complete_items_before_items_start(self):
+        self.assertEqual(estimation._complete_items('{"description": "Bo'), ([], None))
+
+    def test_complete_items_resumes_after_the_last_item(self):
+        partial = '{"items": [{"name": "rice", "calories": 200}, {"name": "be'
+        items, position = estimation._complete_items(partial)
+        self.assertEqual(items, [{"name": "rice", "calories": 200}])
+        partial += 'ans", "calories": 150}]'
+        with patch.object(
+            json.JSONDecoder, "raw_decode", wraps=json.JSONDecoder().raw_decode
+        ) as mock_decode:
+            items, _ = estimation._complete_items(partial, position)
+        self.assertEqual(items, [{"name": "beans", "calories": 150}])
+        mock_decode.assert_called_once_with(partial, position)
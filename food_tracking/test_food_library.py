@@ -0,0 +1,204 @@
+"""Unit tests for the personal food library."""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from food_tracking import food_library
+from food_tracking.models import Consumption, Food, LibraryFood
+
+
+class FoodLibraryTests(TestCase):
+    """Tests for keeping the library in step with ad-hoc entries, and searching it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="librarian", password="testpass")
+        cls.other_user = User.objects.create_user(username="other", password="testpass")
+
+    def log(self, description: str, calories: int, user=None, **kwargs) -> Consumption:
+        """Log an ad-hoc entry."""
+        return Consumption.objects.create(
+            user=user or self.user,
+            description=description,
+            calories=Decimal(calories),
+            **kwargs,
+        )
+
+    def test_repeated_entries_share_one_library_food(self):
+        """Test that logging the same food (give or take case and spacing) counts it again."""
+        self.log("Usual oatmeal", 300)
+        self.log("usual  OATMEAL", 320)
+        food = LibraryFood.objects.get(user=self.user)
+        self.assertEqual(food.times_logged, 2)
+        self.assertEqual(food.description, "usual  OATMEAL")
+        self.assertEqual(food.calories, Decimal("320"))
+
+    def test_backdated_entry_keeps_the_latest_calories(self):
+        """Test that logging for an earlier time doesn't overwrite newer calories."""
+        self.log("Usual oatmeal", 300)
+        self.log("Usual oatmeal", 250, consumed_at=timezone.now() - timedelta(days=3))
+        food = LibraryFood.objects.get(user=self.user)
+        self.assertEqual(food.calories, Decimal("300"))
+        self.assertEqual(food.times_logged, 2)
+
+    def test_grid_entries_are_not_collected(self):
+        """Test that entries of a predefined Food don't go into the library."""
+        food = Food.objects.create(
+            name="Test Food L",
+            icon="🌰",
+            serving_size="1 oz",
+            calories_per_serving=Decimal("189.00"),
+        )
+        Consumption.objects.create(user=self.user, food=food)
+        self.assertFalse(LibraryFood.objects.exists())
+
+    def test_deleting_entries_uncounts_them(self):
+        """Test that a food leaves the library once every entry of it is deleted."""
+        first = self.log("Usual oatmeal", 300)
+        second = self.log("Usual oatmeal", 300)
+        first.delete()
+        self.assertEqual(LibraryFood.objects.get(user=self.user).times_logged, 1)
+        second.delete()
+        self.assertFalse(LibraryFood.objects.exists())
+
+    def test_search_matches_substrings_and_typos(self):
+        """Test that search finds foods by part of their name or a misspelling."""
+        self.log("Usual oatmeal with berries", 350)
+        self.log("Chicken burrito bowl", 700)
+        for query in ("oatmeal", "OATMEAL", "otmeal", "berries oatmeal"):
+            with self.subTest(query=query):
+                matches = food_library.search(self.user, query)
+                self.assertEqual(
+                    [food.description for food in matches],
+                    ["Usual oatmeal with berries"],
+                )
+
+    def test_search_is_per_user(self):
+        """Test that users only find their own foods."""
+        self.log("Usual oatmeal", 300, user=self.other_user)
+        self.assertEqual(food_library.search(self.user, "oatmeal"), [])
+
+    def test_empty_search_lists_the_most_logged_foods(self):
+        """Test that with nothing typed, the most logged foods come first."""
+        self.log("Salad", 300)
+        self.log("Oatmeal", 300)
+        self.log("Oatmeal", 300)
+        self.assertEqual(
+            [food.description for food in food_library.search(self.user, " ")],
+            ["Oatmeal", "Salad"],
+        )
+
+    def test_rebuild_matches_incremental_updates(self):
+        """Test that rebuild_food_library recomputes the same library from scratch."""
+        self.log("Oatmeal", 300, consumed_at=timezone.now() - timedelta(days=1))
+        self.log("oatmeal", 320)
+        self.log("Salad", 250, user=self.other_user)
+        expected = set(
+            LibraryFood.objects.values_list(
+                "user_id", "key", "description", "calories", "times_logged"
+            )
+        )
+        LibraryFood.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_food_library", stdout=out)
+        self.assertIn("Rebuilt 2 library foods.", out.getvalue())
+        self.assertEqual(
+            set(
+                LibraryFood.objects.values_list(
+                    "user_id", "key", "description", "calories", "times_logged"
+                )
+            ),
+            expected,
+        )
+
+
+class FoodLibraryViewTests(TestCase):
+    """Tests for searching the library and re-logging from it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="relogger", password="testpass")
+        cls.other_user = User.objects.create_user(username="other", password="testpass")
+
+    def setUp(self):
+        """Set up test client and login."""
+        # Pages are cached across requests (and tests); start clean.
+        cache.clear()
+        self.client = Client()
+        self.client.login(username="relogger", password="testpass")
+        Consumption.objects.create(
+            user=self.user, description="Usual oatmeal", calories=Decimal("300")
+        )
+        self.food = LibraryFood.objects.get(user=self.user)
+
+    def test_search(self):
+        """Test that the library endpoint returns matching foods."""
+        response = self.client.get(
+            reverse("food_tracking:library_foods"), {"q": "oatmeal"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["foods"],
+            [
+                {
+                    "id": self.food.id,
+                    "description": "Usual oatmeal",
+                    "calories": 300.0,
+                    "times_logged": 1,
+                }
+            ],
+        )
+
+    def test_relog_copies_the_calories(self):
+        """Test that re-logging creates another ad-hoc entry and counts it."""
+        response = self.client.post(
+            reverse("food_tracking:log_library_food"),
+            {"library_food_id": self.food.id},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["consumption"]["total_calories"], 300.0)
+        self.assertEqual(
+            Consumption.objects.filter(description="Usual oatmeal").count(), 2
+        )
+        self.food.refresh_from_db()
+        self.assertEqual(self.food.times_logged, 2)
+
+    def test_relog_other_users_food_returns_404(self):
+        """Test that a user can't log from someone else's library."""
+        other_food = LibraryFood.objects.create(
+            user=self.other_user,
+            key="toast",
+            description="Toast",
+            calories=Decimal("100"),
+            times_logged=1,
+            last_logged_at=timezone.now(),
+        )
+        response = self.client.post(
+            reverse("food_tracking:log_library_food"),
+            {"library_food_id": other_food.id},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_home_lists_library_foods_and_refreshes(self):
+        """Test that the home page offers the library and picks up newly logged foods."""
+        response = self.client.get(reverse("food_tracking:home"))
+        self.assertContains(response, "logLibraryFood(%d)" % self.food.id)
+        # Logged on another day, so only the library's tag tells the page to change.
+        Consumption.objects.create(
+            user=self.user,
+            description="Chicken burrito bowl",
+            calories=Decimal("700"),
+            consumed_at=timezone.now() - timedelta(days=5),
+        )
+        response = self.client.get(reverse("food_tracking:home"))
+        self.assertContains(response, "Chicken burrito bowl")
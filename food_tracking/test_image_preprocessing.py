@@ -0,0 +1,77 @@
+"""Unit tests for shrinking food photos before they're sent to the model."""
+
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from PIL import Image
+
+from food_tracking.constants import ESTIMATE_IMAGE_MAX_SIDE
+from food_tracking.image_preprocessing import prepare_image
+
+EXIF_ORIENTATION = 0x0112
+# EXIF orientation meaning "rotate 90° clockwise to display".
+ROTATE_90_CLOCKWISE = 6
+
+
+def make_photo(size=(200, 100), image_format="JPEG", exif=None) -> bytes:
+    """Encode a solid-colour test photo."""
+    image = Image.new("RGB", size, "red")
+    buffer = io.BytesIO()
+    options = {"exif": exif} if exif is not None else {}
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def decode(data: bytes) -> Image.Image:
+    """Open encoded image bytes."""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+class PrepareImageTests(SimpleTestCase):
+    """Tests for prepare_image."""
+
+    def prepare(self, data: bytes) -> tuple[bytes, str]:
+        """Run an upload through prepare_image."""
+        return prepare_image(SimpleUploadedFile("meal", data))
+
+    def test_small_plain_jpeg_is_passed_through(self):
+        """Test that a JPEG already fit for the model isn't re-encoded."""
+        photo = make_photo()
+        self.assertEqual(self.prepare(photo), (photo, "image/jpeg"))
+
+    def test_large_photo_is_downscaled(self):
+        """Test that the longer side is scaled down to the limit, keeping the aspect ratio."""
+        data, _ = self.prepare(make_photo((1000, 4000)))
+        self.assertEqual(decode(data).size, (256, ESTIMATE_IMAGE_MAX_SIDE))
+
+    def test_other_formats_become_jpeg(self):
+        """Test that PNG and WebP uploads are re-encoded as JPEG."""
+        for image_format in ("PNG", "WEBP"):
+            data, media_type = self.prepare(make_photo(image_format=image_format))
+            self.assertEqual(media_type, "image/jpeg")
+            self.assertEqual(decode(data).format, "JPEG")
+
+    def test_transparency_is_flattened_onto_white(self):
+        """Test that transparent pixels come out white rather than black."""
+        buffer = io.BytesIO()
+        Image.new("RGBA", (50, 50), (0, 0, 0, 0)).save(buffer, format="PNG")
+        data, _ = self.prepare(buffer.getvalue())
+        red, green, blue = decode(data).getpixel((0, 0))
+        self.assertGreater(min(red, green, blue), 240)
+
+    def test_exif_orientation_is_applied_and_stripped(self):
+        """Test that a sideways phone photo comes out upright and without EXIF."""
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = ROTATE_90_CLOCKWISE
+        data, _ = self.prepare(make_photo((200, 100), exif=exif.tobytes()))
+        image = decode(data)
+        self.assertEqual(image.size, (100, 200))
+        self.assertEqual(len(image.getexif()), 0)
+
+    def test_unreadable_upload(self):
+        """Test that something that isn't an image is rejected with a message for the user."""
+        with self.assertRaisesMessage(ValueError, "Could not read that photo"):
+            self.prepare(b"fakebytes")
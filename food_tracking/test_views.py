@@ -1,26 +1,56 @@
 """Unit tests for food_tracking app views."""
 
+import io
+import json
+import random
 from datetime import date, timedelta
 from decimal import Decimal
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
+from PIL import Image
 
+from food_tracking.active_calories import (
+    get_active_calories_for_date,
+    get_active_calories_for_range,
+)
+from food_tracking.constants import (
+    ACTIVE_CALORIES_WINDOW_DAYS,
+    DEFAULT_ACTIVE_CALORIES_ESTIMATE,
+    ESTIMATE_IMAGE_MAX_SIDE,
+    MIN_LOGGED_DAYS_FOR_ESTIMATE,
+)
+from food_tracking.dates import get_pacific_day_bounds
+from food_tracking.estimate_jobs import process_pending_jobs
 from food_tracking.estimation import EstimateResult
-from food_tracking.models import CalorieTarget, Consumption, DailyActiveCalories, Food
+from food_tracking.models import (
+    CalorieTarget,
+    Consumption,
+    DailyActiveCalories,
+    EstimateJob,
+    Food,
+)
+from food_tracking.test_image_preprocessing import make_photo
 from food_tracking.views import (
     calculate_totals_by_period,
-    get_active_calories_for_date,
     get_active_foods,
-    get_pacific_day_bounds,
 )
 
 
+def run_queued_estimate(client: Client, response) -> dict:
+    """Run the job an estimate request queued, as the worker would, and poll it."""
+    process_pending_jobs()
+    job_id = response.json()["job"]["id"]
+    poll = client.get(reverse("food_tracking:estimate_job", args=[job_id]))
+    return poll.json()["job"]
+
+
 class HelperFunctionTests(TestCase):
     """Tests for helper functions in views.py."""
 
@@ -152,6 +182,50 @@ class HelperFunctionTests(TestCase):
         self.assertEqual(len(totals), 1)
         self.assertEqual(totals[0]["period"], "2024-01-12")
 
+    @freeze_time("2025-01-06 20:00:00")
+    def test_calculate_totals_by_period_labels_iso_weeks(self):
+        """Test that weeks are labelled by ISO year and week, across New Year."""
+        for day in ("2024-12-29", "2024-12-30", "2025-01-01", "2025-01-06"):
+            with freeze_time(f"{day} 20:00:00"):
+                Consumption.objects.create(
+                    user=self.user, food=self.food1, quantity=Decimal("1.0")
+                )
+
+        totals = calculate_totals_by_period(self.user.id, days=14, period="week")
+
+        self.assertEqual(
+            totals,
+            [
+                {"period": "2025-W02", "total_calories": Decimal("196.00")},
+                {"period": "2025-W01", "total_calories": Decimal("392.00")},
+                {"period": "2024-W52", "total_calories": Decimal("196.00")},
+            ],
+        )
+
+    @freeze_time("2024-01-15 12:00:00")
+    def test_calculate_totals_by_period_is_one_query(self):
+        """Test that the totals come back from a single grouped query."""
+        for day in range(1, 15):
+            with freeze_time(f"2024-01-{day:02d} 20:00:00"):
+                Consumption.objects.create(
+                    user=self.user, food=self.food1, quantity=Decimal("1.0")
+                )
+
+        with self.assertNumQueries(1):
+            totals = calculate_totals_by_period(self.user.id, days=30, period="month")
+        self.assertEqual(
+            totals, [{"period": "2024-01", "total_calories": Decimal("2744.00")}]
+        )
+
+    def test_calculate_totals_by_period_defaults_to_day(self):
+        """Test that an unknown period groups by day."""
+        Consumption.objects.create(
+            user=self.user, food=self.food1, quantity=Decimal("1.0")
+        )
+        totals = calculate_totals_by_period(self.user.id, days=7, period="year")
+        self.assertEqual(len(totals), 1)
+        self.assertRegex(totals[0]["period"], r"^\d{4}-\d{2}-\d{2}$")
+
 
 class FoodTrackingViewTests(TestCase):
     """Tests for food_tracking views."""
@@ -180,6 +254,8 @@ class FoodTrackingViewTests(TestCase):
     def setUp(self):
         """Set up test client and login."""
         self.client = Client()
+        # Cached pages would otherwise outlive the rows the previous test rolled back.
+        cache.clear()
         self.client.login(username="testuser", password="testpass")
 
     def test_home_requires_login(self):
@@ -206,6 +282,32 @@ class FoodTrackingViewTests(TestCase):
         self.assertContains(response, "Test Food H")
         self.assertContains(response, "2.0")
 
+    def test_home_is_cached_per_user_until_consumption_changes(self):
+        """Test that a repeat visit is served from the cache and logging food invalidates it."""
+        self.client.get(reverse("food_tracking:home"))
+        self.client.get(reverse("food_tracking:home"))
+        # Only the session and user lookups that tell whose page to serve.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("food_tracking:home"))
+        self.assertNotContains(response, "3.5")
+
+        Consumption.objects.create(
+            user=self.user, food=self.food1, quantity=Decimal("3.5")
+        )
+        response = self.client.get(reverse("food_tracking:home"))
+        self.assertContains(response, "3.5")
+
+    def test_home_cache_is_not_shared_between_users(self):
+        """Test that one user's cached page is never served to another."""
+        Consumption.objects.create(
+            user=self.user, food=self.food1, quantity=Decimal("3.5")
+        )
+        self.client.get(reverse("food_tracking:home"))
+        User.objects.create_user(username="otheruser", password="testpass")
+        self.client.login(username="otheruser", password="testpass")
+        response = self.client.get(reverse("food_tracking:home"))
+        self.assertNotContains(response, "3.5")
+
     @freeze_time("2024-01-15 10:00:00")
     def test_home_shows_only_today_consumption(self):
         """Test that home view shows only today's consumption, not older items."""
@@ -497,6 +599,8 @@ class EstimateViewTests(TestCase):
 
     def setUp(self):
         self.client = Client()
+        # Cached pages would otherwise outlive the rows the previous test rolled back.
+        cache.clear()
         self.client.login(username="estuser", password="testpass")
 
     def test_estimate_requires_login(self):
@@ -517,12 +621,14 @@ class EstimateViewTests(TestCase):
         response = self.client.post(
             reverse("food_tracking:estimate"), {"text": "one apple"}
         )
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertTrue(data["success"])
-        self.assertEqual(data["estimate"]["calories"], 95)
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()["success"])
+        mock_estimate.assert_not_called()
+        job = run_queued_estimate(self.client, response)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["estimate"]["calories"], 95)
         mock_estimate.assert_called_once_with(
-            "one apple", previous_estimate=None, correction=""
+            "one apple", previous_estimate=None, correction="", on_items=ANY
         )
 
     @patch("food_tracking.views.estimation.estimate_from_image")
@@ -530,28 +636,66 @@ class EstimateViewTests(TestCase):
         mock_estimate.return_value = EstimateResult(
             description="Pizza", calories=400, confidence="medium", items=[]
         )
-        upload = SimpleUploadedFile("meal.jpg", b"fakebytes", content_type="image/jpeg")
+        photo = make_photo()
+        upload = SimpleUploadedFile("meal.jpg", photo, content_type="image/jpeg")
         response = self.client.post(
             reverse("food_tracking:estimate"), {"image": upload, "note": "big slice"}
         )
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue(response.json()["success"])
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(run_queued_estimate(self.client, response)["status"], "done")
         args, _ = mock_estimate.call_args
+        self.assertEqual(args[0], photo)
         self.assertEqual(args[1], "image/jpeg")
         self.assertEqual(args[2], "big slice")
 
+    @patch("food_tracking.views.estimation.estimate_from_image")
+    def test_estimate_from_image_downscales_large_photos(self, mock_estimate):
+        mock_estimate.return_value = EstimateResult(
+            description="Pizza", calories=400, confidence="medium", items=[]
+        )
+        upload = SimpleUploadedFile(
+            "meal.png", make_photo((3000, 2000), "PNG"), content_type="image/png"
+        )
+        response = self.client.post(
+            reverse("food_tracking:estimate"), {"image": upload}
+        )
+        run_queued_estimate(self.client, response)
+        args, _ = mock_estimate.call_args
+        self.assertEqual(args[1], "image/jpeg")
+        with Image.open(io.BytesIO(args[0])) as sent:
+            self.assertEqual(sent.format, "JPEG")
+            self.assertEqual(sent.size, (ESTIMATE_IMAGE_MAX_SIDE, 683))
+
+    def test_estimate_unreadable_image_returns_400(self):
+        upload = SimpleUploadedFile("meal.jpg", b"fakebytes", content_type="image/jpeg")
+        response = self.client.post(
+            reverse("food_tracking:estimate"), {"image": upload}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EstimateJob.objects.exists())
+
     def test_estimate_without_input_returns_400(self):
         response = self.client.post(reverse("food_tracking:estimate"))
         self.assertEqual(response.status_code, 400)
         self.assertFalse(response.json()["success"])
 
+    def test_estimate_unsupported_image_type_returns_400(self):
+        upload = SimpleUploadedFile("meal.bmp", b"fakebytes", content_type="image/bmp")
+        response = self.client.post(
+            reverse("food_tracking:estimate"), {"image": upload}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EstimateJob.objects.exists())
+
     @patch("food_tracking.views.estimation.estimate_from_text")
-    def test_estimate_value_error_returns_400(self, mock_estimate):
+    def test_estimate_value_error_fails_job(self, mock_estimate):
         mock_estimate.side_effect = ValueError("bad")
         response = self.client.post(
             reverse("food_tracking:estimate"), {"text": "weird"}
         )
-        self.assertEqual(response.status_code, 400)
+        job = run_queued_estimate(self.client, response)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "bad")
 
     @patch("food_tracking.views.estimation.estimate_recipe")
     def test_estimate_recipe_success(self, mock_estimate):
@@ -562,10 +706,15 @@ class EstimateViewTests(TestCase):
             reverse("food_tracking:estimate_recipe"),
             {"recipe_text": "big recipe", "fraction": "0.25"},
         )
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue(response.json()["success"])
+        self.assertEqual(response.status_code, 202)
+        job = run_queued_estimate(self.client, response)
+        self.assertEqual(job["estimate"]["calories"], 500)
         mock_estimate.assert_called_once_with(
-            "big recipe", 0.25, previous_estimate=None, correction=""
+            "big recipe",
+            0.25,
+            previous_estimate=None,
+            correction="",
+            on_items=ANY,
         )
 
     def test_estimate_recipe_missing_text_returns_400(self):
@@ -678,31 +827,38 @@ class EstimateViewErrorPathTests(TestCase):
 
     def setUp(self):
         self.client = Client()
+        # Cached pages would otherwise outlive the rows the previous test rolled back.
+        cache.clear()
         self.client.login(username="erruser", password="testpass")
 
-    @patch("food_tracking.views.estimation.estimate_from_text")
-    def test_estimate_unexpected_error_returns_500(self, mock_estimate):
-        mock_estimate.side_effect = RuntimeError("boom")
+    @patch("food_tracking.estimate_jobs.submit_job")
+    def test_estimate_unexpected_error_returns_500(self, mock_submit):
+        mock_submit.side_effect = RuntimeError("boom")
         response = self.client.post(reverse("food_tracking:estimate"), {"text": "food"})
         self.assertEqual(response.status_code, 500)
 
     @patch("food_tracking.views.estimation.estimate_recipe")
-    def test_estimate_recipe_unexpected_error_returns_500(self, mock_estimate):
+    def test_estimate_recipe_unexpected_error_fails_job_generically(
+        self, mock_estimate
+    ):
         mock_estimate.side_effect = RuntimeError("boom")
         response = self.client.post(
             reverse("food_tracking:estimate_recipe"),
             {"recipe_text": "r", "fraction": "0.5"},
         )
-        self.assertEqual(response.status_code, 500)
+        with self.assertLogs(level="ERROR"):
+            job = run_queued_estimate(self.client, response)
+        self.assertEqual(job["status"], "failed")
+        self.assertNotIn("boom", job["error"])
 
     @patch("food_tracking.views.estimation.estimate_recipe")
-    def test_estimate_recipe_value_error_returns_400(self, mock_estimate):
+    def test_estimate_recipe_value_error_fails_job(self, mock_estimate):
         mock_estimate.side_effect = ValueError("bad")
         response = self.client.post(
             reverse("food_tracking:estimate_recipe"),
             {"recipe_text": "r", "fraction": "0.5"},
         )
-        self.assertEqual(response.status_code, 400)
+        self.assertEqual(run_queued_estimate(self.client, response)["error"], "bad")
 
     @patch("food_tracking.views.Consumption.objects.create")
     def test_log_estimate_unexpected_error_returns_500(self, mock_create):
@@ -731,6 +887,8 @@ class SetGoalDeficitViewTests(TestCase):
 
     def setUp(self):
         self.client = Client()
+        # Cached pages would otherwise outlive the rows the previous test rolled back.
+        cache.clear()
         self.client.login(username="defuser", password="testpass")
 
     def test_requires_login(self):
@@ -857,6 +1015,65 @@ class GetActiveCaloriesForDateTests(TestCase):
         self.assertEqual(value, 500)
 
 
+class GetActiveCaloriesForRangeTests(TestCase):
+    """Tests for estimating active calories over a range of days at once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="rangeuser", password="testpass")
+        cls.end = date(2026, 6, 30)
+        rng = random.Random(7)
+        cls.logged = {}
+        for offset in range(120):
+            if rng.random() < 0.35:
+                day = cls.end - timedelta(days=offset)
+                cls.logged[day] = rng.randint(150, 950)
+                DailyActiveCalories.objects.create(
+                    user=cls.user, date=day, active_calories=cls.logged[day]
+                )
+
+    def expected(self, day: date) -> tuple[int, bool]:
+        """The rules, applied to one day by hand."""
+        if day in self.logged:
+            return self.logged[day], False
+        window = [
+            self.logged[day - timedelta(days=offset)]
+            for offset in range(1, ACTIVE_CALORIES_WINDOW_DAYS + 1)
+            if day - timedelta(days=offset) in self.logged
+        ]
+        if len(window) < MIN_LOGGED_DAYS_FOR_ESTIMATE:
+            return DEFAULT_ACTIVE_CALORIES_ESTIMATE, True
+        return round(sum(window) / len(window)), True
+
+    def test_every_day_follows_the_daily_rules(self):
+        """Test that each day in the range is logged or estimated as on its own."""
+        start = self.end - timedelta(days=89)
+        values = get_active_calories_for_range(self.user, start, self.end)
+        self.assertEqual(len(values), 90)
+        for offset in range(90):
+            day = start + timedelta(days=offset)
+            self.assertEqual(values[day], self.expected(day), day)
+
+    def test_range_is_one_query(self):
+        """Test that a range of any length is read with a single query."""
+        with self.assertNumQueries(1):
+            get_active_calories_for_range(
+                self.user, self.end - timedelta(days=364), self.end
+            )
+        with self.assertNumQueries(1):
+            get_active_calories_for_date(self.user, self.end)
+
+    def test_other_users_are_ignored(self):
+        """Test that only the user's own logged days are used."""
+        other = User.objects.create_user(username="otherrange", password="testpass")
+        values = get_active_calories_for_range(
+            other, self.end - timedelta(days=6), self.end
+        )
+        self.assertEqual(
+            set(values.values()), {(DEFAULT_ACTIVE_CALORIES_ESTIMATE, True)}
+        )
+
+
 class SetActiveCaloriesViewTests(TestCase):
     """Tests for setting today's Apple Watch active calories."""
 
@@ -866,6 +1083,8 @@ class SetActiveCaloriesViewTests(TestCase):
 
     def setUp(self):
         self.client = Client()
+        # Cached pages would otherwise outlive the rows the previous test rolled back.
+        cache.clear()
         self.client.login(username="acuser", password="testpass")
 
     def test_requires_login(self):
@@ -970,6 +1189,8 @@ class PastDayViewTests(TestCase):
 
     def setUp(self):
         self.client = Client()
+        # Cached pages would otherwise outlive the rows the previous test rolled back.
+        cache.clear()
         self.client.login(username="pastday", password="testpass")
 
     # -- home view -------------------------------------------------------
@@ -1173,6 +1394,8 @@ class EstimateRefinementViewTests(TestCase):
 
     def setUp(self):
         self.client = Client()
+        # Cached pages would otherwise outlive the rows the previous test rolled back.
+        cache.clear()
         self.client.login(username="refiner", password="testpass")
 
     @patch("food_tracking.views.estimation.estimate_from_text")
@@ -1188,12 +1411,14 @@ class EstimateRefinementViewTests(TestCase):
                 "previous_estimate": '{"description": "Pizza", "calories": 285}',
             },
         )
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json()["estimate"]["calories"], 570)
+        self.assertEqual(response.status_code, 202)
+        job = run_queued_estimate(self.client, response)
+        self.assertEqual(job["estimate"]["calories"], 570)
         mock_estimate.assert_called_once_with(
             "pizza",
             previous_estimate={"description": "Pizza", "calories": 285},
             correction="two slices actually",
+            on_items=ANY,
         )
 
     @patch("food_tracking.views.estimation.estimate_from_text")
@@ -1204,9 +1429,9 @@ class EstimateRefinementViewTests(TestCase):
         response = self.client.post(
             reverse("food_tracking:estimate"), {"text": "an apple"}
         )
-        self.assertEqual(response.status_code, 200)
+        run_queued_estimate(self.client, response)
         mock_estimate.assert_called_once_with(
-            "an apple", previous_estimate=None, correction=""
+            "an apple", previous_estimate=None, correction="", on_items=ANY
         )
 
     def test_correction_without_previous_estimate_returns_400(self):
@@ -1251,10 +1476,105 @@ class EstimateRefinementViewTests(TestCase):
                 "previous_estimate": '{"description": "Lasagna", "calories": 1700}',
             },
         )
-        self.assertEqual(response.status_code, 200)
+        run_queued_estimate(self.client, response)
         mock_estimate.assert_called_once_with(
             "Big lasagna recipe",
             0.5,
             previous_estimate={"description": "Lasagna", "calories": 1700},
             correction="turkey instead of beef",
+            on_items=ANY,
         )
+
+
+@freeze_time("2024-01-15 20:00:00")
+class ExportConsumptionViewTests(TestCase):
+    """Tests for the streamed consumption export and the paginated reports."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data once for the entire test class."""
+        cls.user = User.objects.create_user(username="exporter", password="testpass")
+        cls.food = Food.objects.create(
+            name="Test Food X",
+            icon="🌰",
+            serving_size="1 oz",
+            calories_per_serving=Decimal("196.00"),
+        )
+        with freeze_time("2024-01-13 20:00:00"):
+            Consumption.objects.create(
+                user=cls.user, food=cls.food, quantity=Decimal("1.5")
+            )
+        Consumption.objects.create(
+            user=cls.user, description="Salad", calories=Decimal("350")
+        )
+
+    def setUp(self):
+        """Set up test client and login."""
+        self.client = Client()
+        self.client.login(username="exporter", password="testpass")
+
+    def export(self, **params) -> list[str]:
+        response = self.client.get(reverse("food_tracking:export_consumption"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_csv_export(self):
+        """Test that the CSV export has a header and one row per entry, oldest first."""
+        self.assertEqual(
+            self.export(),
+            [
+                "consumed_at,food,description,quantity,calories",
+                "2024-01-13T12:00:00-08:00,Test Food X,,1.50,294.00",
+                "2024-01-15T12:00:00-08:00,,Salad,1.00,350.00",
+            ],
+        )
+
+    def test_ndjson_export(self):
+        """Test that the NDJSON export has one JSON object per entry."""
+        lines = self.export(format="ndjson")
+        self.assertEqual(
+            json.loads(lines[0]),
+            {
+                "consumed_at": "2024-01-13T12:00:00-08:00",
+                "food": "Test Food X",
+                "description": "",
+                "quantity": 1.5,
+                "calories": 294.0,
+            },
+        )
+        self.assertEqual(len(lines), 2)
+
+    def test_export_date_bounds(self):
+        """Test that start and end bound the export to whole Pacific days."""
+        self.assertEqual(len(self.export(start="2024-01-14")), 2)
+        self.assertEqual(len(self.export(end="2024-01-13")), 2)
+        self.assertEqual(len(self.export(start="2024-01-13", end="2024-01-15")), 3)
+
+    def test_export_is_per_user(self):
+        """Test that other users' entries are never exported."""
+        other = User.objects.create_user(username="other", password="testpass")
+        Consumption.objects.create(
+            user=other, description="Toast", calories=Decimal("100")
+        )
+        self.assertNotIn("Toast", "".join(self.export()))
+
+    def test_export_rejects_bad_parameters(self):
+        """Test that unknown formats and malformed dates are 400s."""
+        for params in ({"format": "xml"}, {"start": "last week"}):
+            with self.subTest(params=params):
+                response = self.client.get(
+                    reverse("food_tracking:export_consumption"), params
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_reports_paginate_detail(self):
+        """Test that the reports page shows the detail table a page at a time."""
+        Consumption.objects.bulk_create(
+            Consumption(user=self.user, food=self.food) for _ in range(60)
+        )
+        response = self.client.get(reverse("food_tracking:reports"))
+        self.assertEqual(len(response.context["detailed_consumption"]), 50)
+        self.assertContains(response, "Page 1 of 2")
+        response = self.client.get(reverse("food_tracking:reports"), {"page": 2})
+        self.assertEqual(len(response.context["detailed_consumption"]), 12)
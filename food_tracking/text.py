@@ -0,0 +1,9 @@
+"""
+Normalization of what users type, shared by everything that compares or keys
+on free text (the estimate cache and the food library).
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Fold case and whitespace, which don't change what was eaten."""
+    return " ".join(text.casefold().split())
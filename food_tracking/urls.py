@@ -8,9 +8,14 @@ urlpatterns = [
     path("log/", views.log_consumption, name="log_consumption"),
     path("delete/", views.delete_consumption, name="delete_consumption"),
     path("reports/", views.reports, name="reports"),
+    path("trends/", views.trends, name="trends"),
+    path("export/", views.export_consumption, name="export_consumption"),
     path("estimate/", views.estimate, name="estimate"),
     path("estimate-recipe/", views.estimate_recipe, name="estimate_recipe"),
+    path("estimate/<int:job_id>/", views.estimate_job, name="estimate_job"),
     path("log-estimate/", views.log_estimate, name="log_estimate"),
+    path("library/", views.library_foods, name="library_foods"),
+    path("library/log/", views.log_library_food, name="log_library_food"),
     path("active/", views.set_active_calories, name="set_active_calories"),
     path("target/", views.set_target, name="set_target"),
     path("deficit/", views.set_goal_deficit, name="set_goal_deficit"),
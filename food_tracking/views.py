@@ -1,31 +1,69 @@
+import csv
 import json
-from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from datetime import date as date_cls
 from datetime import datetime, time, timedelta
 from decimal import Decimal, InvalidOperation
 from typing import Any
 
-import pytz
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Avg, Count
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import DateField, Sum
+from django.db.models.functions import Trunc
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 
-from food_tracking import estimation
+from food_tracking import (
+    cache_tags,
+    calorie_trends,
+    estimate_jobs,
+    estimation,
+    food_library,
+    image_preprocessing,
+)
+from food_tracking.active_calories import get_active_calories_for_date
 from food_tracking.constants import (
-    ACTIVE_CALORIES_WINDOW_DAYS,
-    DEFAULT_ACTIVE_CALORIES_ESTIMATE,
     DEFAULT_RECENT_CONSUMPTION_LIMIT,
     DEFAULT_REPORT_DAYS,
-    MIN_LOGGED_DAYS_FOR_ESTIMATE,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_NDJSON,
+    EXPORT_FORMATS,
+    FOODS_CACHE_TAG,
+    PERIOD_DAY,
+    PERIOD_MONTH,
+    PERIOD_WEEK,
+    REPORT_DETAIL_PAGE_SIZE,
+    TRENDS_DAY_OPTIONS,
+    TRENDS_DEFAULT_DAYS,
+    VALID_PERIODS,
+    EstimateJobKind,
 )
-from food_tracking.models import CalorieTarget, Consumption, DailyActiveCalories, Food
-
-# Use Pacific timezone for all date calculations
-PACIFIC_TZ = pytz.timezone("America/Los_Angeles")
+from food_tracking.dates import (
+    PACIFIC_TZ,
+    get_pacific_day_bounds,
+    get_pacific_today_start,
+)
+from food_tracking.models import (
+    CONSUMPTION_CALORIES,
+    CalorieTarget,
+    Consumption,
+    DailyActiveCalories,
+    DailySummary,
+    EstimateJob,
+    Food,
+    LibraryFood,
+)
+from tagged_cache.decorators import cache_page_by_tags
 
 # Backdated entries (logged against a past day) get this hour, Pacific time.
 # Noon sits safely inside the day regardless of DST or UTC conversion, unlike
@@ -34,23 +72,8 @@ BACKDATE_HOUR = 12
 
 DATE_PARAM_FORMAT = "%Y-%m-%d"
 
-
-def get_pacific_today_start() -> datetime:
-    """Get the start of today (midnight) in Pacific timezone."""
-    now_pacific = timezone.now().astimezone(PACIFIC_TZ)
-    today_start_pacific = now_pacific.replace(hour=0, minute=0, second=0, microsecond=0)
-    return today_start_pacific
-
-
-def get_pacific_day_bounds(day: date_cls) -> tuple[datetime, datetime]:
-    """Return the [start, end) datetimes of a Pacific calendar day.
-
-    Both bounds are localized midnights rather than start + 24h, so days that
-    contain a DST transition (23 or 25 hours long) keep correct boundaries.
-    """
-    start = PACIFIC_TZ.localize(datetime.combine(day, time.min))
-    end = PACIFIC_TZ.localize(datetime.combine(day + timedelta(days=1), time.min))
-    return start, end
+# Columns of the consumption export, in order.
+EXPORT_COLUMNS = ["consumed_at", "food", "description", "quantity", "calories"]
 
 
 def get_requested_day(request: HttpRequest) -> date_cls:
@@ -85,104 +108,98 @@ def get_active_foods() -> list[Food]:
     return list(Food.objects.filter(active=True))
 
 
-def get_active_calories_for_date(user: User, day: date_cls) -> tuple[int, bool]:
-    """Return the user's active (Move ring) calories for a day.
-
-    If the day has a logged entry, return it. Otherwise estimate from the
-    average of logged days in the prior ACTIVE_CALORIES_WINDOW_DAYS (logged days
-    only — unlogged days are ignored rather than counted as zero). Until there
-    are at least MIN_LOGGED_DAYS_FOR_ESTIMATE logged days the sample is too thin
-    to trust, so we fall back to DEFAULT_ACTIVE_CALORIES_ESTIMATE.
-
-    Returns a (value, is_estimate) tuple.
-    """
-    logged = DailyActiveCalories.objects.filter(user=user, date=day).first()
-    if logged is not None:
-        return logged.active_calories, False
-
-    window_start = day - timedelta(days=ACTIVE_CALORIES_WINDOW_DAYS)
-    stats = DailyActiveCalories.objects.filter(
-        user=user, date__gte=window_start, date__lt=day
-    ).aggregate(avg=Avg("active_calories"), n=Count("id"))
-
-    if stats["n"] < MIN_LOGGED_DAYS_FOR_ESTIMATE:
-        return DEFAULT_ACTIVE_CALORIES_ESTIMATE, True
-    return round(stats["avg"]), True
+def format_period(period: str, period_start: date_cls) -> str:
+    """Label a period by its first day: 2024-01-15, 2024-W03 or 2024-01."""
+    if period == PERIOD_WEEK:
+        year, week, _ = period_start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == PERIOD_MONTH:
+        return period_start.strftime("%Y-%m")
+    return period_start.strftime("%Y-%m-%d")
 
 
 def calculate_totals_by_period(
     user_id: int, days: int, period: str
 ) -> list[dict[str, str | Decimal]]:
     """
-    Calculate calorie totals grouped by period.
+    Calculate calorie totals grouped by period, from the user's daily summaries.
+
+    Postgres groups the days into periods and returns one row per period, so
+    the cost doesn't grow with how many entries (or days) the window holds.
 
     Args:
         user_id: User ID to filter consumptions
-        days: Number of days to look back
-        period: Grouping period ('day', 'week', or 'month')
+        days: Number of days to look back (the Pacific day it reaches back to
+            is included whole)
+        period: Grouping period ('day', 'week', or 'month'; default 'day')
 
     Returns:
-        List of dicts with 'period' and 'total_calories' keys
+        List of dicts with 'period' and 'total_calories' keys, latest first
     """
-    start_date = timezone.now() - timedelta(days=days)
-    consumptions = Consumption.objects.filter(
-        user_id=user_id, consumed_at__gte=start_date
-    ).select_related("food")
-
-    # Define period key functions (convert to Pacific time first)
-    def get_day_key(dt: datetime) -> str:
-        dt_pacific = dt.astimezone(PACIFIC_TZ)
-        return dt_pacific.strftime("%Y-%m-%d")
-
-    def get_week_key(dt: datetime) -> str:
-        dt_pacific = dt.astimezone(PACIFIC_TZ)
-        year, week, _ = dt_pacific.isocalendar()
-        return f"{year}-W{week:02d}"
+    if period not in VALID_PERIODS:
+        period = PERIOD_DAY
+    start_day = (timezone.now() - timedelta(days=days)).astimezone(PACIFIC_TZ).date()
+    # Summaries are already Pacific days, so truncating their dates needs no
+    # time zone conversion.
+    rows = (
+        DailySummary.objects.filter(user_id=user_id, date__gte=start_day)
+        .annotate(period_start=Trunc("date", period, output_field=DateField()))
+        .values("period_start")
+        .annotate(period_calories=Sum("total_calories"))
+        .order_by("-period_start")
+    )
+    return [
+        {
+            "period": format_period(period, row["period_start"]),
+            "total_calories": row["period_calories"],
+        }
+        for row in rows
+    ]
 
-    def get_month_key(dt: datetime) -> str:
-        dt_pacific = dt.astimezone(PACIFIC_TZ)
-        return dt_pacific.strftime("%Y-%m")
 
-    period_key_functions = {
-        "day": get_day_key,
-        "week": get_week_key,
-        "month": get_month_key,
-    }
+def get_view_date(request: HttpRequest) -> date_cls:
+    """Return the Pacific day a page shows: ?date=YYYY-MM-DD, or today.
 
-    # Get the appropriate key function (default to day)
-    get_key = period_key_functions.get(period, get_day_key)
+    Malformed or future dates fall back to today rather than erroring, since
+    they only arrive via hand-edited URLs.
+    """
+    today = get_pacific_today_start().date()
+    try:
+        view_date = datetime.strptime(
+            request.GET.get("date", ""), DATE_PARAM_FORMAT
+        ).date()
+    except ValueError:
+        return today
+    return min(view_date, today)
 
-    # Group consumptions by period using defaultdict
-    totals: defaultdict[str, Decimal] = defaultdict(lambda: Decimal("0"))
-    for consumption in consumptions:
-        period_key = get_key(consumption.consumed_at)
-        totals[period_key] += consumption.total_calories()
 
-    # Return sorted results
+def home_page_tags(request: HttpRequest) -> list[str]:
+    """Cache tags of the home page for the day it shows."""
+    user_id = request.user.pk
     return [
-        {"period": period_key, "total_calories": calories}
-        for period_key, calories in sorted(totals.items(), reverse=True)
+        cache_tags.day_tag(user_id, get_view_date(request)),
+        # The page labels today differently from other days, so it also
+        # changes at midnight.
+        cache_tags.day_tag(user_id, get_pacific_today_start().date()),
+        cache_tags.user_tag(user_id),
+        cache_tags.library_tag(user_id),
+        FOODS_CACHE_TAG,
     ]
 
 
 @login_required
+@cache_page_by_tags(home_page_tags, per_user=True)
 def home(request: HttpRequest) -> HttpResponse:
     """Display the food tracking grid and consumption for one Pacific day.
 
     Defaults to today; ?date=YYYY-MM-DD shows a past day so forgotten entries
-    can be logged retroactively. Malformed or future dates fall back to today
-    rather than erroring, since they only arrive via hand-edited URLs.
+    can be logged retroactively (see get_view_date). The rendered page is
+    cached per user until something it shows changes.
     """
     foods = get_active_foods()
 
     today = get_pacific_today_start().date()
-    try:
-        view_date = datetime.strptime(
-            request.GET.get("date", ""), DATE_PARAM_FORMAT
-        ).date()
-    except ValueError:
-        view_date = today
-    view_date = min(view_date, today)
+    view_date = get_view_date(request)
     is_today = view_date == today
 
     # All consumption for the viewed day (Pacific), most recent first. The
@@ -197,20 +214,17 @@ def home(request: HttpRequest) -> HttpResponse:
         .order_by("-consumed_at")
     )
 
-    # Calculate the day's total quantity per food for badges
-    today_quantities: dict[int, Decimal] = {}
-    for consumption in today_consumption:
-        food_id = consumption.food_id
-        today_quantities[food_id] = (
-            today_quantities.get(food_id, Decimal("0")) + consumption.quantity
-        )
-
-    # Add the day's total quantity to each food object
+    # The day's totals, kept up to date as entries are logged (see
+    # daily_summaries), give the badges and the header without adding up the
+    # entries again.
+    summary = DailySummary.objects.filter(user=request.user, date=view_date).first()
+    if summary is None:
+        summary = DailySummary(user=request.user, date=view_date)
     for food in foods:
-        food.today_count = today_quantities.get(food.id, Decimal("0"))
+        food.today_count = summary.quantity_of(food.id)
 
-    # Calculate total calories consumed on the viewed day (food only)
-    today_total_calories = sum(c.total_calories() for c in today_consumption)
+    # Total calories consumed on the viewed day (food only)
+    today_total_calories = summary.total_calories
 
     target = get_or_create_target(request.user)
     base_rate = target.daily_calorie_target
@@ -226,6 +240,7 @@ def home(request: HttpRequest) -> HttpResponse:
 
     context = {
         "foods": foods,
+        "library_foods": food_library.top_foods(request.user),
         "today_consumption": today_consumption,
         "today_total_calories": today_total_calories,
         "base_rate": base_rate,
@@ -261,8 +276,10 @@ def delete_consumption(request: HttpRequest) -> JsonResponse:
             )
 
         # Get consumption and verify it belongs to the current user
-        consumption = Consumption.objects.get(id=consumption_id, user=request.user)
-        consumption.delete()
+        # Deleted together with the update to the day's summary.
+        with transaction.atomic():
+            consumption = Consumption.objects.get(id=consumption_id, user=request.user)
+            consumption.delete()
 
         return JsonResponse({"success": True})
     except Consumption.DoesNotExist:
@@ -292,12 +309,14 @@ def log_consumption(request: HttpRequest) -> JsonResponse:
             return JsonResponse({"success": False, "error": "Invalid date"}, status=400)
 
         food = Food.objects.get(id=food_id)
-        consumption = Consumption.objects.create(
-            user=request.user,
-            food=food,
-            quantity=Decimal(quantity),
-            consumed_at=resolve_consumed_at(day),
-        )
+        # Logged together with the update to the day's summary.
+        with transaction.atomic():
+            consumption = Consumption.objects.create(
+                user=request.user,
+                food=food,
+                quantity=Decimal(quantity),
+                consumed_at=resolve_consumed_at(day),
+            )
 
         return JsonResponse(
             {
@@ -315,30 +334,160 @@ def log_consumption(request: HttpRequest) -> JsonResponse:
 def reports(request: HttpRequest) -> HttpResponse:
     """Display calorie consumption reports."""
     days = int(request.GET.get("days", DEFAULT_REPORT_DAYS))
-    period = request.GET.get("period", "day")
+    period = request.GET.get("period", PERIOD_DAY)
 
     # Validate period
-    if period not in ["day", "week", "month"]:
-        period = "day"
+    if period not in VALID_PERIODS:
+        period = PERIOD_DAY
 
     # Calculate totals
     totals = calculate_totals_by_period(request.user.id, days, period)
 
-    # Get detailed consumption for the period
+    # Get detailed consumption for the period, a page at a time
     start_date = timezone.now() - timedelta(days=days)
     detailed_consumption = Consumption.objects.filter(
         user=request.user, consumed_at__gte=start_date
     ).select_related("food")
+    page = Paginator(detailed_consumption, REPORT_DETAIL_PAGE_SIZE).get_page(
+        request.GET.get("page")
+    )
 
     context = {
         "days": days,
         "period": period,
         "totals": totals,
-        "detailed_consumption": detailed_consumption,
+        "detailed_consumption": page,
+        "export_start": start_date.astimezone(PACIFIC_TZ).date().isoformat(),
     }
     return render(request, "food_tracking/reports.html", context)
 
 
+@login_required
+def trends(request: HttpRequest) -> HttpResponse:
+    """Display rolling averages, budget adherence and weekday patterns.
+
+    ?days= picks the span, one of TRENDS_DAY_OPTIONS ending today. The numbers
+    are computed by calorie_trends and cached until the user's data changes.
+    """
+    try:
+        days = int(request.GET.get("days", TRENDS_DEFAULT_DAYS))
+    except ValueError:
+        days = TRENDS_DEFAULT_DAYS
+    if days not in TRENDS_DAY_OPTIONS:
+        days = TRENDS_DEFAULT_DAYS
+
+    context = {
+        "days": days,
+        "day_options": TRENDS_DAY_OPTIONS,
+        "trends": calorie_trends.get_trends(
+            request.user,
+            get_or_create_target(request.user),
+            get_pacific_today_start().date(),
+            days,
+        ),
+    }
+    return render(request, "food_tracking/trends.html", context)
+
+
+class Echo:
+    """A file-like object whose write() hands back what it's given.
+
+    csv.writer writes each row to it, so writerow returns the row's text
+    instead of buffering it.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_export_day(request: HttpRequest, name: str) -> date_cls | None:
+    """Return the Pacific day in GET param name, or None if it's absent.
+
+    Raises ValueError for malformed dates.
+    """
+    raw = request.GET.get(name, "").strip()
+    if not raw:
+        return None
+    return datetime.strptime(raw, DATE_PARAM_FORMAT).date()
+
+
+def export_rows(
+    user: User, start: date_cls | None, end: date_cls | None
+) -> Iterator[dict[str, Any]]:
+    """Yield the user's entries from start to end (Pacific days, inclusive), oldest first.
+
+    Rows are fetched EXPORT_CHUNK_SIZE at a time as plain values, with
+    the calories computed by the database, so no model instances are built.
+    """
+    entries = Consumption.objects.filter(user=user)
+    if start is not None:
+        entries = entries.filter(consumed_at__gte=get_pacific_day_bounds(start)[0])
+    if end is not None:
+        entries = entries.filter(consumed_at__lt=get_pacific_day_bounds(end)[1])
+    rows = (
+        entries.annotate(entry_calories=CONSUMPTION_CALORIES)
+        .order_by("consumed_at", "id")
+        .values(
+            "consumed_at", "food__name", "description", "quantity", "entry_calories"
+        )
+    )
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            "consumed_at": row["consumed_at"].astimezone(PACIFIC_TZ).isoformat(),
+            "food": row["food__name"] or "",
+            "description": row["description"],
+            "quantity": row["quantity"],
+            "calories": row["entry_calories"].quantize(Decimal("0.01")),
+        }
+
+
+def csv_lines(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Render export rows as CSV, a header line then one line per row."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow([row[column] for column in EXPORT_COLUMNS])
+
+
+def ndjson_lines(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Render export rows as newline-delimited JSON, one object per line."""
+    for row in rows:
+        row.update(quantity=float(row["quantity"]), calories=float(row["calories"]))
+        yield json.dumps(row) + "\n"
+
+
+@login_required
+@require_http_methods(["GET"])
+def export_consumption(request: HttpRequest) -> HttpResponse:
+    """Download the user's consumption history as CSV or NDJSON.
+
+    ?format=csv (default) or ndjson; ?start= and ?end= (YYYY-MM-DD, Pacific
+    days, inclusive) optionally bound it. The file is streamed as it's read
+    from the database, so any amount of history exports in constant memory.
+    """
+    export_format = request.GET.get("format", EXPORT_FORMAT_CSV)
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"success": False, "error": "Invalid format"}, status=400)
+
+    try:
+        start = get_export_day(request, "start")
+        end = get_export_day(request, "end")
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Invalid date"}, status=400)
+
+    rows = export_rows(request.user, start, end)
+    if export_format == EXPORT_FORMAT_NDJSON:
+        response = StreamingHttpResponse(
+            ndjson_lines(rows), content_type="application/x-ndjson"
+        )
+    else:
+        response = StreamingHttpResponse(csv_lines(rows), content_type="text/csv")
+    response["Content-Disposition"] = (
+        f'attachment; filename="consumption.{export_format}"'
+    )
+    return response
+
+
 def get_refinement_params(request: HttpRequest) -> tuple[dict[str, Any] | None, str]:
     """Extract optional refinement fields from an estimate request.
 
@@ -368,39 +517,45 @@ def get_refinement_params(request: HttpRequest) -> tuple[dict[str, Any] | None,
 @login_required
 @require_http_methods(["POST"])
 def estimate(request: HttpRequest) -> JsonResponse:
-    """Estimate calories from an uploaded photo or a text description.
+    """Queue a calorie estimate from an uploaded photo or a text description.
 
     Optional correction + previous_estimate fields turn the request into a
     refinement: the original input is resent along with the prior estimate and
-    the user's correction, and the model revises its numbers.
+    the user's correction, and the model revises its numbers. Photos are
+    downscaled and stripped of metadata before they're queued (see
+    image_preprocessing).
 
-    Returns the estimate WITHOUT saving it; the client confirms/edits before
-    calling log_estimate.
+    Returns the queued job (202) right away; the client polls estimate_job for
+    the estimate, then confirms/edits it before calling log_estimate.
     """
     try:
         image = request.FILES.get("image")
         text = request.POST.get("text", "").strip()
         note = request.POST.get("note", "").strip()
         previous_estimate, correction = get_refinement_params(request)
+        refinement = {"previous_estimate": previous_estimate, "correction": correction}
 
         if image is not None:
-            result = estimation.estimate_from_image(
-                image.read(),
-                image.content_type or "",
-                note,
-                previous_estimate=previous_estimate,
-                correction=correction,
+            media_type = image.content_type or ""
+            if media_type not in estimation.SUPPORTED_IMAGE_MEDIA_TYPES:
+                raise ValueError(f"Unsupported image type: {media_type}")
+            image_bytes, media_type = image_preprocessing.prepare_image(image)
+            job = estimate_jobs.submit_job(
+                request.user,
+                EstimateJobKind.IMAGE,
+                {"media_type": media_type, "note": note, **refinement},
+                image=image_bytes,
             )
         elif text:
-            result = estimation.estimate_from_text(
-                text, previous_estimate=previous_estimate, correction=correction
+            job = estimate_jobs.submit_job(
+                request.user, EstimateJobKind.TEXT, {"text": text, **refinement}
             )
         else:
             return JsonResponse(
                 {"success": False, "error": "Provide an image or text."}, status=400
             )
 
-        return JsonResponse({"success": True, "estimate": result.to_dict()})
+        return JsonResponse({"success": True, "job": job.to_dict_for_api()}, status=202)
     except ValueError as e:
         return JsonResponse({"success": False, "error": str(e)}, status=400)
     except Exception as e:
@@ -410,7 +565,7 @@ def estimate(request: HttpRequest) -> JsonResponse:
 @login_required
 @require_http_methods(["POST"])
 def estimate_recipe(request: HttpRequest) -> JsonResponse:
-    """Estimate calories for the eaten fraction of a pasted recipe (unsaved)."""
+    """Queue an estimate for the eaten fraction of a pasted recipe (see estimate)."""
     try:
         recipe_text = request.POST.get("recipe_text", "").strip()
         fraction_raw = request.POST.get("fraction", "")
@@ -434,19 +589,38 @@ def estimate_recipe(request: HttpRequest) -> JsonResponse:
             )
 
         previous_estimate, correction = get_refinement_params(request)
-        result = estimation.estimate_recipe(
-            recipe_text,
-            fraction,
-            previous_estimate=previous_estimate,
-            correction=correction,
+        job = estimate_jobs.submit_job(
+            request.user,
+            EstimateJobKind.RECIPE,
+            {
+                "recipe_text": recipe_text,
+                "fraction": fraction,
+                "previous_estimate": previous_estimate,
+                "correction": correction,
+            },
         )
-        return JsonResponse({"success": True, "estimate": result.to_dict()})
+        return JsonResponse({"success": True, "job": job.to_dict_for_api()}, status=202)
     except ValueError as e:
         return JsonResponse({"success": False, "error": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
 
+@login_required
+@require_http_methods(["GET"])
+def estimate_job(request: HttpRequest, job_id: int) -> JsonResponse:
+    """Report a queued estimate's status, with the estimate once it's done.
+
+    Jobs past their deadline are reported as failed, so the client always gets
+    an answer within ESTIMATE_JOB_DEADLINE_SECONDS.
+    """
+    try:
+        job = estimate_jobs.get_job_for_user(job_id, request.user)
+    except EstimateJob.DoesNotExist:
+        return JsonResponse({"success": False, "error": "Job not found"}, status=404)
+    return JsonResponse({"success": True, "job": job.to_dict_for_api()})
+
+
 @login_required
 @require_http_methods(["POST"])
 def log_estimate(request: HttpRequest) -> JsonResponse:
@@ -478,17 +652,58 @@ def log_estimate(request: HttpRequest) -> JsonResponse:
         except ValueError:
             return JsonResponse({"success": False, "error": "Invalid date"}, status=400)
 
-        consumption = Consumption.objects.create(
-            user=request.user,
-            food=None,
-            description=description,
-            calories=calories,
-            notes=request.POST.get("notes", ""),
-            consumed_at=resolve_consumed_at(day),
+        with transaction.atomic():
+            consumption = Consumption.objects.create(
+                user=request.user,
+                food=None,
+                description=description,
+                calories=calories,
+                notes=request.POST.get("notes", ""),
+                consumed_at=resolve_consumed_at(day),
+            )
+        return JsonResponse(
+            {"success": True, "consumption": consumption.to_dict_for_api()}
         )
+    except Exception as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+def library_foods(request: HttpRequest) -> JsonResponse:
+    """Search the user's food library; ?q= empty lists their most logged foods."""
+    foods = food_library.search(request.user, request.GET.get("q", ""))
+    return JsonResponse(
+        {"success": True, "foods": [food.to_dict_for_api() for food in foods]}
+    )
+
+
+@login_required
+@require_http_methods(["POST"])
+def log_library_food(request: HttpRequest) -> JsonResponse:
+    """Log a food from the user's library again, with its last logged calories."""
+    try:
+        try:
+            day = get_requested_day(request)
+        except ValueError:
+            return JsonResponse({"success": False, "error": "Invalid date"}, status=400)
+
+        food = LibraryFood.objects.get(
+            id=request.POST.get("library_food_id"), user=request.user
+        )
+        with transaction.atomic():
+            consumption = Consumption.objects.create(
+                user=request.user,
+                food=None,
+                description=food.description,
+                calories=food.calories,
+                consumed_at=resolve_consumed_at(day),
+            )
         return JsonResponse(
             {"success": True, "consumption": consumption.to_dict_for_api()}
         )
+    except (LibraryFood.DoesNotExist, ValueError):
+        return JsonResponse({"success": False, "error": "Food not found"}, status=404)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
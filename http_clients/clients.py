@@ -0,0 +1,195 @@
+"""
+Per-process HTTP clients for Anthropic, Twilio and this site's own API.
+
+Each integration gets one client per process, built on first use and kept for
+the life of the process, so connections (and their TLS sessions) are kept alive
+and reused instead of being set up again for every call. Because nothing is
+built at import time, forked web workers never share a connection pool.
+
+Timeouts, retries and pool sizes default to http_clients.constants and can be
+overridden with environment variables of the same names. get_connection_stats()
+reports how many requests each client has made and how many connections they
+needed; the long-running callers log it with log_connection_stats().
+"""
+
+import functools
+import logging
+import os
+from dataclasses import dataclass, replace
+from typing import Any
+
+import httpx
+import requests
+from anthropic import Anthropic, DefaultHttpxClient
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client as TwilioClient
+from urllib3.util.retry import Retry
+
+from http_clients import constants
+
+# httpcore calls a request's "trace" extension with this event each time it
+# opens a new connection rather than reusing one from the pool.
+CONNECTION_OPENED_EVENT = "connection.connect_tcp.complete"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConnectionStats:
+    """How many requests a client has made, and how many connections it opened for them."""
+
+    requests: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        """Requests sent over a connection that was already open."""
+        return max(0, self.requests - self.connections_opened)
+
+
+# Counted as requests are sent, for the httpx-based Anthropic client.
+_httpx_stats: dict[str, ConnectionStats] = {}
+# The requests-based clients, whose connection pools keep their own counts.
+_sessions: dict[str, requests.Session] = {}
+
+
+def setting(name: str) -> float:
+    """Return the default from http_clients.constants, or the environment's override."""
+    return float(os.environ.get(name, getattr(constants, name)))
+
+
+def make_retry() -> Retry:
+    """Retry failed connections, and idempotent requests that got a retryable status."""
+    return Retry(
+        total=int(setting("HTTP_MAX_RETRIES")),
+        backoff_factor=setting("HTTP_RETRY_BACKOFF_SECONDS"),
+        status_forcelist=constants.RETRY_STATUSES,
+        # Hand the last response back to the caller rather than raising, so
+        # callers handle an exhausted retry like any other error status.
+        raise_on_status=False,
+    )
+
+
+def mount_pooled_adapter(session: requests.Session) -> None:
+    """Give a session keep-alive pools of the configured size, with retries."""
+    pool_size = int(setting("HTTP_POOL_SIZE"))
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=make_retry()
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+class PooledSession(requests.Session):
+    """A Session with pooled, retrying adapters and a default timeout.
+
+    requests never times out unless told to, so a timeout is added to every
+    request that doesn't set one.
+    """
+
+    def __init__(self, read_timeout: float) -> None:
+        super().__init__()
+        self.timeout = (setting("HTTP_CONNECT_TIMEOUT_SECONDS"), read_timeout)
+        mount_pooled_adapter(self)
+
+    def request(self, method: Any, url: Any, *args: Any, **kwargs: Any) -> Any:
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+def session_stats(session: requests.Session) -> ConnectionStats:
+    """Sum the request and connection counts of a session's connection pools."""
+    stats = ConnectionStats()
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                stats.requests += pool.num_requests
+                stats.connections_opened += pool.num_connections
+    return stats
+
+
+def counted_httpx_client(
+    stats: ConnectionStats, timeout: httpx.Timeout
+) -> httpx.Client:
+    """Build the SDK's default httpx client, counting its requests and new connections into stats."""
+
+    def count_connection(event_name: str, info: dict[str, Any]) -> None:
+        if event_name == CONNECTION_OPENED_EVENT:
+            stats.connections_opened += 1
+
+    def count_request(request: httpx.Request) -> None:
+        stats.requests += 1
+        request.extensions["trace"] = count_connection
+
+    pool_size = int(setting("HTTP_POOL_SIZE"))
+    return DefaultHttpxClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        event_hooks={"request": [count_request]},
+    )
+
+
+@functools.cache
+def get_anthropic_client() -> Anthropic:
+    """Return this process's Anthropic client, using ANTHROPIC_API_KEY.
+
+    The SDK does its own retrying, with its own backoff; HTTP_MAX_RETRIES sets
+    how many times.
+    """
+    timeout = httpx.Timeout(
+        setting("ANTHROPIC_READ_TIMEOUT_SECONDS"),
+        connect=setting("HTTP_CONNECT_TIMEOUT_SECONDS"),
+    )
+    stats = _httpx_stats.setdefault("anthropic", ConnectionStats())
+    return Anthropic(
+        api_key=os.environ["ANTHROPIC_API_KEY"],
+        http_client=counted_httpx_client(stats, timeout),
+        timeout=timeout,
+        max_retries=int(setting("HTTP_MAX_RETRIES")),
+    )
+
+
+@functools.cache
+def get_twilio_client(account_sid: str, auth_token: str) -> TwilioClient:
+    """Return this process's Twilio client for an account."""
+    http_client = TwilioHttpClient(
+        pool_connections=True, timeout=setting("TWILIO_READ_TIMEOUT_SECONDS")
+    )
+    assert http_client.session is not None
+    mount_pooled_adapter(http_client.session)
+    _sessions["twilio"] = http_client.session
+    return TwilioClient(account_sid, auth_token, http_client=http_client)
+
+
+@functools.cache
+def get_api_session() -> requests.Session:
+    """Return this process's session for calling the site's own API."""
+    session = PooledSession(setting("API_READ_TIMEOUT_SECONDS"))
+    _sessions["api"] = session
+    return session
+
+
+def get_connection_stats() -> dict[str, ConnectionStats]:
+    """Return the connection counts of every client built in this process so far."""
+    stats = {name: replace(counts) for name, counts in _httpx_stats.items()}
+    for name, session in _sessions.items():
+        stats[name] = session_stats(session)
+    return stats
+
+
+def log_connection_stats() -> None:
+    """Log how well each client is reusing its connections."""
+    for name, counts in get_connection_stats().items():
+        logger.info(
+            f"HTTP client {name}: {counts.requests} requests, "
+            f"{counts.connections_opened} connections opened, "
+            f"{counts.connections_reused} reused"
+        )
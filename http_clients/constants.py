@@ -0,0 +1,23 @@
+# Defaults for the shared HTTP clients. Each can be overridden by the
+# environment variable of the same name, read when the client is first built.
+
+# Seconds to wait for a connection to be established.
+HTTP_CONNECT_TIMEOUT_SECONDS = 5.0
+
+# Seconds to wait for a response from each integration. Estimates are streamed,
+# so this bounds the gaps between chunks rather than the whole estimate.
+ANTHROPIC_READ_TIMEOUT_SECONDS = 120.0
+TWILIO_READ_TIMEOUT_SECONDS = 30.0
+API_READ_TIMEOUT_SECONDS = 10.0
+
+# How many times a failed request is retried, and the base of the exponential
+# backoff between attempts. Only requests that are safe to repeat are retried:
+# connection failures, and error statuses for idempotent methods.
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF_SECONDS = 0.5
+
+# Statuses worth retrying an idempotent request after.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Keep-alive connections kept open per host.
+HTTP_POOL_SIZE = 10
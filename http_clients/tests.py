@@ -0,0 +1,147 @@
+"""Unit tests for the shared HTTP clients, against a local HTTP server."""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+from django.test import SimpleTestCase
+
+from http_clients import clients
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers each request with the next status in the server's script, then 200."""
+
+    protocol_version = "HTTP/1.1"
+
+    def respond(self) -> None:
+        self.server.received.append(self.command)  # type: ignore[attr-defined]
+        script = self.server.statuses  # type: ignore[attr-defined]
+        status = script.pop(0) if script else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    do_GET = do_POST = do_PUT = respond
+
+    def log_message(self, *args):
+        pass
+
+
+class ClientTestCase(SimpleTestCase):
+    """Runs a local server for each test, with instant retries."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+        self.server.statuses = []  # type: ignore[attr-defined]
+        self.server.received = []  # type: ignore[attr-defined]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        env = patch.dict(os.environ, {"HTTP_RETRY_BACKOFF_SECONDS": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+
+
+class PooledSessionTests(ClientTestCase):
+    """Tests for the requests-based clients."""
+
+    def test_connection_is_reused(self):
+        """Test that consecutive requests share one kept-alive connection."""
+        session = clients.PooledSession(read_timeout=5)
+        for _ in range(3):
+            session.get(self.url)
+        stats = clients.session_stats(session)
+        self.assertEqual((stats.requests, stats.connections_opened), (3, 1))
+        self.assertEqual(stats.connections_reused, 2)
+
+    def test_idempotent_requests_are_retried(self):
+        """Test that a GET that gets a 503 is retried."""
+        self.server.statuses = [503]  # type: ignore[attr-defined]
+        response = clients.PooledSession(read_timeout=5).get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.received, ["GET", "GET"])  # type: ignore[attr-defined]
+
+    def test_posts_are_not_retried_after_a_response(self):
+        """Test that a POST the server answered is never sent twice."""
+        self.server.statuses = [503]  # type: ignore[attr-defined]
+        response = clients.PooledSession(read_timeout=5).post(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.received, ["POST"])  # type: ignore[attr-defined]
+
+    def test_exhausted_retries_return_the_last_response(self):
+        """Test that the caller sees the error status once retries run out."""
+        self.server.statuses = [503, 503, 503]  # type: ignore[attr-defined]
+        with patch.dict(os.environ, {"HTTP_MAX_RETRIES": "1"}):
+            response = clients.PooledSession(read_timeout=5).get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.server.received), 2)  # type: ignore[attr-defined]
+
+    def test_default_timeout(self):
+        """Test that requests without a timeout get the session's."""
+        session = clients.PooledSession(read_timeout=7)
+        with patch("requests.Session.request") as mock_request:
+            session.get(self.url)
+        self.assertEqual(
+            mock_request.call_args.kwargs["timeout"],
+            (clients.setting("HTTP_CONNECT_TIMEOUT_SECONDS"), 7),
+        )
+
+
+class CountedHttpxClientTests(ClientTestCase):
+    """Tests for the instrumented httpx client the Anthropic SDK uses."""
+
+    def test_requests_and_connections_are_counted(self):
+        """Test that requests over a kept-alive connection count as reused."""
+        stats = clients.ConnectionStats()
+        with clients.counted_httpx_client(stats, httpx.Timeout(5)) as client:
+            for _ in range(3):
+                client.get(self.url)
+        self.assertEqual((stats.requests, stats.connections_opened), (3, 1))
+
+
+class LogConnectionStatsTests(SimpleTestCase):
+    """Tests for logging the connection counts."""
+
+    def test_stats_are_logged_at_info(self):
+        """Test that each client's counts go to the http_clients logger."""
+        with patch.object(
+            clients,
+            "get_connection_stats",
+            return_value={
+                "api": clients.ConnectionStats(requests=3, connections_opened=1)
+            },
+        ):
+            with self.assertLogs("http_clients", level="INFO") as logs:
+                clients.log_connection_stats()
+        self.assertEqual(
+            logs.output,
+            [
+                "INFO:http_clients.clients:HTTP client api: 3 requests, "
+                "1 connections opened, 2 reused"
+            ],
+        )
+
+
+class GetClientTests(SimpleTestCase):
+    """Tests for the per-process client getters."""
+
+    def setUp(self):
+        clients.get_twilio_client.cache_clear()
+        self.addCleanup(clients.get_twilio_client.cache_clear)
+
+    def test_twilio_client_is_built_once_per_account(self):
+        """Test that every cycle gets the same Twilio client, with a pooled session."""
+        client = clients.get_twilio_client("AC123", "token")
+        self.assertIs(clients.get_twilio_client("AC123", "token"), client)
+        self.assertIsNot(clients.get_twilio_client("AC456", "token"), client)
+        self.assertIn("twilio", clients.get_connection_stats())
+
+    def test_environment_overrides_defaults(self):
+        """Test that settings can be overridden by environment variables."""
+        with patch.dict(os.environ, {"HTTP_MAX_RETRIES": "5"}):
+            self.assertEqual(clients.make_retry().total, 5)
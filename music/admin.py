@@ -9,6 +9,17 @@ class MusicianAdmin(admin.ModelAdmin):
     ordering = ["name"]
 
 
+class MusicAdmin(admin.ModelAdmin):
+    """Admin interface for albums. Review columns are owned by the sync_reviews command."""
+
+    readonly_fields = [
+        "review_markdown",
+        "review_html",
+        "review_excerpt",
+        "review_hash",
+    ]
+
+
 class TagAdmin(admin.ModelAdmin):
     """Admin interface for tags, ordered alphabetically by name."""
 
@@ -16,6 +27,6 @@ class TagAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Tag, TagAdmin)
-admin.site.register(Music)
+admin.site.register(Music, MusicAdmin)
 admin.site.register(Musician, MusicianAdmin)
 admin.site.register(BestOf)
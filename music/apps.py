@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class MusicConfig(AppConfig):
     name = "music"
+
+    def ready(self) -> None:
+        # Connects the signal handlers.
+        from . import signals  # noqa: F401
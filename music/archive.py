@@ -0,0 +1,72 @@
+"""
+The full archive of albums, newest review first, one page at a time.
+
+Pages are addressed by a (reviewed_at, id) keyset cursor instead of an OFFSET, so a page deep in the archive costs the
+same as the first: Postgres walks the reviewed_at index from the cursor and stops after one page of rows.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+
+from .constants import ARCHIVE_PAGE_SIZE, REVIEW_BODY_FIELDS
+from .models import Music
+
+
+@dataclass(frozen=True)
+class ArchiveCursor:
+    """The position of the last album on a page: later pages hold older reviews, ties broken by id."""
+
+    reviewed_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        """Serializes the cursor for a query string."""
+        return f"{self.reviewed_at.isoformat()}_{self.id}"
+
+    @classmethod
+    def decode(cls, value: str) -> "ArchiveCursor":
+        """Parses a cursor produced by encode(), raising ValueError if it is malformed."""
+        reviewed_at, _, album_id = value.rpartition("_")
+        parsed = datetime.fromisoformat(reviewed_at)
+        if parsed.tzinfo is None:
+            raise ValueError("Cursor timestamp has no timezone")
+        return cls(reviewed_at=parsed, id=int(album_id))
+
+
+def archive_albums(
+    after: ArchiveCursor | None = None,
+    rating: int | None = None,
+    tag: str | None = None,
+    limit: int = ARCHIVE_PAGE_SIZE,
+) -> tuple[list[Music], ArchiveCursor | None]:
+    """Returns one page of albums, most recently reviewed first, optionally restricted to a rating and/or tag name.
+
+    The second element is the cursor for the next page, or None if this is the last page.
+    """
+    albums = (
+        Music.objects.select_related("musician")
+        .prefetch_related("musician__tags")
+        .defer(*REVIEW_BODY_FIELDS)
+        .order_by("-reviewed_at", "-id")
+    )
+    if rating is not None:
+        albums = albums.filter(rating=rating)
+    if tag is not None:
+        albums = albums.filter(musician__tags__name=tag)
+    if after is not None:
+        # Equivalent to (reviewed_at, id) < (after.reviewed_at, after.id), but written so that the reviewed_at bound
+        # can be used as an index condition; the id comparison only ever discards ties.
+        albums = albums.filter(
+            Q(reviewed_at__lt=after.reviewed_at)
+            | Q(reviewed_at=after.reviewed_at, id__lt=after.id),
+            reviewed_at__lte=after.reviewed_at,
+        )
+
+    # Fetch one extra row to find out whether there is another page.
+    page = list(albums[: limit + 1])
+    if len(page) <= limit:
+        return page, None
+    last = page[limit - 1]
+    return page[:limit], ArchiveCursor(reviewed_at=last.reviewed_at, id=last.id)
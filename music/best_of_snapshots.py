@@ -0,0 +1,142 @@
+"""
+Materialized contents of the BestOf pages.
+
+Building a BestOf page means partitioning every album reviewed in the period by rating and counting tags across all of
+them, which is wasted work when nothing has changed since the last visit. Instead the result is stored in a
+BestOfSnapshot and the page is rendered straight from it.
+
+A snapshot is thrown away when one of its albums, their musicians or tags, or the BestOf itself changes (see
+music.signals), and rebuilt lazily by the next request. rebuild_best_of_snapshots rebuilds all of them eagerly.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import asdict
+from typing import Any
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .constants import PHOTO_DISPLAY_LIMIT, REVIEW_BODY_FIELDS, MusicRating
+from .models import BestOf, BestOfSnapshot, Music, Tag
+
+
+def serialize_album(album: Music) -> dict[str, Any]:
+    """Returns the fields of an album that the BestOf template reads."""
+    image_info = album.image_info()
+    return {
+        "id": album.id,
+        "name": album.name,
+        "musician": {"name": album.musician.name},
+        "very_short_description": album.very_short_description,
+        "classes": album.classes(),
+        "image_info": asdict(image_info) if image_info else None,
+    }
+
+
+def serialize_tag(tag: Tag) -> dict[str, Any]:
+    """Returns the fields of a tag that the BestOf template reads."""
+    return {"name": tag.name, "classname": tag.classname()}
+
+
+def build_snapshot(best_of: BestOf) -> BestOfSnapshot:
+    """Recomputes and stores the snapshot of a BestOf, replacing any existing one."""
+    relevant_albums = list(
+        Music.objects.filter(
+            reviewed_at__gt=best_of.start_date,
+            reviewed_at__lt=best_of.end_date,
+            exclude_from_best_of_list=False,
+        )
+        .defer(*REVIEW_BODY_FIELDS)
+        .select_related("musician")
+        .prefetch_related("musician__tags")
+    )
+    albums_by_score: defaultdict[int, list[Music]] = defaultdict(list)
+    # Partition by rating.
+    for album in relevant_albums:
+        albums_by_score[album.rating].append(album)
+    # Sort according to review date.
+    for value in albums_by_score.values():
+        value.sort(key=lambda x: x.reviewed_at)
+    albums_with_photos = (
+        albums_by_score[MusicRating.BEST]
+        + albums_by_score[MusicRating.GREAT]
+        + albums_by_score[MusicRating.GOOD]
+    )
+    albums_with_photos = [album for album in albums_with_photos if album.image_src()]
+
+    tag_counter: Counter[Tag] = Counter()
+    for album in relevant_albums:
+        for tag in album.musician.tags.all():
+            tag_counter[tag] += 1
+
+    defaults = {
+        "album_ids": [album.id for album in relevant_albums],
+        "best_albums": [
+            serialize_album(album) for album in albums_by_score[MusicRating.BEST]
+        ],
+        "great_albums": [
+            serialize_album(album) for album in albums_by_score[MusicRating.GREAT]
+        ],
+        "good_albums": [
+            serialize_album(album) for album in albums_by_score[MusicRating.GOOD]
+        ],
+        "albums_with_photos": [
+            serialize_album(album) for album in albums_with_photos[:PHOTO_DISPLAY_LIMIT]
+        ],
+        "tags_with_quantity": [
+            [serialize_tag(tag), quantity]
+            for tag, quantity in tag_counter.most_common()
+        ],
+    }
+    try:
+        with transaction.atomic():
+            snapshot, _ = BestOfSnapshot.objects.update_or_create(
+                best_of=best_of, defaults=defaults
+            )
+    except IntegrityError:
+        # A concurrent request stored a snapshot first; ours is just as fresh, so overwrite it.
+        snapshot, _ = BestOfSnapshot.objects.update_or_create(
+            best_of=best_of, defaults=defaults
+        )
+    return snapshot
+
+
+def get_snapshot(best_of: BestOf) -> BestOfSnapshot:
+    """Returns the stored snapshot of a BestOf, building it first if there isn't one."""
+    try:
+        return best_of.snapshot
+    except BestOfSnapshot.DoesNotExist:
+        return build_snapshot(best_of)
+
+
+def invalidate_snapshots_for_album(album: Music) -> int:
+    """Deletes the snapshots that contain an album or whose period covers its review date."""
+    reviewed_on = album.reviewed_at.date()
+    # Inclusive on both ends: a spare rebuild is cheaper than working out timezone edge cases.
+    covering_period = Q(
+        best_of__start_date__lte=reviewed_on, best_of__end_date__gte=reviewed_on
+    )
+    deleted, _ = BestOfSnapshot.objects.filter(
+        Q(album_ids__contains=[album.id]) | covering_period
+    ).delete()
+    return deleted
+
+
+def invalidate_snapshots_for_albums(album_ids: list[int]) -> int:
+    """Deletes the snapshots that contain any of the given albums."""
+    deleted, _ = BestOfSnapshot.objects.filter(album_ids__overlap=album_ids).delete()
+    return deleted
+
+
+def invalidate_all_snapshots() -> int:
+    """Deletes every snapshot."""
+    deleted, _ = BestOfSnapshot.objects.all().delete()
+    return deleted
+
+
+def rebuild_all_snapshots() -> int:
+    """Rebuilds the snapshot of every BestOf and returns how many were built."""
+    best_ofs = list(BestOf.objects.all())
+    for best_of in best_ofs:
+        build_snapshot(best_of)
+    return len(best_ofs)
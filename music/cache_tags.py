@@ -0,0 +1,51 @@
+"""
+The tags that cached music pages and fragments carry, so music.signals can invalidate exactly the ones a change affects.
+
+Album pages carry their album's tag, lists of albums (the home page, Best Of lists) carry MUSIC_LIST_CACHE_TAG, and
+anything displaying tag names also carries MUSIC_TAGS_CACHE_TAG.
+"""
+
+from collections.abc import Iterable
+
+from django.http import HttpRequest
+
+from tagged_cache.cache import invalidate_tags
+
+from .constants import (
+    ALBUM_CACHE_TAG,
+    BEST_OF_CACHE_TAG,
+    MUSIC_LIST_CACHE_TAG,
+    MUSIC_TAGS_CACHE_TAG,
+)
+
+
+def album_tag(album_id: int) -> str:
+    """Returns the tag of everything displaying an album's page."""
+    return ALBUM_CACHE_TAG.format(album_id=album_id)
+
+
+def best_of_tag(name: str) -> str:
+    """Returns the tag of a Best Of page's cached fragments."""
+    return BEST_OF_CACHE_TAG.format(name=name)
+
+
+def home_page_tags(request: HttpRequest) -> list[str]:
+    """Tags of the home page: the recent albums and the album of the month, with its tags."""
+    return [MUSIC_LIST_CACHE_TAG, MUSIC_TAGS_CACHE_TAG]
+
+
+def album_page_tags(request: HttpRequest, music_id: int) -> list[str]:
+    """Tags of an album page: the album (with its related albums and comments) and its musician's tags."""
+    return [album_tag(music_id), MUSIC_TAGS_CACHE_TAG]
+
+
+def best_of_page_tags(name: str) -> list[str]:
+    """Tags of a Best Of page's album lists, which show album names and the tags of their musicians."""
+    return [MUSIC_LIST_CACHE_TAG, MUSIC_TAGS_CACHE_TAG, best_of_tag(name)]
+
+
+def invalidate_albums(album_ids: Iterable[int]) -> None:
+    """Invalidates the pages of some albums and every list they may appear in."""
+    invalidate_tags(
+        MUSIC_LIST_CACHE_TAG, *[album_tag(album_id) for album_id in album_ids]
+    )
@@ -16,10 +16,51 @@ class MusicRating:
 DESCRIPTION_MAX_LENGTH = 500
 PHOTO_DISPLAY_LIMIT = 10
 RSS_FEED_QUANTITY = 30
+SEARCH_PAGE_SIZE = 50
+ARCHIVE_PAGE_SIZE = 50
+
+# Postgres text search configuration used to build and query Music.search_vector
+SEARCH_CONFIG = "english"
+
+# Full review bodies are only rendered on album pages, so list queries defer them.
+REVIEW_BODY_FIELDS = ("review_markdown", "review_html")
+
+# Feed documents are cached under a key that changes whenever an album does, so this only bounds how long stale
+# versions linger in the cache.
+FEED_CACHE_SECONDS = 60 * 60 * 24
+
+# Tags for pages and fragments cached with tagged_cache (see music.cache_tags). Album pages show comment ages
+# ("3 days ago"), so they are also re-rendered hourly.
+ALBUM_CACHE_TAG = "album:{album_id}"
+BEST_OF_CACHE_TAG = "best_of:{name}"
+MUSIC_LIST_CACHE_TAG = "music:list"
+MUSIC_TAGS_CACHE_TAG = "music:tags"
+ALBUM_PAGE_CACHE_SECONDS = 60 * 60
+
+# Related albums shown on each album page, and how quickly a review's weight in the ranking halves with age.
+RELATED_ALBUMS_COUNT = 5
+RELATED_ALBUMS_HALF_LIFE_DAYS = 2 * 365
+
+# Suggestions returned per typeahead request. The version file (not checked in) is rewritten whenever an album,
+# musician or tag changes, so every worker knows to rebuild its in-memory index.
+TYPEAHEAD_LIMIT = 10
+TYPEAHEAD_VERSION_PATH = "music/typeahead.version"
+
+# export_static_music writes the public music pages here, for nginx to serve to anonymous visitors.
+STATIC_SITE_DIR = "static_site/"
 
 # File paths
 REVIEWS_DIR = "music/reviews/"
 BEST_OF_DIR = "music/best_of/"
+MUSIC_STATIC_DIR = "music/static/"
+# Album images live under MUSIC_STATIC_DIR; this is also their prefix in static URLs.
+ALBUM_IMAGES_DIR = "music/images/"
+ALBUM_IMAGE_EXTENSION = ".jpg"
+# Generated by the build_image_manifest command at deploy time (not checked in).
+IMAGE_MANIFEST_PATH = "music/image_manifest.json"
+
+# Appended to review excerpts that were clipped to DESCRIPTION_MAX_LENGTH
+TRUNCATION_SUFFIX = "..."
 
 # Placeholder text
 NO_TAGS_PLACEHOLDER = "[no tags]"
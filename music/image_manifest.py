@@ -0,0 +1,101 @@
+"""
+A precomputed index of the album images under music/static/music/images/.
+
+Rendering a list of albums used to stat one file per album to find out whether it had a cover image. Instead, the
+build_image_manifest command scans the images once at deploy time and records each one's static path and pixel
+dimensions in a JSON manifest. Each worker loads the manifest the first time it is needed, after which Music.image_src()
+is a dict lookup. If the manifest hasn't been built (e.g. in local development) we fall back to scanning the directory,
+which still happens only once per process.
+"""
+
+import functools
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from PIL import Image
+
+from .constants import (
+    ALBUM_IMAGE_EXTENSION,
+    ALBUM_IMAGES_DIR,
+    IMAGE_MANIFEST_PATH,
+    MUSIC_STATIC_DIR,
+)
+
+# EXIF orientations that rotate the image by 90 degrees, so browsers display it with width and height swapped.
+EXIF_ORIENTATION_TAG = 0x0112
+ROTATED_EXIF_ORIENTATIONS = frozenset({5, 6, 7, 8})
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """The static path and displayed pixel dimensions of one album image."""
+
+    path: str
+    width: int
+    height: int
+
+
+def get_image_dimensions(path: str) -> tuple[int, int]:
+    """Returns the (width, height) the image is displayed at, honoring EXIF rotation."""
+    # Opening an image only parses its header; pixel data isn't decoded.
+    with Image.open(path) as image:
+        width, height = image.size
+        if image.getexif().get(EXIF_ORIENTATION_TAG) in ROTATED_EXIF_ORIENTATIONS:
+            return height, width
+    return width, height
+
+
+def scan_images() -> dict[str, ImageInfo]:
+    """Walks the album images directory, keyed by static path (e.g. music/images/band/album.jpg)."""
+    static_root = os.path.join(settings.BASE_DIR, MUSIC_STATIC_DIR)
+    images_root = os.path.join(static_root, ALBUM_IMAGES_DIR)
+    manifest = {}
+    for dirpath, _, filenames in os.walk(images_root):
+        for filename in filenames:
+            if not filename.endswith(ALBUM_IMAGE_EXTENSION):
+                continue
+            full_path = os.path.join(dirpath, filename)
+            static_path = os.path.relpath(full_path, static_root).replace(os.sep, "/")
+            try:
+                width, height = get_image_dimensions(full_path)
+            except OSError:
+                # A file the browser couldn't display either; treat it as missing.
+                logging.warning(f"Skipping unreadable album image: {full_path}")
+                continue
+            manifest[static_path] = ImageInfo(static_path, width, height)
+    return manifest
+
+
+def write_image_manifest() -> dict[str, ImageInfo]:
+    """Scans the album images and writes the result to IMAGE_MANIFEST_PATH."""
+    manifest = scan_images()
+    serialized = {path: asdict(info) for path, info in sorted(manifest.items())}
+    with open(
+        os.path.join(settings.BASE_DIR, IMAGE_MANIFEST_PATH), "w", encoding="utf-8"
+    ) as manifest_file:
+        json.dump(serialized, manifest_file, indent=2)
+    return manifest
+
+
+def read_image_manifest() -> dict[str, ImageInfo] | None:
+    """Loads the manifest from IMAGE_MANIFEST_PATH, or returns None if it hasn't been built."""
+    try:
+        with open(
+            os.path.join(settings.BASE_DIR, IMAGE_MANIFEST_PATH), encoding="utf-8"
+        ) as manifest_file:
+            serialized = json.load(manifest_file)
+    except IOError:
+        return None
+    return {path: ImageInfo(**info) for path, info in serialized.items()}
+
+
+@functools.cache
+def get_image_manifest() -> dict[str, ImageInfo]:
+    """Returns this process's copy of the image manifest, loading it on first use."""
+    manifest = read_image_manifest()
+    if manifest is None:
+        manifest = scan_images()
+    return manifest
@@ -0,0 +1,18 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from music.constants import IMAGE_MANIFEST_PATH
+from music.image_manifest import write_image_manifest
+
+
+class Command(BaseCommand):
+    help = "Records the path and dimensions of every album image so pages never stat image files."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        manifest = write_image_manifest()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(manifest)} album images to {IMAGE_MANIFEST_PATH}."
+            )
+        )
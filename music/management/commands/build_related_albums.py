@@ -0,0 +1,24 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from music.related_albums import build_related_albums
+
+
+class Command(BaseCommand):
+    help = "Recomputes the related albums shown on album pages, for albums affected by tag, rating or review changes."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every album (e.g. to refresh the recency weighting).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        result = build_related_albums(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recomputed related albums for {result.recomputed} of {result.total} albums."
+            )
+        )
@@ -0,0 +1,34 @@
+import os
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from music.constants import STATIC_SITE_DIR
+from music.static_export import export_static_site
+
+
+class Command(BaseCommand):
+    help = "Renders the public music pages to static HTML for nginx, re-rendering only pages whose data changed."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render every page, even if nothing it shows has changed.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        result = export_static_site(
+            os.path.join(settings.BASE_DIR, STATIC_SITE_DIR), force=options["force"]
+        )
+        for url in result.rendered:
+            self.stdout.write(f"Rendered {url}")
+        for url in result.removed:
+            self.stdout.write(f"Removed {url}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(result.rendered)} rendered, {result.unchanged} unchanged, "
+                f"{len(result.removed)} removed."
+            )
+        )
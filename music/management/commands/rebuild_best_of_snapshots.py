@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from music.best_of_snapshots import rebuild_all_snapshots
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the stored contents of every Best Of page."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rebuilt = rebuild_all_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} Best Of snapshots."))
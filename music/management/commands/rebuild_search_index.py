@@ -0,0 +1,14 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from music.models import Music
+from music.search_index import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recomputes the full-text search vector of every album."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        updated = update_search_vectors(Music.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {updated} albums."))
@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from music.review_sync import sync_reviews
+
+
+class Command(BaseCommand):
+    help = "Imports album reviews from music/reviews/ into the database, re-rendering only changed files."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without saving anything.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        dry_run = options["dry_run"]
+        result = sync_reviews(dry_run=dry_run)
+
+        for album in result.updated:
+            self.stdout.write(f"Updated review: {album}")
+        for album in result.cleared:
+            self.stdout.write(f"Cleared review (file missing): {album}")
+        for path in result.orphaned_paths:
+            self.stdout.write(
+                self.style.WARNING(f"Review file has no matching album: {path}")
+            )
+
+        prefix = "[dry run] " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{len(result.updated)} updated, {len(result.cleared)} cleared, "
+                f"{result.unchanged} unchanged, {len(result.orphaned_paths)} orphaned."
+            )
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("music", "0009_alter_bestof_options_alter_comment_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="music",
+            name="review_excerpt",
+            field=models.CharField(blank=True, max_length=503, null=True),
+        ),
+        migrations.AddField(
+            model_name="music",
+            name="review_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="music",
+            name="review_html",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="music",
+            name="review_markdown",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:27
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("music", "0010_music_review_columns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="music",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="music",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="music_search_vector_gin"
+            ),
+        ),
+    ]
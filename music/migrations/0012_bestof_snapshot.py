@@ -0,0 +1,57 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:31
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("music", "0011_music_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BestOfSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "album_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+                ("best_albums", models.JSONField(default=list)),
+                ("great_albums", models.JSONField(default=list)),
+                ("good_albums", models.JSONField(default=list)),
+                ("albums_with_photos", models.JSONField(default=list)),
+                ("tags_with_quantity", models.JSONField(default=list)),
+                ("built_at", models.DateTimeField(auto_now=True)),
+                (
+                    "best_of",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot",
+                        to="music.bestof",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["album_ids"], name="music_bestof_album_ids_gin"
+                    )
+                ],
+            },
+        ),
+    ]
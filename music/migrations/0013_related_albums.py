@@ -0,0 +1,78 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:41
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("music", "0012_bestof_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedAlbumsInput",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("album_id", models.IntegerField(unique=True)),
+                (
+                    "tag_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+                ("rating", models.SmallIntegerField()),
+                ("reviewed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RelatedAlbum",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                (
+                    "album",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_entries",
+                        to="music.music",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="music.music",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["album", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("album", "rank"), name="music_relatedalbum_album_rank"
+                    )
+                ],
+            },
+        ),
+    ]
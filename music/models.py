@@ -1,18 +1,29 @@
 import os
 from datetime import datetime
+from typing import Any
 
 import markdown2
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.urls import reverse
 from django.utils.safestring import SafeString, mark_safe
 
+from content_store.markdown_store import render_markdown_file
+
 from .constants import (
+    ALBUM_IMAGE_EXTENSION,
+    ALBUM_IMAGES_DIR,
     BEST_OF_DIR,
     DESCRIPTION_MAX_LENGTH,
     NO_REVIEW_PLACEHOLDER,
     NO_TAGS_PLACEHOLDER,
     REVIEWS_DIR,
+    TRUNCATION_SUFFIX,
 )
+from .image_manifest import ImageInfo, get_image_manifest
 
 
 def convert_name_to_directory_format(name: str) -> str:
@@ -32,6 +43,14 @@ def convert_markdown_and_mark_safe(text: str | None) -> SafeString | None:
     return mark_safe(review_as_html)
 
 
+def clip_review(text: str) -> str:
+    """Clips review markdown to DESCRIPTION_MAX_LENGTH, marking the cut with an ellipsis."""
+    review_clipped = text[:DESCRIPTION_MAX_LENGTH]
+    if len(text) != len(review_clipped):
+        review_clipped += TRUNCATION_SUFFIX
+    return review_clipped
+
+
 class Musician(models.Model):
     """Represents one musician or band."""
 
@@ -75,36 +94,53 @@ class Music(models.Model):
 
     src = models.CharField(max_length=300, null=True, blank=True)
 
+    # Denormalized copy of music/reviews/<musician>/<album>.md, populated by the
+    # sync_reviews management command so that rendering a page never touches disk
+    # or re-runs markdown. review_hash lets the sync skip unchanged files.
+    review_markdown = models.TextField(null=True, blank=True)
+    review_html = models.TextField(null=True, blank=True)
+    review_excerpt = models.CharField(
+        max_length=DESCRIPTION_MAX_LENGTH + len(TRUNCATION_SUFFIX),
+        null=True,
+        blank=True,
+    )
+    review_hash = models.CharField(max_length=64, null=True, blank=True)
+
+    # Weighted full-text index over the album/musician names, tags and review. Maintained by music.search_index.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["-reviewed_at"]
         verbose_name = "Album"
         verbose_name_plural = "Albums"
         indexes = [
             models.Index(fields=["-reviewed_at"]),
+            GinIndex(fields=["search_vector"], name="music_search_vector_gin"),
         ]
 
     def __str__(self) -> str:
         """Returns the album name prefixed with the musician name."""
         return f"{self.musician}: {self.name}"
 
-    def review(self) -> SafeString | None:
-        """Returns the album review as safe HTML, or None if no review file exists."""
-        return convert_markdown_and_mark_safe(self.review_txt())
-
-    def review_txt(self) -> str | None:
-        """Returns the raw markdown content of the album review, or None if file not found."""
-        path_to_review = os.path.join(
+    def review_path(self) -> str:
+        """Returns the absolute path of the markdown file this album's review is synced from."""
+        return os.path.join(
             settings.BASE_DIR,
             REVIEWS_DIR,
             convert_name_to_directory_format(self.musician.name),
             convert_name_to_directory_format(self.name) + ".md",
         )
-        try:
-            with open(path_to_review, encoding="utf-8") as review_file:
-                review_as_markdown = review_file.read()
-        except IOError:
+
+    def review(self) -> SafeString | None:
+        """Returns the pre-rendered album review as safe HTML, or None if there is no review."""
+        if self.review_html is None:
             return None
-        return review_as_markdown
+        # Rendered by sync_reviews from markdown that I write myself, so it is safe.
+        return mark_safe(self.review_html)
+
+    def review_txt(self) -> str | None:
+        """Returns the raw markdown content of the album review, or None if there is no review."""
+        return self.review_markdown
 
     def description(self) -> str:
         """Returns a description combining tags and a clipped review (max 500 chars)."""
@@ -116,31 +152,83 @@ class Music(models.Model):
         else:
             tags_string = NO_TAGS_PLACEHOLDER
 
-        review = self.review_txt()
-        if review:
-            review_clipped = review[:DESCRIPTION_MAX_LENGTH]
-            if len(review) != len(review_clipped):
-                review_clipped += "..."
-        else:
-            review_clipped = NO_REVIEW_PLACEHOLDER
+        review_clipped = self.review_excerpt or NO_REVIEW_PLACEHOLDER
         return f"{tags_string} {review_clipped}"
 
+    def image_info(self) -> ImageInfo | None:
+        """Returns the static path and dimensions of the album image, or None if there is no image."""
+        path = (
+            f"{ALBUM_IMAGES_DIR}{convert_name_to_directory_format(self.musician.name)}/"
+            f"{convert_name_to_directory_format(self.name)}{ALBUM_IMAGE_EXTENSION}"
+        )
+        return get_image_manifest().get(path)
+
     def image_src(self) -> str | None:
         """Returns the relative path to the album image if it exists, otherwise None."""
-        path = os.path.join(
-            "music",
-            "images",
-            convert_name_to_directory_format(self.musician.name),
-            convert_name_to_directory_format(self.name) + ".jpg",
-        )
-        if os.path.exists(os.path.join(settings.BASE_DIR, "music/static", path)):
-            return path
-        return None
+        image_info = self.image_info()
+        if image_info is None:
+            return None
+        return image_info.path
 
     def classes(self) -> list[str]:
         """Returns a list of CSS class names derived from the musician's tags."""
         return [tag.classname() for tag in self.musician.tags.all()]
 
+    def to_dict_for_api(self) -> dict[str, Any]:
+        """Returns the album's summary fields, its musician's tags and its URL as a JSON-serializable dict."""
+        return dict(
+            id=self.id,
+            name=self.name,
+            musician=self.musician.name,
+            rating=self.rating,
+            reviewed_at=self.reviewed_at.isoformat(),
+            album_released_date=(
+                self.album_released_date.isoformat()
+                if self.album_released_date
+                else None
+            ),
+            very_short_description=self.very_short_description,
+            tags=[tag.name for tag in self.musician.tags.all()],
+            url=reverse("music:music_detailed", args=[self.id]),
+        )
+
+
+class RelatedAlbum(models.Model):
+    """One entry of an album's precomputed "related albums" list. Maintained by music.related_albums."""
+
+    album = models.ForeignKey(
+        Music, on_delete=models.CASCADE, related_name="related_entries"
+    )
+    related = models.ForeignKey(Music, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["album", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["album", "rank"], name="music_relatedalbum_album_rank"
+            )
+        ]
+
+    def __str__(self) -> str:
+        """Returns the album, rank and related album."""
+        return f"{self.album_id} #{self.rank}: {self.related_id}"
+
+
+class RelatedAlbumsInput(models.Model):
+    """What an album looked like when its related albums were last computed, so later runs can tell what changed."""
+
+    # Not a foreign key: the row has to outlive a deleted album so that its former neighbours get recomputed.
+    album_id = models.IntegerField(unique=True)
+    tag_ids = ArrayField(models.IntegerField(), default=list)
+    rating = models.SmallIntegerField()
+    reviewed_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        """Returns the album id and its tags."""
+        return f"{self.album_id}: {self.tag_ids}"
+
 
 class Tag(models.Model):
     """Encapsulates a tag that can be applied to musicians to classify their work."""
@@ -205,15 +293,18 @@ class BestOf(models.Model):
         verbose_name = "Best Of"
         verbose_name_plural = "Best Of Lists"
 
-    def description_txt(self) -> str | None:
-        """Returns the raw markdown description from file, or None if not found."""
-        path_to_description = os.path.join(
+    def description_path(self) -> str:
+        """Returns the path of the markdown file describing this list."""
+        return os.path.join(
             settings.BASE_DIR,
             BEST_OF_DIR,
             convert_name_to_directory_format(self.name) + ".md",
         )
+
+    def description_txt(self) -> str | None:
+        """Returns the raw markdown description from file, or None if not found."""
         try:
-            with open(path_to_description, encoding="utf-8") as description_file:
+            with open(self.description_path(), encoding="utf-8") as description_file:
                 description_as_markdown = description_file.read()
         except IOError:
             return None
@@ -221,8 +312,40 @@ class BestOf(models.Model):
 
     def description(self) -> SafeString | None:
         """Returns the description as safe HTML, or None if no description file exists."""
-        return convert_markdown_and_mark_safe(self.description_txt())
+        # Rendered once per version of the file rather than on every page view.
+        return render_markdown_file(self.description_path())
 
     def __str__(self) -> str:
         """Returns a formatted string with name and date range."""
         return f"{self.name}: {self.start_date.isoformat()} until {self.end_date.isoformat()}"
+
+
+class BestOfSnapshot(models.Model):
+    """
+    The precomputed contents of a BestOf page, so rendering it doesn't require re-partitioning every album.
+
+    Albums and tags are stored as the plain dicts the template reads. Snapshots are deleted when anything they were
+    built from changes (see music.signals) and rebuilt on the next request.
+    """
+
+    best_of = models.OneToOneField(
+        BestOf, on_delete=models.CASCADE, related_name="snapshot"
+    )
+    # Every album that was considered, regardless of rating, so edits to any of them can find this snapshot.
+    album_ids = ArrayField(models.IntegerField(), default=list)
+
+    best_albums = models.JSONField(default=list)
+    great_albums = models.JSONField(default=list)
+    good_albums = models.JSONField(default=list)
+    albums_with_photos = models.JSONField(default=list)
+    # Pairs of [tag, album count], most popular first.
+    tags_with_quantity = models.JSONField(default=list)
+
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [GinIndex(fields=["album_ids"], name="music_bestof_album_ids_gin")]
+
+    def __str__(self) -> str:
+        """Returns the name of the BestOf and when the snapshot was built."""
+        return f"Snapshot of {self.best_of.name} ({self.built_at.isoformat()})"
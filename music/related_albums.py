@@ -0,0 +1,222 @@
+"""
+Precomputed "related albums" for each album page.
+
+An album is described by its musician's tags, as one row of a TF-IDF weighted album x tag matrix (so a tag that few
+albums share counts for more than a common one). Candidates are scored by cosine similarity, scaled by their rating and
+by an exponential decay on how long ago they were reviewed, and the best RELATED_ALBUMS_COUNT are stored as
+RelatedAlbum rows. The album page then reads them with one indexed query.
+
+build_related_albums only recomputes rows that can have changed: albums whose tags, rating or review date differ from
+the last run, plus every album sharing a tag (old or new) with one of those or with a deleted album. Scaling all
+candidates by the same recency reference doesn't change the order within a row, so rows computed on different days
+stay consistent with each other.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from tagged_cache.cache import invalidate_tags
+
+from .cache_tags import album_tag
+from .constants import (
+    RELATED_ALBUMS_COUNT,
+    RELATED_ALBUMS_HALF_LIFE_DAYS,
+    MusicRating,
+)
+from .models import Music, Musician, RelatedAlbum, RelatedAlbumsInput
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class AlbumFeatures:
+    """Everything about an album that its related albums are computed from."""
+
+    tag_ids: tuple[int, ...]
+    rating: int
+    reviewed_at: datetime
+
+
+@dataclass
+class RelatedAlbumsResult:
+    """The outcome of a build_related_albums() run."""
+
+    recomputed: int = 0
+    total: int = 0
+
+
+def current_features() -> dict[int, AlbumFeatures]:
+    """Returns the features of every album, keyed by album id."""
+    tags_by_musician: defaultdict[int, list[int]] = defaultdict(list)
+    for musician_id, tag_id in Musician.tags.through.objects.order_by(
+        "tag_id"
+    ).values_list("musician_id", "tag_id"):
+        tags_by_musician[musician_id].append(tag_id)
+    return {
+        album_id: AlbumFeatures(
+            tuple(tags_by_musician[musician_id]), rating, reviewed_at
+        )
+        for album_id, musician_id, rating, reviewed_at in Music.objects.values_list(
+            "id", "musician_id", "rating", "reviewed_at"
+        )
+    }
+
+
+def stored_features() -> dict[int, AlbumFeatures]:
+    """Returns the features each album had when its row was last computed."""
+    return {
+        row.album_id: AlbumFeatures(tuple(row.tag_ids), row.rating, row.reviewed_at)
+        for row in RelatedAlbumsInput.objects.all()
+    }
+
+
+def affected_albums(
+    current: dict[int, AlbumFeatures], stored: dict[int, AlbumFeatures]
+) -> set[int]:
+    """Returns the albums whose related albums may differ from what is stored."""
+    changed = {
+        album_id
+        for album_id, features in current.items()
+        if stored.get(album_id) != features
+    }
+    deleted = set(stored) - set(current)
+
+    # Any album sharing a tag with a changed album, before or after the change, may gain or lose it as a neighbour.
+    touched_tags: set[int] = set()
+    for album_id in changed | deleted:
+        for features in (current.get(album_id), stored.get(album_id)):
+            if features is not None:
+                touched_tags.update(features.tag_ids)
+    return changed | {
+        album_id
+        for album_id, features in current.items()
+        if touched_tags.intersection(features.tag_ids)
+    }
+
+
+def build_feature_matrix(
+    album_ids: list[int], features: dict[int, AlbumFeatures]
+) -> np.ndarray:
+    """Returns the L2-normalized TF-IDF album x tag matrix, one row per album in album_ids."""
+    tag_columns = {
+        tag_id: column
+        for column, tag_id in enumerate(
+            sorted({tag_id for album in features.values() for tag_id in album.tag_ids})
+        )
+    }
+    rows, columns = [], []
+    for row, album_id in enumerate(album_ids):
+        for tag_id in features[album_id].tag_ids:
+            rows.append(row)
+            columns.append(tag_columns[tag_id])
+
+    # Each album has a handful of tags, so the matrix is built from its nonzero coordinates.
+    matrix = np.zeros((len(album_ids), len(tag_columns)))
+    matrix[rows, columns] = 1.0
+    # Every column belongs to a tag some album has, so no document frequency is zero.
+    document_frequency = matrix.sum(axis=0)
+    matrix *= np.log(len(album_ids) / document_frequency) + 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def candidate_weights(
+    album_ids: list[int], features: dict[int, AlbumFeatures], now: datetime
+) -> np.ndarray:
+    """Returns how strongly each album is preferred as a suggestion, from its rating and review age."""
+    ratings = np.array([features[album_id].rating for album_id in album_ids], float)
+    ages_in_days = np.array(
+        [
+            (now - features[album_id].reviewed_at).total_seconds() / SECONDS_PER_DAY
+            for album_id in album_ids
+        ]
+    )
+    return (ratings / MusicRating.BEST) * np.power(
+        0.5, np.maximum(ages_in_days, 0) / RELATED_ALBUMS_HALF_LIFE_DAYS
+    )
+
+
+def top_related(
+    scores: np.ndarray, k: int = RELATED_ALBUMS_COUNT
+) -> list[list[tuple[int, float]]]:
+    """Returns the (column, score) of the k best positive scores of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return [[] for _ in range(scores.shape[0])]
+    # argpartition finds each row's top k in linear time; only those k are then sorted.
+    top_columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top_columns, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    top_columns = np.take_along_axis(top_columns, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return [
+        [
+            (int(column), float(score))
+            for column, score in zip(columns, row_scores)
+            if score > 0
+        ]
+        for columns, row_scores in zip(top_columns, top_scores)
+    ]
+
+
+def build_related_albums(full: bool = False) -> RelatedAlbumsResult:
+    """Recomputes the related albums of every album that may have changed (or of all of them, if full)."""
+    current = current_features()
+    stored = {} if full else stored_features()
+    affected = set(current) if full else affected_albums(current, stored)
+
+    album_ids = sorted(current)
+    rows = sorted(affected)
+    related_rows: list[RelatedAlbum] = []
+    if rows:
+        matrix = build_feature_matrix(album_ids, current)
+        column_of = {album_id: column for column, album_id in enumerate(album_ids)}
+        row_columns = [column_of[album_id] for album_id in rows]
+
+        scores = (matrix[row_columns] @ matrix.T) * candidate_weights(
+            album_ids, current, timezone.now()
+        )
+        # An album is not related to itself.
+        scores[np.arange(len(rows)), row_columns] = 0.0
+
+        for album_id, related in zip(rows, top_related(scores)):
+            related_rows.extend(
+                RelatedAlbum(
+                    album_id=album_id,
+                    related_id=album_ids[column],
+                    rank=rank,
+                    score=score,
+                )
+                for rank, (column, score) in enumerate(related, start=1)
+            )
+
+    changed_inputs = [
+        album_id for album_id in current if stored.get(album_id) != current[album_id]
+    ]
+    with transaction.atomic():
+        RelatedAlbum.objects.filter(album_id__in=rows).delete()
+        RelatedAlbum.objects.bulk_create(related_rows)
+        if full:
+            RelatedAlbumsInput.objects.all().delete()
+        else:
+            RelatedAlbumsInput.objects.filter(
+                album_id__in=set(changed_inputs) | (set(stored) - set(current))
+            ).delete()
+        RelatedAlbumsInput.objects.bulk_create(
+            RelatedAlbumsInput(
+                album_id=album_id,
+                tag_ids=list(current[album_id].tag_ids),
+                rating=current[album_id].rating,
+                reviewed_at=current[album_id].reviewed_at,
+            )
+            for album_id in changed_inputs
+        )
+        # The rows were replaced in bulk, which sends no signals, so the album pages showing them are invalidated here.
+        invalidate_tags(*[album_tag(album_id) for album_id in rows])
+    return RelatedAlbumsResult(recomputed=len(rows), total=len(current))
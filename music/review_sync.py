@@ -0,0 +1,113 @@
+"""
+Copies album reviews from music/reviews/ into the Music table.
+
+I write reviews as markdown files in this repo, but opening and rendering them on every request is wasteful. Instead,
+sync_reviews() imports each file into its album's row: the raw markdown, the rendered HTML, the clipped excerpt used by
+Music.description() and a content hash. Files whose hash hasn't changed are skipped, so re-running it after every deploy
+is cheap. Review files that don't belong to any album are reported so that typos in file names get noticed.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from .constants import REVIEWS_DIR
+from .models import Music, clip_review, convert_markdown_and_mark_safe
+
+REVIEW_FILE_EXTENSION = ".md"
+# updated_at is included so that anything keyed on it notices the new review.
+REVIEW_FIELDS = [
+    "review_markdown",
+    "review_html",
+    "review_excerpt",
+    "review_hash",
+    "updated_at",
+]
+
+
+@dataclass
+class ReviewSyncResult:
+    """Summarizes what a call to sync_reviews() changed."""
+
+    updated: list[Music] = field(default_factory=list)
+    cleared: list[Music] = field(default_factory=list)
+    unchanged: int = 0
+    orphaned_paths: list[str] = field(default_factory=list)
+
+
+def hash_review(text: str) -> str:
+    """Returns the hex SHA-256 digest of the review text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def read_review_file(path: str) -> str | None:
+    """Returns the contents of the review file, or None if it can't be read."""
+    try:
+        with open(path, encoding="utf-8") as review_file:
+            return review_file.read()
+    except IOError:
+        return None
+
+
+def apply_review(album: Music, text: str | None) -> bool:
+    """Copies the review text onto the album's review columns without saving.
+
+    Returns True if the album changed. Markdown is only rendered when the content hash differs from the stored one.
+    """
+    if text is None:
+        if album.review_hash is None:
+            return False
+        album.review_markdown = None
+        album.review_html = None
+        album.review_excerpt = None
+        album.review_hash = None
+        return True
+
+    new_hash = hash_review(text)
+    if new_hash == album.review_hash:
+        return False
+    album.review_markdown = text
+    album.review_html = str(convert_markdown_and_mark_safe(text))
+    album.review_excerpt = clip_review(text)
+    album.review_hash = new_hash
+    return True
+
+
+def find_orphaned_review_files(known_paths: set[str]) -> list[str]:
+    """Returns review files under REVIEWS_DIR that no album points to, sorted by path."""
+    reviews_root = os.path.join(settings.BASE_DIR, REVIEWS_DIR)
+    orphaned_paths = []
+    for dirpath, _, filenames in os.walk(reviews_root):
+        for filename in filenames:
+            if not filename.endswith(REVIEW_FILE_EXTENSION):
+                continue
+            path = os.path.normpath(os.path.join(dirpath, filename))
+            if path not in known_paths:
+                orphaned_paths.append(path)
+    return sorted(orphaned_paths)
+
+
+def sync_reviews(dry_run: bool = False) -> ReviewSyncResult:
+    """Imports every album's review file into the database.
+
+    With dry_run=True, reports what would change without saving anything.
+    """
+    result = ReviewSyncResult()
+    known_paths = set()
+    for album in Music.objects.select_related("musician"):
+        path = album.review_path()
+        known_paths.add(os.path.normpath(path))
+        if not apply_review(album, read_review_file(path)):
+            result.unchanged += 1
+            continue
+        if not dry_run:
+            album.save(update_fields=REVIEW_FIELDS)
+        if album.review_hash is None:
+            result.cleared.append(album)
+        else:
+            result.updated.append(album)
+
+    result.orphaned_paths = find_orphaned_review_files(known_paths)
+    return result
@@ -0,0 +1,125 @@
+"""
+Full-text search over albums, backed by Postgres.
+
+Each album's search_vector combines its name and musician (weight A), the musician's tags (weight B) and the review
+markdown (weight C), and a GIN index on it makes matching cheap. Vectors are refreshed whenever something that feeds
+into them is saved (see music.signals), and rebuild_search_index recomputes all of them if they ever drift.
+
+Results are ranked with ts_rank and paginated with a (rank, id) keyset cursor rather than OFFSET, so later pages cost
+the same as the first.
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.contrib.postgres.search import (
+    CombinedSearchVector,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db.models import F, FloatField, Q, QuerySet, TextField, Value
+from django.db.models.functions import Cast
+
+from .constants import REVIEW_BODY_FIELDS, SEARCH_CONFIG, SEARCH_PAGE_SIZE
+from .models import Music
+
+SEARCH_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    """The position of the last result on a page: results after it rank lower, ties broken by id."""
+
+    rank: float
+    id: int
+
+    def encode(self) -> str:
+        """Serializes the cursor for a query string."""
+        # repr() round-trips floats exactly, so the tie-break on rank stays precise.
+        return f"{self.rank!r}_{self.id}"
+
+    @classmethod
+    def decode(cls, value: str) -> "SearchCursor":
+        """Parses a cursor produced by encode(), raising ValueError if it is malformed."""
+        rank, _, album_id = value.partition("_")
+        return cls(rank=float(rank), id=int(album_id))
+
+
+def weighted_vector(text: str, weight: str) -> SearchVector:
+    """Returns a search vector over a literal string with the given weight."""
+    return SearchVector(
+        Value(text, output_field=TextField()), weight=weight, config=SEARCH_CONFIG
+    )
+
+
+def build_search_vector(album: Music, tag_names: list[str]) -> CombinedSearchVector:
+    """Returns the expression that computes the album's search_vector."""
+    return (
+        weighted_vector(f"{album.name} {album.musician.name}", "A")
+        + weighted_vector(" ".join(tag_names), "B")
+        + weighted_vector(album.review_markdown or "", "C")
+    )
+
+
+def update_search_vectors(albums: QuerySet[Music]) -> int:
+    """Recomputes search_vector for the given albums, returning how many were updated."""
+    albums = albums.select_related("musician").prefetch_related("musician__tags")
+    updated = 0
+    for album in albums:
+        tag_names = [tag.name for tag in album.musician.tags.all()]
+        # update() skips save(), so this neither bumps updated_at nor re-triggers our signals.
+        updated += Music.objects.filter(pk=album.pk).update(
+            search_vector=build_search_vector(album, tag_names)
+        )
+    return updated
+
+
+def build_search_query(search_term: str) -> SearchQuery | None:
+    """Turns what the user typed into a query matching every word as a prefix.
+
+    Prefix matching keeps partial names like "Mile" working. Returns None if there is nothing to search for.
+    """
+    words = SEARCH_WORD_PATTERN.findall(search_term)
+    if not words:
+        return None
+    # Only \\w characters survive, so nothing the user typed can inject tsquery syntax.
+    raw_query = " & ".join(f"{word}:*" for word in words)
+    return SearchQuery(raw_query, search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_albums(
+    search_term: str,
+    after: SearchCursor | None = None,
+    limit: int = SEARCH_PAGE_SIZE,
+) -> tuple[list[Music], SearchCursor | None]:
+    """Returns one page of albums matching the search term, best match first.
+
+    The second element is the cursor for the next page, or None if this is the last page.
+    """
+    query = build_search_query(search_term)
+    if query is None:
+        return [], None
+
+    albums = (
+        Music.objects.select_related("musician")
+        .defer(*REVIEW_BODY_FIELDS)
+        .filter(search_vector=query)
+        # ts_rank returns a float4, which the driver rounds on the way out. Casting to float8 means the rank we put in
+        # a cursor compares equal to the one Postgres computes when the cursor comes back.
+        .annotate(
+            rank=Cast(SearchRank(F("search_vector"), query), output_field=FloatField())
+        )
+        .order_by("-rank", "-id")
+    )
+    if after is not None:
+        albums = albums.filter(
+            Q(rank__lt=after.rank) | Q(rank=after.rank, id__lt=after.id)
+        )
+
+    # Fetch one extra row to find out whether there is another page.
+    page = list(albums[: limit + 1])
+    if len(page) <= limit:
+        return page, None
+    last = page[limit - 1]
+    return page[:limit], SearchCursor(rank=last.rank, id=last.id)
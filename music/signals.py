@@ -0,0 +1,237 @@
+"""
+Keeps derived data about albums (search vectors, BestOf snapshots, the typeahead index and cached pages) in sync when the models it is built from change.
+
+Connected in MusicConfig.ready().
+"""
+
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tagged_cache.cache import invalidate_tags
+
+from .best_of_snapshots import (
+    invalidate_all_snapshots,
+    invalidate_snapshots_for_album,
+    invalidate_snapshots_for_albums,
+)
+from .cache_tags import album_tag, best_of_tag, invalidate_albums
+from .constants import MUSIC_LIST_CACHE_TAG, MUSIC_TAGS_CACHE_TAG
+from .models import (
+    BestOf,
+    BestOfSnapshot,
+    Comment,
+    Music,
+    Musician,
+    RelatedAlbum,
+    Tag,
+)
+from .search_index import update_search_vectors
+from .typeahead import invalidate_index
+
+
+@receiver(post_save, sender=Music)
+def reindex_saved_album(
+    sender: type[Music], instance: Music, raw: bool, **kwargs: Any
+) -> None:
+    """Reindexes an album whose name or review may have changed."""
+    # Fixture loading saves rows before their relations exist; rebuild_search_index covers that case.
+    if raw:
+        return
+    update_search_vectors(Music.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Musician)
+def reindex_musicians_albums(
+    sender: type[Musician], instance: Musician, raw: bool, **kwargs: Any
+) -> None:
+    """Reindexes the albums of a musician who may have been renamed."""
+    if raw:
+        return
+    update_search_vectors(Music.objects.filter(musician=instance))
+
+
+@receiver(m2m_changed, sender=Musician.tags.through)
+def reindex_after_tag_change(
+    sender: Any,
+    instance: Musician | Tag,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any
+) -> None:
+    """Reindexes albums whose musician gained or lost tags."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        albums = Music.objects.filter(musician=instance)
+    elif pk_set:
+        # Editing from the Tag side: pk_set holds the affected musicians.
+        albums = Music.objects.filter(musician_id__in=pk_set)
+    else:
+        # post_clear from the Tag side doesn't say which musicians were affected.
+        albums = Music.objects.all()
+    update_search_vectors(albums)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_tagged_albums(
+    sender: type[Tag], instance: Tag, raw: bool, **kwargs: Any
+) -> None:
+    """Reindexes the albums of every musician carrying a tag that may have been renamed."""
+    if raw:
+        return
+    update_search_vectors(Music.objects.filter(musician__tags=instance))
+
+
+@receiver(m2m_changed, sender=Musician.tags.through)
+def touch_musicians_after_tag_change(
+    sender: Any,
+    instance: Musician | Tag,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any
+) -> None:
+    """Bumps updated_at of musicians who gained or lost tags, so the feeds see the change."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            musicians = Musician.objects.filter(pk=instance.pk)
+        else:
+            return
+    elif action in ("post_add", "post_remove") and pk_set:
+        musicians = Musician.objects.filter(pk__in=pk_set)
+    elif action == "pre_clear":
+        # By post_clear the rows saying which musicians carried the tag are gone.
+        musicians = Musician.objects.filter(tags=instance)
+    else:
+        return
+    # update() rather than save(), which would reindex and invalidate all over again.
+    musicians.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_tagged_musicians(
+    sender: type[Tag], instance: Tag, raw: bool = False, **kwargs: Any
+) -> None:
+    """Bumps updated_at of every musician carrying a tag that was renamed or is being deleted."""
+    if raw:
+        return
+    Musician.objects.filter(tags=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Music)
+@receiver(post_delete, sender=Music)
+def invalidate_best_of_for_album(
+    sender: type[Music], instance: Music, **kwargs: Any
+) -> None:
+    """Drops the BestOf snapshots an album was, or now belongs, in."""
+    invalidate_snapshots_for_album(instance)
+
+
+@receiver(post_save, sender=Musician)
+def invalidate_best_of_for_musician(
+    sender: type[Musician], instance: Musician, **kwargs: Any
+) -> None:
+    """Drops the BestOf snapshots listing a musician who may have been renamed."""
+    invalidate_snapshots_for_albums(
+        list(Music.objects.filter(musician=instance).values_list("id", flat=True))
+    )
+
+
+@receiver(m2m_changed, sender=Musician.tags.through)
+def invalidate_best_of_after_tag_change(
+    sender: Any, action: str, **kwargs: Any
+) -> None:
+    """Drops every BestOf snapshot when a musician gains or loses tags."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    invalidate_all_snapshots()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_best_of_for_tag(sender: type[Tag], **kwargs: Any) -> None:
+    """Drops every BestOf snapshot, since a tag's name or count may have changed."""
+    # Tags change rarely and only through the admin, so working out which periods are affected isn't worth it.
+    invalidate_all_snapshots()
+
+
+@receiver(post_save, sender=BestOf)
+def invalidate_best_of(sender: type[BestOf], instance: BestOf, **kwargs: Any) -> None:
+    """Drops the snapshot of a BestOf whose period may have moved."""
+    BestOfSnapshot.objects.filter(best_of=instance).delete()
+
+
+@receiver(post_save, sender=Music)
+@receiver(post_delete, sender=Music)
+@receiver(post_save, sender=Musician)
+@receiver(post_delete, sender=Musician)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_typeahead(sender: Any, **kwargs: Any) -> None:
+    """Makes every worker rebuild its typeahead index once the change is committed."""
+    # Rebuilding before the commit could read the old rows and then never hear about the change again.
+    transaction.on_commit(invalidate_index)
+
+
+@receiver(post_save, sender=Music)
+@receiver(pre_delete, sender=Music)
+def invalidate_cached_album(
+    sender: type[Music], instance: Music, **kwargs: Any
+) -> None:
+    """Invalidates the cached page of a changed album, the lists it appears in and the pages recommending it."""
+    # pre_delete, because the RelatedAlbum rows pointing at a deleted album are gone by post_delete.
+    recommended_on = RelatedAlbum.objects.filter(related=instance).values_list(
+        "album_id", flat=True
+    )
+    invalidate_albums([instance.pk, *recommended_on])
+
+
+@receiver(post_save, sender=Musician)
+def invalidate_cached_musician(
+    sender: type[Musician], instance: Musician, **kwargs: Any
+) -> None:
+    """Invalidates the cached pages of a musician's albums, which show their name."""
+    invalidate_albums(
+        Music.objects.filter(musician=instance).values_list("id", flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=Musician.tags.through)
+def invalidate_cached_tags_after_tag_change(
+    sender: Any, action: str, **kwargs: Any
+) -> None:
+    """Invalidates every cached page that displays tag names when a musician gains or loses tags."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    invalidate_tags(MUSIC_TAGS_CACHE_TAG, MUSIC_LIST_CACHE_TAG)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_cached_tags(sender: type[Tag], **kwargs: Any) -> None:
+    """Invalidates every cached page that displays tag names, since a tag's name may have changed."""
+    invalidate_tags(MUSIC_TAGS_CACHE_TAG, MUSIC_LIST_CACHE_TAG)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_cached_comments(
+    sender: type[Comment], instance: Comment, **kwargs: Any
+) -> None:
+    """Invalidates the cached page of the album a comment was left on."""
+    invalidate_tags(album_tag(instance.album_id))
+
+
+@receiver(post_save, sender=BestOf)
+@receiver(post_delete, sender=BestOf)
+def invalidate_cached_best_of(
+    sender: type[BestOf], instance: BestOf, **kwargs: Any
+) -> None:
+    """Invalidates the cached fragments of a Best Of page whose period or description may have changed."""
+    invalidate_tags(best_of_tag(instance.name))
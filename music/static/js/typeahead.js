@@ -0,0 +1,35 @@
+// Suggests albums, musicians and tags under the toolbar search box as you type.
+$(document).ready(function() {
+    const input = $("input[data-typeahead-url]");
+    const list = input.siblings(".typeahead-suggestions");
+    let latestPrefix = "";
+
+    input.on("input", function() {
+        const prefix = input.val();
+        latestPrefix = prefix;
+        if (!prefix.trim()) {
+            list.empty();
+            return;
+        }
+        $.getJSON(input.data("typeahead-url"), {q: prefix}, function(data) {
+            // Responses can arrive out of order; only show the one for what's in the box now.
+            if (prefix !== latestPrefix) {
+                return;
+            }
+            list.empty();
+            data.suggestions.forEach(suggestion => {
+                const link = $("<a>").attr("href", suggestion.url).text(suggestion.name);
+                const item = $("<li>").append(link);
+                if (suggestion.detail) {
+                    item.append(" ", $("<span>").addClass("typeahead-detail").text(suggestion.detail));
+                }
+                list.append(item);
+            });
+        });
+    });
+
+    input.on("blur", function() {
+        // Give a click on a suggestion time to land before the list disappears.
+        setTimeout(() => list.empty(), 200);
+    });
+});
@@ -0,0 +1,232 @@
+"""
+Renders the public music pages to static files that nginx serves without involving Django.
+
+Every exported page has a fingerprint built from the rows it displays (plus a site version covering the templates,
+code and image manifests). The fingerprints of the last export are kept next to the files, so an export only re-renders
+pages whose fingerprint changed and deletes pages that no longer exist, e.g. a removed album.
+
+nginx only serves these files to visitors without a session cookie; logged-in users (who can comment) and any URL
+that wasn't exported, such as search, fall through to Django. See ansible/nginx_config.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count, Max
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from responsive_images.constants import DERIVATIVES_MANIFEST_PATH
+
+from .best_of_snapshots import get_snapshot
+from .constants import IMAGE_MANIFEST_PATH
+from .feeds import FORMAT_RSS, get_feed_version
+from .models import BestOf, Music, Musician, RelatedAlbum, Tag
+
+# Files hashed into the site version: a change to any of them can change every page.
+SITE_VERSION_DIRS = ("templates", "music")
+SITE_VERSION_EXTENSIONS = (".py", ".html")
+SITE_VERSION_FILES = (IMAGE_MANIFEST_PATH, DERIVATIVES_MANIFEST_PATH)
+
+# Where the fingerprints of the last export are stored, relative to the export directory.
+FINGERPRINTS_FILENAME = ".fingerprints.json"
+
+
+@dataclass
+class StaticExportResult:
+    """The outcome of an export_static_site() run."""
+
+    rendered: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: list[str] = field(default_factory=list)
+
+
+def fingerprint(*parts: object) -> str:
+    """Hashes the given values into a short fingerprint."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def site_version() -> str:
+    """Returns a fingerprint of the templates, music code and image manifests."""
+    digest = hashlib.sha256()
+    paths = [os.path.join(settings.BASE_DIR, path) for path in SITE_VERSION_FILES]
+    for directory in SITE_VERSION_DIRS:
+        for dirpath, _, filenames in os.walk(
+            os.path.join(settings.BASE_DIR, directory)
+        ):
+            paths.extend(
+                os.path.join(dirpath, filename)
+                for filename in filenames
+                if filename.endswith(SITE_VERSION_EXTENSIONS)
+            )
+    for path in sorted(paths):
+        try:
+            with open(path, "rb") as source_file:
+                digest.update(path.encode("utf-8") + source_file.read())
+        except IOError:
+            continue
+    return digest.hexdigest()
+
+
+def catalog_version() -> str:
+    """Returns a fingerprint that changes whenever any album, musician or tag does."""
+    tag_links = Musician.tags.through.objects.aggregate(
+        count=Count("id"), last=Max("id")
+    )
+    return fingerprint(
+        Music.objects.aggregate(updated_at=Max("updated_at"), count=Count("id")),
+        Musician.objects.aggregate(updated_at=Max("updated_at"), count=Count("id")),
+        list(Tag.objects.order_by("id").values_list("id", "name")),
+        tag_links,
+    )
+
+
+def album_fingerprints() -> dict[int, str]:
+    """Fingerprints each album page from the album, its musician and tags, its related albums and its comments."""
+    tags_by_musician: dict[int, list[str]] = {}
+    for musician_id, tag_name in Musician.tags.through.objects.order_by(
+        "musician_id", "tag__name"
+    ).values_list("musician_id", "tag__name"):
+        tags_by_musician.setdefault(musician_id, []).append(tag_name)
+
+    related_by_album: dict[int, list[tuple]] = {}
+    for album_id, *related in RelatedAlbum.objects.order_by(
+        "album_id", "rank"
+    ).values_list(
+        "album_id",
+        "related_id",
+        "related__name",
+        "related__musician__name",
+        "related__very_short_description",
+    ):
+        related_by_album.setdefault(album_id, []).append(tuple(related))
+
+    albums = Music.objects.annotate(
+        comment_count=Count("comment"), last_comment_id=Max("comment__id")
+    ).values_list(
+        "id",
+        "updated_at",
+        "review_hash",
+        "musician_id",
+        "musician__updated_at",
+        "comment_count",
+        "last_comment_id",
+    )
+    today = date.today()
+    fingerprints = {}
+    for (
+        album_id,
+        updated_at,
+        review_hash,
+        musician_id,
+        musician_updated_at,
+        comment_count,
+        last_comment_id,
+    ) in albums:
+        fingerprints[album_id] = fingerprint(
+            updated_at,
+            review_hash,
+            musician_updated_at,
+            tags_by_musician.get(musician_id, []),
+            related_by_album.get(album_id, []),
+            comment_count,
+            last_comment_id,
+            # Comments are shown as "3 days ago", so pages with comments are re-rendered daily.
+            today if comment_count else None,
+        )
+    return fingerprints
+
+
+def collect_pages() -> dict[str, str]:
+    """Maps the URL of every page to export to its current fingerprint."""
+    version = site_version()
+    catalog = catalog_version()
+    feed_version = get_feed_version()
+
+    pages = {
+        reverse("music:home"): fingerprint(version, catalog),
+        reverse("music:ratings"): fingerprint(version),
+    }
+    for url_name in ("music:rss", "music:atom", "music:json_feed"):
+        pages[reverse(url_name)] = fingerprint(version, feed_version.etag(FORMAT_RSS))
+    for album_id, album_fingerprint in album_fingerprints().items():
+        url = reverse("music:music_detailed", args=[album_id])
+        pages[url] = fingerprint(version, album_fingerprint)
+    for best_of in BestOf.objects.select_related("snapshot"):
+        snapshot = get_snapshot(best_of)
+        url = reverse("music:best_of", args=[best_of.name])
+        pages[url] = fingerprint(
+            version,
+            str(best_of),
+            snapshot.built_at,
+            best_of.description_txt(),
+        )
+    return pages
+
+
+def output_path(url: str) -> str:
+    """Returns where a page is written, relative to the export directory."""
+    relative = url.lstrip("/")
+    if not relative or relative.endswith("/"):
+        return relative + "index.html"
+    if url in (reverse("music:rss"), reverse("music:atom")):
+        # nginx picks the Content-Type from the extension.
+        return relative + ".xml"
+    if "." in os.path.basename(relative):
+        return relative
+    return relative + ".html"
+
+
+def render_page(url: str) -> bytes:
+    """Renders a page the way an anonymous visitor would see it."""
+    request = RequestFactory().get(url)
+    request.user = AnonymousUser()
+    match = resolve(url)
+    response = match.func(request, *match.args, **match.kwargs)
+    if response.status_code != 200:
+        raise RuntimeError(f"Rendering {url} returned {response.status_code}")
+    return response.content
+
+
+def write_atomically(path: str, content: bytes) -> None:
+    """Writes a file so that nginx never serves a half-written page."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as output_file:
+        output_file.write(content)
+    os.replace(temporary_path, path)
+
+
+def export_static_site(export_dir: str, force: bool = False) -> StaticExportResult:
+    """Renders every page whose fingerprint changed since the last export and removes pages that are gone."""
+    fingerprints_path = os.path.join(export_dir, FINGERPRINTS_FILENAME)
+    try:
+        with open(fingerprints_path, encoding="utf-8") as fingerprints_file:
+            previous = json.load(fingerprints_file)
+    except IOError:
+        previous = {}
+
+    result = StaticExportResult()
+    pages = collect_pages()
+    for url, page_fingerprint in sorted(pages.items()):
+        path = os.path.join(export_dir, output_path(url))
+        if not force and previous.get(url) == page_fingerprint and os.path.exists(path):
+            result.unchanged += 1
+            continue
+        write_atomically(path, render_page(url))
+        result.rendered.append(url)
+
+    for url in sorted(set(previous) - set(pages)):
+        try:
+            os.remove(os.path.join(export_dir, output_path(url)))
+        except FileNotFoundError:
+            pass
+        result.removed.append(url)
+
+    write_atomically(fingerprints_path, json.dumps(pages, indent=2).encode("utf-8"))
+    return result
@@ -0,0 +1,139 @@
+"""Unit tests for the paginated album archive."""
+
+from datetime import datetime, timedelta, timezone
+
+from django.test import TestCase
+from django.urls import reverse
+
+from .archive import ArchiveCursor, archive_albums
+from .constants import ARCHIVE_PAGE_SIZE
+from .models import Music, Musician, Tag
+
+
+class ArchiveTests(TestCase):
+    """Tests for paging through and filtering the archive."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.tag_jazz = Tag.objects.create(name="Jazz")
+        cls.jazz_musician = Musician.objects.create(name="Miles Davis")
+        cls.jazz_musician.tags.add(cls.tag_jazz)
+        cls.other_musician = Musician.objects.create(name="Band One")
+
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        cls.albums = []
+        for i in range(7):
+            cls.albums.append(
+                Music.objects.create(
+                    name=f"Album {i}",
+                    musician=cls.jazz_musician if i % 2 else cls.other_musician,
+                    rating=i % 3 + 1,
+                    reviewed_at=start + timedelta(days=i),
+                )
+            )
+        # Two albums reviewed at the same moment, so ties have to be broken by id.
+        cls.tied = [
+            Music.objects.create(
+                name=f"Tied {i}",
+                musician=cls.other_musician,
+                rating=1,
+                reviewed_at=start + timedelta(days=3),
+            )
+            for i in range(2)
+        ]
+
+    def walk(self, **filters):
+        """Follows cursors from the first page to the last and returns every album seen."""
+        seen, cursor = [], None
+        while True:
+            page, cursor = archive_albums(after=cursor, limit=2, **filters)
+            seen.extend(page)
+            if cursor is None:
+                return seen
+
+    def test_cursor_round_trips(self):
+        """Test that a cursor survives encoding and decoding."""
+        cursor = ArchiveCursor(reviewed_at=self.albums[0].reviewed_at, id=42)
+        self.assertEqual(ArchiveCursor.decode(cursor.encode()), cursor)
+
+    def test_decode_rejects_malformed_cursors(self):
+        """Test that garbage and naive timestamps are rejected."""
+        for value in [
+            "garbage",
+            "2024-01-01T00:00:00_1",
+            "2024-01-01T00:00:00+00:00_x",
+        ]:
+            with self.assertRaises(ValueError):
+                ArchiveCursor.decode(value)
+
+    def test_pages_cover_every_album_once_newest_first(self):
+        """Test that walking all pages returns each album exactly once, in review order."""
+        expected = list(Music.objects.order_by("-reviewed_at", "-id"))
+        self.assertEqual(self.walk(), expected)
+
+    def test_filter_by_rating(self):
+        """Test that only albums with the requested rating are returned."""
+        albums = self.walk(rating=3)
+        self.assertTrue(albums)
+        self.assertTrue(all(album.rating == 3 for album in albums))
+
+    def test_filter_by_tag(self):
+        """Test that only albums whose musician has the tag are returned."""
+        albums = self.walk(tag="Jazz")
+        self.assertEqual(albums, [self.albums[5], self.albums[3], self.albums[1]])
+
+    def test_page_query_count_does_not_grow(self):
+        """Test that later pages cost the same number of queries as the first."""
+        _, cursor = archive_albums(limit=2)
+        with self.assertNumQueries(2):
+            archive_albums(after=cursor, limit=2)
+
+    def test_archive_view_links_to_next_page(self):
+        """Test that the HTML archive keeps filters in its next page link."""
+        Music.objects.bulk_create(
+            Music(
+                name=f"Filler {i}",
+                musician=self.other_musician,
+                rating=1,
+                reviewed_at=datetime(2023, 1, 1, tzinfo=timezone.utc),
+            )
+            for i in range(ARCHIVE_PAGE_SIZE)
+        )
+        response = self.client.get(reverse("music:archive"), {"rating": 1})
+        self.assertEqual(response.status_code, 200)
+        albums = response.context["albums"]
+        self.assertEqual(len(albums), ARCHIVE_PAGE_SIZE)
+        self.assertTrue(all(album.rating == 1 for album in albums))
+        self.assertContains(response, "Older albums")
+        self.assertIn("rating=1", response.context["next_query"])
+        self.assertIn("after=", response.context["next_query"])
+
+    def test_archive_json_follows_next_links(self):
+        """Test that the JSON archive can be paged through by following "next"."""
+        url = reverse("music:archive_json")
+        names = []
+        while url:
+            data = self.client.get(url).json()
+            names.extend(album["name"] for album in data["albums"])
+            url = data["next"]
+        self.assertEqual(len(names), Music.objects.count())
+
+    def test_archive_json_album_shape(self):
+        """Test the fields of an album in the JSON archive."""
+        data = self.client.get(reverse("music:archive_json"), {"tag": "Jazz"}).json()
+        album = data["albums"][0]
+        self.assertEqual(album["name"], "Album 5")
+        self.assertEqual(album["musician"], "Miles Davis")
+        self.assertEqual(album["tags"], ["Jazz"])
+        self.assertEqual(
+            album["url"], reverse("music:music_detailed", args=[self.albums[5].id])
+        )
+        self.assertIsNone(data["next"])
+
+    def test_archive_rejects_bad_input(self):
+        """Test that malformed cursors and unknown ratings are a 400."""
+        for params in [{"after": "garbage"}, {"rating": "7"}, {"rating": "x"}]:
+            for name in ["music:archive", "music:archive_json"]:
+                response = self.client.get(reverse(name), params)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,145 @@
+"""Unit tests for the stored BestOf snapshots."""
+
+from datetime import date, datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .best_of_snapshots import build_snapshot, get_snapshot
+from .models import BestOf, BestOfSnapshot, Music, Musician, Tag
+
+
+class BestOfSnapshotTests(TestCase):
+    """Tests for building snapshots and dropping them when their inputs change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.tag_rock = Tag.objects.create(name="Indie Rock")
+        cls.musician = Musician.objects.create(name="Band One")
+        cls.musician.tags.add(cls.tag_rock)
+        cls.best_of_2023 = BestOf.objects.create(
+            name="2023", start_date=date(2022, 12, 31), end_date=date(2023, 12, 31)
+        )
+        cls.best_of_2024 = BestOf.objects.create(
+            name="2024", start_date=date(2023, 12, 31), end_date=date(2024, 12, 31)
+        )
+        cls.album = Music.objects.create(
+            name="Best Album",
+            musician=cls.musician,
+            rating=3,
+            reviewed_at=datetime(2023, 6, 15, tzinfo=timezone.utc),
+            very_short_description="Loud.",
+        )
+
+    def refresh(self, best_of: BestOf) -> BestOf:
+        """Reloads a BestOf so that its cached snapshot relation is forgotten."""
+        return BestOf.objects.get(pk=best_of.pk)
+
+    def has_snapshot(self, best_of: BestOf) -> bool:
+        """Returns whether a snapshot is stored for a BestOf."""
+        return BestOfSnapshot.objects.filter(best_of=best_of).exists()
+
+    def test_snapshot_contains_what_the_template_reads(self):
+        """Test that albums and tags are stored as plain dicts."""
+        snapshot = build_snapshot(self.best_of_2023)
+        self.assertEqual(snapshot.album_ids, [self.album.id])
+        self.assertEqual(
+            snapshot.best_albums,
+            [
+                {
+                    "id": self.album.id,
+                    "name": "Best Album",
+                    "musician": {"name": "Band One"},
+                    "very_short_description": "Loud.",
+                    "classes": ["IndieRock"],
+                    "image_info": None,
+                }
+            ],
+        )
+        self.assertEqual(
+            snapshot.tags_with_quantity,
+            [[{"name": "Indie Rock", "classname": "IndieRock"}, 1]],
+        )
+
+    def test_get_snapshot_reuses_stored_snapshot(self):
+        """Test that an existing snapshot is returned without rebuilding it."""
+        build_snapshot(self.best_of_2023)
+        best_of = BestOf.objects.select_related("snapshot").get(pk=self.best_of_2023.pk)
+        with self.assertNumQueries(0):
+            get_snapshot(best_of)
+
+    def test_editing_album_drops_snapshot(self):
+        """Test that saving an album drops the snapshot of its period only."""
+        build_snapshot(self.best_of_2023)
+        build_snapshot(self.best_of_2024)
+        self.album.name = "Renamed"
+        self.album.save()
+        self.assertFalse(self.has_snapshot(self.best_of_2023))
+        self.assertTrue(self.has_snapshot(self.best_of_2024))
+        self.assertEqual(
+            get_snapshot(self.refresh(self.best_of_2023)).best_albums[0]["name"],
+            "Renamed",
+        )
+
+    def test_moving_album_drops_old_and_new_periods(self):
+        """Test that moving an album to another period drops both snapshots."""
+        build_snapshot(self.best_of_2023)
+        build_snapshot(self.best_of_2024)
+        self.album.reviewed_at = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        self.album.save()
+        self.assertFalse(self.has_snapshot(self.best_of_2023))
+        self.assertFalse(self.has_snapshot(self.best_of_2024))
+
+    def test_new_album_drops_snapshot(self):
+        """Test that adding an album to a period drops its snapshot."""
+        build_snapshot(self.best_of_2024)
+        Music.objects.create(
+            name="New Album",
+            musician=self.musician,
+            rating=2,
+            reviewed_at=datetime(2024, 5, 1, tzinfo=timezone.utc),
+        )
+        self.assertFalse(self.has_snapshot(self.best_of_2024))
+
+    def test_deleting_album_drops_snapshot(self):
+        """Test that deleting an album drops the snapshots it was in."""
+        build_snapshot(self.best_of_2023)
+        self.album.delete()
+        self.assertFalse(self.has_snapshot(self.best_of_2023))
+
+    def test_renaming_musician_drops_snapshot(self):
+        """Test that renaming a musician drops the snapshots listing their albums."""
+        build_snapshot(self.best_of_2023)
+        build_snapshot(self.best_of_2024)
+        self.musician.name = "Band Renamed"
+        self.musician.save()
+        self.assertFalse(self.has_snapshot(self.best_of_2023))
+        self.assertTrue(self.has_snapshot(self.best_of_2024))
+
+    def test_tag_changes_drop_snapshots(self):
+        """Test that tagging a musician or renaming a tag drops the snapshots."""
+        build_snapshot(self.best_of_2023)
+        self.musician.tags.add(Tag.objects.create(name="Shoegaze"))
+        self.assertFalse(self.has_snapshot(self.best_of_2023))
+
+        build_snapshot(self.best_of_2023)
+        self.tag_rock.name = "Rock"
+        self.tag_rock.save()
+        self.assertFalse(self.has_snapshot(self.best_of_2023))
+
+    def test_editing_best_of_drops_snapshot(self):
+        """Test that changing a BestOf's period drops its snapshot."""
+        build_snapshot(self.best_of_2023)
+        self.best_of_2023.end_date = date(2023, 6, 1)
+        self.best_of_2023.save()
+        self.assertFalse(self.has_snapshot(self.best_of_2023))
+        self.assertEqual(get_snapshot(self.refresh(self.best_of_2023)).album_ids, [])
+
+    def test_rebuild_command_builds_every_snapshot(self):
+        """Test that rebuild_best_of_snapshots builds a snapshot for every BestOf."""
+        out = StringIO()
+        call_command("rebuild_best_of_snapshots", stdout=out)
+        self.assertIn("Rebuilt 2", out.getvalue())
+        self.assertEqual(BestOfSnapshot.objects.count(), 2)
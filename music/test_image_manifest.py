@@ -0,0 +1,128 @@
+"""Unit tests for the album image manifest."""
+
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from PIL import Image
+
+from .image_manifest import (
+    EXIF_ORIENTATION_TAG,
+    ImageInfo,
+    get_image_manifest,
+    read_image_manifest,
+    scan_images,
+    write_image_manifest,
+)
+
+
+class ImageManifestTests(SimpleTestCase):
+    """Tests for building, reading and caching the image manifest."""
+
+    def setUp(self):
+        """Point BASE_DIR at a temporary directory with a couple of album images."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.image_dir = os.path.join(
+            self.temp_dir, "music/static/music/images/test_band"
+        )
+        os.makedirs(self.image_dir)
+        Image.new("RGB", (40, 30)).save(os.path.join(self.image_dir, "wide.jpg"))
+        Image.new("RGB", (10, 50)).save(os.path.join(self.image_dir, "tall.jpg"))
+
+        base_dir_patcher = patch.object(settings, "BASE_DIR", self.temp_dir)
+        base_dir_patcher.start()
+        self.addCleanup(base_dir_patcher.stop)
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        get_image_manifest.cache_clear()
+        self.addCleanup(get_image_manifest.cache_clear)
+
+    def test_scan_records_static_paths_and_dimensions(self):
+        """Test that scanning keys images by static path with their dimensions."""
+        manifest = scan_images()
+
+        self.assertEqual(
+            manifest,
+            {
+                "music/images/test_band/wide.jpg": ImageInfo(
+                    "music/images/test_band/wide.jpg", 40, 30
+                ),
+                "music/images/test_band/tall.jpg": ImageInfo(
+                    "music/images/test_band/tall.jpg", 10, 50
+                ),
+            },
+        )
+
+    def test_scan_ignores_other_files(self):
+        """Test that non-JPEG files are left out of the manifest."""
+        with open(os.path.join(self.image_dir, "notes.md"), "w") as f:
+            f.write("TEST")
+
+        self.assertEqual(len(scan_images()), 2)
+
+    def test_scan_skips_unreadable_images(self):
+        """Test that a corrupt JPEG is treated as missing instead of failing the build."""
+        with open(os.path.join(self.image_dir, "broken.jpg"), "w") as f:
+            f.write("not really a jpeg")
+
+        with self.assertLogs(level="WARNING"):
+            manifest = scan_images()
+
+        self.assertNotIn("music/images/test_band/broken.jpg", manifest)
+
+    def test_scan_swaps_dimensions_for_rotated_images(self):
+        """Test that EXIF-rotated images report the dimensions they display at."""
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION_TAG] = 6  # Rotated 90 degrees clockwise.
+        Image.new("RGB", (40, 30)).save(
+            os.path.join(self.image_dir, "rotated.jpg"), exif=exif
+        )
+
+        info = scan_images()["music/images/test_band/rotated.jpg"]
+
+        self.assertEqual((info.width, info.height), (30, 40))
+
+    def test_write_then_read_round_trips(self):
+        """Test that a written manifest reads back identically."""
+        written = write_image_manifest()
+
+        self.assertEqual(read_image_manifest(), written)
+
+    def test_read_without_manifest_returns_none(self):
+        """Test that reading a manifest that was never built returns None."""
+        self.assertIsNone(read_image_manifest())
+
+    def test_get_image_manifest_prefers_built_manifest(self):
+        """Test that a built manifest is used instead of scanning the directory."""
+        write_image_manifest()
+        Image.new("RGB", (5, 5)).save(os.path.join(self.image_dir, "new.jpg"))
+
+        manifest = get_image_manifest()
+
+        self.assertNotIn("music/images/test_band/new.jpg", manifest)
+
+    def test_get_image_manifest_is_loaded_once(self):
+        """Test that the manifest is cached for the life of the process."""
+        get_image_manifest()
+        with patch("music.image_manifest.read_image_manifest") as mock_read:
+            get_image_manifest()
+        mock_read.assert_not_called()
+
+    def test_command_writes_manifest(self):
+        """Test that the management command writes the manifest file."""
+        out = StringIO()
+
+        call_command("build_image_manifest", stdout=out)
+
+        with open(os.path.join(self.temp_dir, "music/image_manifest.json")) as f:
+            serialized = json.load(f)
+        self.assertEqual(
+            serialized["music/images/test_band/wide.jpg"],
+            {"path": "music/images/test_band/wide.jpg", "width": 40, "height": 30},
+        )
+        self.assertIn("Wrote 2 album images", out.getvalue())
@@ -8,13 +8,16 @@ from unittest.mock import patch
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.test import TestCase
+from PIL import Image
 
+from .image_manifest import get_image_manifest
 from .models import (
     BestOf,
     Comment,
     Music,
     Musician,
     Tag,
+    clip_review,
     convert_markdown_and_mark_safe,
     convert_name_to_directory_format,
 )
@@ -53,6 +56,16 @@ class HelperFunctionTests(TestCase):
         result = convert_markdown_and_mark_safe(None)
         self.assertIsNone(result)
 
+    def test_clip_review_leaves_short_reviews_alone(self):
+        """Test that reviews within the limit are returned unchanged."""
+        self.assertEqual(clip_review("short"), "short")
+
+    def test_clip_review_clips_long_reviews(self):
+        """Test that reviews are clipped to 500 characters plus an ellipsis."""
+        result = clip_review("x" * 600)
+        self.assertEqual(len(result), 503)  # 500 + "..."
+        self.assertTrue(result.endswith("..."))
+
 
 class MusicModelTests(TestCase):
     """Tests for Music model methods."""
@@ -80,6 +93,9 @@ class MusicModelTests(TestCase):
         """Set up temporary directories for file tests."""
         self.temp_dir = tempfile.mkdtemp()
         self.original_base_dir = settings.BASE_DIR
+        # The manifest is cached per process; don't let it leak between tests.
+        get_image_manifest.cache_clear()
+        self.addCleanup(get_image_manifest.cache_clear)
 
     def tearDown(self):
         """Clean up temporary files."""
@@ -96,45 +112,48 @@ class MusicModelTests(TestCase):
         expected = "Test Band: Test Album"
         self.assertEqual(str(self.album), expected)
 
-    def test_review_txt_reads_file(self):
-        """Test that review_txt reads markdown from file."""
-        # Create test review file
-        review_dir = os.path.join(self.temp_dir, "music/reviews/test_band")
-        os.makedirs(review_dir, exist_ok=True)
-        review_path = os.path.join(review_dir, "test_album.md")
-
-        with open(review_path, "w", encoding="utf-8") as f:
-            f.write("# Test Review\n\nThis is a test review.")
-
+    def test_review_path_uses_directory_format(self):
+        """Test that review_path points at reviews/<musician>/<album>.md."""
         with patch.object(settings, "BASE_DIR", self.temp_dir):
-            result = self.album.review_txt()
-            self.assertEqual(result, "# Test Review\n\nThis is a test review.")
-
-    def test_review_txt_with_missing_file(self):
-        """Test that review_txt returns None when file doesn't exist."""
-        with patch.object(settings, "BASE_DIR", self.temp_dir):
-            result = self.album.review_txt()
-            self.assertIsNone(result)
-
-    def test_review_with_existing_file(self):
-        """Test that review converts markdown to HTML."""
-        # Create test review file
-        review_dir = os.path.join(self.temp_dir, "music/reviews/test_band")
-        os.makedirs(review_dir, exist_ok=True)
-        review_path = os.path.join(review_dir, "test_album.md")
+            result = self.album.review_path()
+        expected = os.path.join(
+            self.temp_dir, "music/reviews/", "test_band", "test_album.md"
+        )
+        self.assertEqual(result, expected)
 
-        with open(review_path, "w", encoding="utf-8") as f:
-            f.write("**Bold text**")
+    def test_review_txt_reads_synced_markdown(self):
+        """Test that review_txt returns the synced markdown column."""
+        self.album.review_markdown = "# Test Review\n\nThis is a test review."
+        self.assertEqual(
+            self.album.review_txt(), "# Test Review\n\nThis is a test review."
+        )
 
-        with patch.object(settings, "BASE_DIR", self.temp_dir):
-            result = self.album.review()
-            self.assertIn("<strong>Bold text</strong>", str(result))
+    def test_review_txt_without_synced_review(self):
+        """Test that review_txt returns None when no review has been synced."""
+        self.assertIsNone(self.album.review_txt())
 
-    def test_review_with_missing_file(self):
-        """Test that review returns None when file doesn't exist."""
-        with patch.object(settings, "BASE_DIR", self.temp_dir):
+    def test_review_returns_prerendered_html(self):
+        """Test that review returns the pre-rendered HTML without re-rendering."""
+        self.album.review_html = "<p><strong>Bold text</strong></p>"
+        with patch("music.models.markdown2.markdown") as mock_markdown:
             result = self.album.review()
-            self.assertIsNone(result)
+        mock_markdown.assert_not_called()
+        self.assertIn("<strong>Bold text</strong>", str(result))
+
+    def test_review_without_synced_review(self):
+        """Test that review returns None when no review has been synced."""
+        self.assertIsNone(self.album.review())
+
+    def test_review_never_reads_from_disk(self):
+        """Test that rendering a review doesn't open the review file."""
+        self.album.review_markdown = "text"
+        self.album.review_html = "<p>text</p>"
+        self.album.review_excerpt = "text"
+        with patch("builtins.open") as mock_open:
+            self.album.review()
+            self.album.review_txt()
+            self.album.description()
+        mock_open.assert_not_called()
 
     def test_description_with_tags(self):
         """Test that description includes tag list."""
@@ -156,29 +175,16 @@ class MusicModelTests(TestCase):
         self.assertIn("[no tags]", result)
 
     def test_description_with_no_review(self):
-        """Test that description shows '[no review]' when no review file exists."""
-        with patch.object(settings, "BASE_DIR", self.temp_dir):
-            result = self.album.description()
-            self.assertIn("[no review]", result)
-
-    def test_description_clips_long_reviews(self):
-        """Test that description clips reviews to 500 characters."""
-        # Create a long review
-        long_review = "x" * 600
-        review_dir = os.path.join(self.temp_dir, "music/reviews/test_band")
-        os.makedirs(review_dir, exist_ok=True)
-        review_path = os.path.join(review_dir, "test_album.md")
-
-        with open(review_path, "w", encoding="utf-8") as f:
-            f.write(long_review)
+        """Test that description shows '[no review]' when no review has been synced."""
+        result = self.album.description()
+        self.assertIn("[no review]", result)
 
-        with patch.object(settings, "BASE_DIR", self.temp_dir):
-            result = self.album.description()
-            # Should have tags, space, 500 chars, and "..."
-            self.assertTrue(result.endswith("..."))
-            # Count only the review portion (after tags)
-            review_portion = result.split(") ")[1]
-            self.assertEqual(len(review_portion), 503)  # 500 + "..."
+    def test_description_uses_review_excerpt(self):
+        """Test that description appends the synced review excerpt."""
+        self.album.review_excerpt = "x" * 500 + "..."
+        result = self.album.description()
+        review_portion = result.split(") ")[1]
+        self.assertEqual(review_portion, "x" * 500 + "...")
 
     def test_image_src_exists(self):
         """Test that image_src returns path when image exists."""
@@ -186,9 +192,7 @@ class MusicModelTests(TestCase):
         image_dir = os.path.join(self.temp_dir, "music/static/music/images/test_band")
         os.makedirs(image_dir, exist_ok=True)
         image_path = os.path.join(image_dir, "test_album.jpg")
-
-        with open(image_path, "w") as f:
-            f.write("fake image")
+        Image.new("RGB", (30, 20)).save(image_path)
 
         with patch.object(settings, "BASE_DIR", self.temp_dir):
             result = self.album.image_src()
@@ -201,6 +205,27 @@ class MusicModelTests(TestCase):
             result = self.album.image_src()
             self.assertIsNone(result)
 
+    def test_image_info_includes_dimensions(self):
+        """Test that image_info exposes the image's width and height."""
+        image_dir = os.path.join(self.temp_dir, "music/static/music/images/test_band")
+        os.makedirs(image_dir, exist_ok=True)
+        Image.new("RGB", (30, 20)).save(os.path.join(image_dir, "test_album.jpg"))
+
+        with patch.object(settings, "BASE_DIR", self.temp_dir):
+            result = self.album.image_info()
+
+        self.assertEqual(result.width, 30)
+        self.assertEqual(result.height, 20)
+
+    def test_image_src_does_not_stat_files(self):
+        """Test that image_src is a manifest lookup rather than a filesystem check."""
+        with patch.object(settings, "BASE_DIR", self.temp_dir):
+            self.album.image_src()
+            with patch("os.path.exists") as mock_exists, patch("os.walk") as mock_walk:
+                self.album.image_src()
+        mock_exists.assert_not_called()
+        mock_walk.assert_not_called()
+
     def test_classes_returns_tag_classnames(self):
         """Test that classes returns list of CSS class names from tags."""
         result = self.album.classes()
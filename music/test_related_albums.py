@@ -0,0 +1,132 @@
+"""Unit tests for the precomputed related albums."""
+
+from datetime import datetime, timezone
+
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Music, Musician, RelatedAlbum, Tag
+from .related_albums import build_related_albums, top_related
+from .views import get_related_albums
+
+
+class RelatedAlbumsTests(TestCase):
+    """Tests for computing, storing and displaying related albums."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Two jazz musicians, a metal band and a musician with no tags."""
+        cls.jazz = Tag.objects.create(name="Jazz")
+        cls.modal = Tag.objects.create(name="Modal")
+        cls.metal = Tag.objects.create(name="Metal")
+
+        cls.miles = Musician.objects.create(name="Miles Davis")
+        cls.miles.tags.add(cls.jazz, cls.modal)
+        cls.coltrane = Musician.objects.create(name="John Coltrane")
+        cls.coltrane.tags.add(cls.jazz, cls.modal)
+        cls.mingus = Musician.objects.create(name="Charles Mingus")
+        cls.mingus.tags.add(cls.jazz)
+        cls.metallica = Musician.objects.create(name="Metallica")
+        cls.metallica.tags.add(cls.metal)
+        cls.untagged = Musician.objects.create(name="Nobody")
+
+        reviewed_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        cls.kind_of_blue = cls.album("Kind of Blue", cls.miles, 3, reviewed_at)
+        cls.giant_steps = cls.album("Giant Steps", cls.coltrane, 3, reviewed_at)
+        cls.ah_um = cls.album("Mingus Ah Um", cls.mingus, 3, reviewed_at)
+        cls.low_rated = cls.album("A Love Supreme", cls.coltrane, 1, reviewed_at)
+        cls.master = cls.album("Master of Puppets", cls.metallica, 3, reviewed_at)
+        cls.nothing = cls.album("Nothing", cls.untagged, 3, reviewed_at)
+
+    @classmethod
+    def album(cls, name, musician, rating, reviewed_at):
+        """Creates an album."""
+        return Music.objects.create(
+            name=name, musician=musician, rating=rating, reviewed_at=reviewed_at
+        )
+
+    def related(self, album):
+        """Returns the stored related albums of an album, best first."""
+        return [
+            entry.related
+            for entry in RelatedAlbum.objects.filter(album=album).order_by("rank")
+        ]
+
+    def test_top_related_orders_and_drops_zero_scores(self):
+        """Test that top_related returns each row's best positive scores, best first."""
+        scores = np.array([[0.1, 0.0, 0.7, 0.3], [0.0, 0.0, 0.0, 0.0]])
+        self.assertEqual(top_related(scores, k=3), [[(2, 0.7), (3, 0.3), (0, 0.1)], []])
+
+    def test_similar_tags_and_higher_ratings_rank_first(self):
+        """Test that albums with the same tags rank first, and a low rating pushes an album down."""
+        build_related_albums()
+        self.assertEqual(
+            self.related(self.kind_of_blue),
+            [self.giant_steps, self.ah_um, self.low_rated],
+        )
+
+    def test_albums_without_shared_tags_are_unrelated(self):
+        """Test that albums with nothing in common get no related albums."""
+        build_related_albums()
+        self.assertEqual(self.related(self.master), [])
+        self.assertEqual(self.related(self.nothing), [])
+        self.assertNotIn(self.master, self.related(self.kind_of_blue))
+
+    def test_recent_reviews_are_preferred(self):
+        """Test that of two equally similar albums, the more recently reviewed one ranks first."""
+        older = self.album(
+            "Older", self.mingus, 3, datetime(2015, 1, 1, tzinfo=timezone.utc)
+        )
+        build_related_albums()
+        related = self.related(self.giant_steps)
+        self.assertLess(related.index(self.ah_um), related.index(older))
+
+    def test_second_run_recomputes_nothing(self):
+        """Test that a run with no changes leaves every row alone."""
+        build_related_albums()
+        result = build_related_albums()
+        self.assertEqual(result.recomputed, 0)
+        self.assertEqual(result.total, 6)
+
+    def test_tag_change_recomputes_only_affected_rows(self):
+        """Test that tagging a musician recomputes albums sharing the old or new tags only."""
+        build_related_albums()
+        self.mingus.tags.add(self.metal)
+        result = build_related_albums()
+        # Every jazz album and the metal album; not the untagged one.
+        self.assertEqual(result.recomputed, 5)
+        self.assertIn(self.ah_um, self.related(self.master))
+
+    def test_deleted_album_is_removed_from_neighbours(self):
+        """Test that deleting an album recomputes the albums it was related to."""
+        build_related_albums()
+        self.giant_steps.delete()
+        build_related_albums()
+        self.assertEqual(self.related(self.kind_of_blue), [self.ah_um, self.low_rated])
+
+    def test_full_recomputes_everything(self):
+        """Test that full recomputes every album."""
+        build_related_albums()
+        self.assertEqual(build_related_albums(full=True).recomputed, 6)
+
+    def test_album_page_shows_related_albums(self):
+        """Test that the album page lists its related albums."""
+        build_related_albums()
+        response = self.client.get(
+            reverse("music:music_detailed", args=[self.kind_of_blue.id])
+        )
+        self.assertEqual(
+            response.context["related_albums"],
+            [self.giant_steps, self.ah_um, self.low_rated],
+        )
+        self.assertContains(response, "If you like this, try")
+
+    def test_get_related_albums_is_one_query(self):
+        """Test that reading an album's related albums and their musicians is a single query."""
+        build_related_albums()
+        with self.assertNumQueries(1):
+            names = [
+                album.musician.name for album in get_related_albums(self.kind_of_blue)
+            ]
+        self.assertEqual(names, ["John Coltrane", "Charles Mingus", "John Coltrane"])
@@ -0,0 +1,139 @@
+"""Unit tests for syncing review files into the database."""
+
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from .models import Music, Musician
+from .review_sync import hash_review, sync_reviews
+
+
+class SyncReviewsTests(TestCase):
+    """Tests for sync_reviews() and the sync_reviews management command."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.musician = Musician.objects.create(name="Test Band")
+        cls.album = Music.objects.create(
+            name="Test Album",
+            musician=cls.musician,
+            rating=3,
+            reviewed_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+
+    def setUp(self):
+        """Point BASE_DIR at a temporary directory holding review files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.review_dir = os.path.join(self.temp_dir, "music/reviews/test_band")
+        os.makedirs(self.review_dir)
+        base_dir_patcher = patch.object(settings, "BASE_DIR", self.temp_dir)
+        base_dir_patcher.start()
+        self.addCleanup(base_dir_patcher.stop)
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def write_review(self, text, filename="test_album.md"):
+        """Write a review file for the test album (or another file name)."""
+        with open(
+            os.path.join(self.review_dir, filename), "w", encoding="utf-8"
+        ) as review_file:
+            review_file.write(text)
+
+    def test_sync_populates_review_columns(self):
+        """Test that a new review file fills in markdown, HTML, excerpt and hash."""
+        self.write_review("**Bold text**")
+
+        result = sync_reviews()
+
+        self.album.refresh_from_db()
+        self.assertEqual(result.updated, [self.album])
+        self.assertEqual(self.album.review_markdown, "**Bold text**")
+        self.assertIn("<strong>Bold text</strong>", self.album.review_html)
+        self.assertEqual(self.album.review_excerpt, "**Bold text**")
+        self.assertEqual(self.album.review_hash, hash_review("**Bold text**"))
+
+    def test_sync_clips_excerpt(self):
+        """Test that the stored excerpt is clipped to 500 characters plus an ellipsis."""
+        self.write_review("x" * 600)
+
+        sync_reviews()
+
+        self.album.refresh_from_db()
+        self.assertEqual(self.album.review_excerpt, "x" * 500 + "...")
+
+    def test_sync_skips_unchanged_files(self):
+        """Test that files whose hash matches aren't re-rendered."""
+        self.write_review("Same review")
+        sync_reviews()
+
+        with patch("music.review_sync.convert_markdown_and_mark_safe") as mock_render:
+            result = sync_reviews()
+
+        mock_render.assert_not_called()
+        self.assertEqual(result.updated, [])
+        self.assertEqual(result.unchanged, 1)
+
+    def test_sync_rerenders_changed_files(self):
+        """Test that editing a review file updates the stored HTML."""
+        self.write_review("First draft")
+        sync_reviews()
+        self.write_review("Second draft")
+
+        result = sync_reviews()
+
+        self.album.refresh_from_db()
+        self.assertEqual(result.updated, [self.album])
+        self.assertIn("Second draft", self.album.review_html)
+
+    def test_sync_clears_review_when_file_removed(self):
+        """Test that deleting a review file clears the stored review."""
+        self.write_review("Soon to be deleted")
+        sync_reviews()
+        os.remove(os.path.join(self.review_dir, "test_album.md"))
+
+        result = sync_reviews()
+
+        self.album.refresh_from_db()
+        self.assertEqual(result.cleared, [self.album])
+        self.assertIsNone(self.album.review_html)
+        self.assertIsNone(self.album.review_hash)
+
+    def test_sync_flags_orphaned_files(self):
+        """Test that review files without a matching album are reported."""
+        self.write_review("Nobody reviewed this", filename="typo_album.md")
+
+        result = sync_reviews()
+
+        self.assertEqual(
+            result.orphaned_paths, [os.path.join(self.review_dir, "typo_album.md")]
+        )
+
+    def test_dry_run_saves_nothing(self):
+        """Test that dry_run reports changes without writing them."""
+        self.write_review("Not saved")
+
+        result = sync_reviews(dry_run=True)
+
+        self.album.refresh_from_db()
+        self.assertEqual(len(result.updated), 1)
+        self.assertIsNone(self.album.review_hash)
+
+    def test_command_reports_summary(self):
+        """Test that the management command syncs and prints a summary."""
+        self.write_review("Command review")
+        self.write_review("Orphan", filename="typo_album.md")
+        out = StringIO()
+
+        call_command("sync_reviews", stdout=out)
+
+        self.album.refresh_from_db()
+        self.assertEqual(self.album.review_markdown, "Command review")
+        self.assertIn("1 updated, 0 cleared, 0 unchanged, 1 orphaned.", out.getvalue())
+        self.assertIn("typo_album.md", out.getvalue())
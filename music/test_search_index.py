@@ -0,0 +1,154 @@
+"""Unit tests for full-text album search."""
+
+from datetime import datetime, timezone
+from functools import partial
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Music, Musician, Tag
+from .search_index import SearchCursor, build_search_query, search_albums
+
+
+class SearchIndexTests(TestCase):
+    """Tests for indexing and searching albums."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.tag_jazz = Tag.objects.create(name="Jazz")
+        cls.miles = Musician.objects.create(name="Miles Davis")
+        cls.miles.tags.add(cls.tag_jazz)
+        cls.kind_of_blue = Music.objects.create(
+            name="Kind of Blue",
+            musician=cls.miles,
+            rating=3,
+            reviewed_at=datetime(2024, 1, 15, tzinfo=timezone.utc),
+            review_markdown="Modal improvisation at its most relaxed.",
+        )
+        cls.coltrane = Musician.objects.create(name="John Coltrane")
+        cls.giant_steps = Music.objects.create(
+            name="Giant Steps",
+            musician=cls.coltrane,
+            rating=3,
+            reviewed_at=datetime(2024, 1, 10, tzinfo=timezone.utc),
+            review_markdown="Faster and denser than anything Miles Davis recorded.",
+        )
+
+    def test_build_search_query_ignores_punctuation(self):
+        """Test that a term with no words produces no query."""
+        self.assertIsNone(build_search_query("  &|!: "))
+
+    def test_search_matches_review_text(self):
+        """Test that words that only appear in a review are searchable."""
+        albums, _ = search_albums("improvisation")
+        self.assertEqual(albums, [self.kind_of_blue])
+
+    def test_search_matches_prefixes(self):
+        """Test that partial words match."""
+        albums, _ = search_albums("Gian")
+        self.assertEqual(albums, [self.giant_steps])
+
+    def test_search_matches_tags(self):
+        """Test that a musician's tags are searchable."""
+        albums, _ = search_albums("jazz")
+        self.assertEqual(albums, [self.kind_of_blue])
+
+    def test_name_matches_rank_above_review_matches(self):
+        """Test that matching the musician outranks a passing mention in a review."""
+        albums, _ = search_albums("Miles Davis")
+        self.assertEqual(albums, [self.kind_of_blue, self.giant_steps])
+
+    def test_search_paginates_with_cursor(self):
+        """Test that the cursor continues where the previous page stopped."""
+        first_page, cursor = search_albums("Miles Davis", limit=1)
+        self.assertEqual(first_page, [self.kind_of_blue])
+        self.assertIsNotNone(cursor)
+
+        second_page, cursor = search_albums(
+            "Miles Davis", after=SearchCursor.decode(cursor.encode()), limit=1
+        )
+        self.assertEqual(second_page, [self.giant_steps])
+        self.assertIsNone(cursor)
+
+    def test_cursor_round_trips(self):
+        """Test that encoding and decoding a cursor is lossless."""
+        cursor = SearchCursor(rank=0.6079271, id=42)
+        self.assertEqual(SearchCursor.decode(cursor.encode()), cursor)
+
+    def test_malformed_cursor_raises(self):
+        """Test that a garbled cursor raises ValueError."""
+        with self.assertRaises(ValueError):
+            SearchCursor.decode("garbage")
+
+    def test_saving_a_review_reindexes_album(self):
+        """Test that a changed review is searchable as soon as it is saved."""
+        self.giant_steps.review_markdown = "Sheets of sound."
+        self.giant_steps.save()
+
+        albums, _ = search_albums("sheets")
+        self.assertEqual(albums, [self.giant_steps])
+
+    def test_adding_a_tag_reindexes_albums(self):
+        """Test that tagging a musician makes their albums match the tag."""
+        self.coltrane.tags.add(self.tag_jazz)
+
+        albums, _ = search_albums("jazz")
+        self.assertCountEqual(albums, [self.kind_of_blue, self.giant_steps])
+
+    def test_renaming_a_musician_reindexes_albums(self):
+        """Test that a musician's new name is searchable."""
+        self.coltrane.name = "Trane"
+        self.coltrane.save()
+
+        albums, _ = search_albums("Trane")
+        self.assertEqual(albums, [self.giant_steps])
+
+    def test_renaming_a_tag_reindexes_albums(self):
+        """Test that a tag's new name is searchable."""
+        self.tag_jazz.name = "Bebop"
+        self.tag_jazz.save()
+
+        albums, _ = search_albums("bebop")
+        self.assertEqual(albums, [self.kind_of_blue])
+
+    def test_rebuild_command_reindexes_everything(self):
+        """Test that the rebuild command fills in vectors that are missing."""
+        Music.objects.update(search_vector=None)
+        out = StringIO()
+
+        call_command("rebuild_search_index", stdout=out)
+
+        albums, _ = search_albums("improvisation")
+        self.assertEqual(albums, [self.kind_of_blue])
+        self.assertIn("Reindexed 2 albums.", out.getvalue())
+
+    def test_search_view_links_to_next_page(self):
+        """Test that the search page offers a link to the next page."""
+        with patch("music.views.search_albums", partial(search_albums, limit=1)):
+            response = self.client.get(
+                reverse("music:search"), {"search_term": "Miles Davis"}
+            )
+        self.assertEqual(list(response.context["albums"]), [self.kind_of_blue])
+        self.assertIsNotNone(response.context["next_cursor"])
+        self.assertContains(response, "More results")
+
+    def test_search_view_follows_cursor(self):
+        """Test that the search page continues from the cursor it was given."""
+        _, cursor = search_albums("Miles Davis", limit=1)
+        response = self.client.get(
+            reverse("music:search"),
+            {"search_term": "Miles Davis", "after": cursor.encode()},
+        )
+        self.assertEqual(list(response.context["albums"]), [self.giant_steps])
+        self.assertNotContains(response, "More results")
+
+    def test_search_view_rejects_bad_cursor(self):
+        """Test that a malformed cursor returns 400."""
+        response = self.client.get(
+            reverse("music:search"), {"search_term": "Miles", "after": "garbage"}
+        )
+        self.assertEqual(response.status_code, 400)
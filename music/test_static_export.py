@@ -0,0 +1,140 @@
+"""Unit tests for the static export of the music pages."""
+
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timezone
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .models import BestOf, Comment, Music, Musician, Tag
+from .static_export import export_static_site, output_path
+
+
+class StaticExportTests(TestCase):
+    """Tests for rendering pages and re-rendering only what changed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.tag = Tag.objects.create(name="Jazz")
+        cls.musician = Musician.objects.create(name="Miles Davis")
+        cls.musician.tags.add(cls.tag)
+        cls.album = Music.objects.create(
+            name="Kind of Blue",
+            musician=cls.musician,
+            rating=3,
+            reviewed_at=datetime(2024, 1, 15, tzinfo=timezone.utc),
+        )
+        cls.other_album = Music.objects.create(
+            name="Giant Steps",
+            musician=Musician.objects.create(name="John Coltrane"),
+            rating=2,
+            reviewed_at=datetime(2024, 2, 15, tzinfo=timezone.utc),
+        )
+        BestOf.objects.create(
+            name="2024", start_date=date(2023, 12, 31), end_date=date(2024, 12, 31)
+        )
+        cls.user = User.objects.create_user(username="reader", password="pw")
+
+    def setUp(self):
+        """Export into a fresh temporary directory."""
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir)
+        cache.clear()
+
+    def read(self, url):
+        """Returns the exported contents of a page."""
+        with open(
+            os.path.join(self.export_dir, output_path(url)), encoding="utf-8"
+        ) as page:
+            return page.read()
+
+    def test_output_paths(self):
+        """Test that pages are written where nginx's try_files looks for them."""
+        self.assertEqual(output_path("/music/"), "music/index.html")
+        self.assertEqual(output_path("/music/music/3"), "music/music/3.html")
+        self.assertEqual(output_path("/music/rss"), "music/rss.xml")
+        self.assertEqual(output_path("/music/feed.json"), "music/feed.json")
+
+    def test_first_export_renders_every_page(self):
+        """Test that all public music pages are exported."""
+        result = export_static_site(self.export_dir)
+        self.assertEqual(
+            set(result.rendered),
+            {
+                "/music/",
+                "/music/ratings",
+                "/music/rss",
+                "/music/atom",
+                "/music/feed.json",
+                f"/music/music/{self.album.id}",
+                f"/music/music/{self.other_album.id}",
+                "/music/best_of/2024",
+            },
+        )
+        self.assertIn("Kind of Blue", self.read(f"/music/music/{self.album.id}"))
+        self.assertIn("Giant Steps", self.read("/music/rss"))
+
+    def test_pages_are_rendered_for_anonymous_visitors(self):
+        """Test that exported album pages don't contain the comment form."""
+        export_static_site(self.export_dir)
+        page = self.read(f"/music/music/{self.album.id}")
+        self.assertIn("you need to be logged in", page)
+        self.assertNotIn("comment_submission_form", page)
+
+    def test_second_export_renders_nothing(self):
+        """Test that an export with no changes leaves every page alone."""
+        export_static_site(self.export_dir)
+        result = export_static_site(self.export_dir)
+        self.assertEqual(result.rendered, [])
+        self.assertEqual(result.unchanged, 8)
+
+    def test_force_renders_everything(self):
+        """Test that force re-renders unchanged pages."""
+        export_static_site(self.export_dir)
+        result = export_static_site(self.export_dir, force=True)
+        self.assertEqual(len(result.rendered), 8)
+
+    def test_editing_an_album_renders_only_affected_pages(self):
+        """Test that an edited album re-renders its page and the lists, but not other albums."""
+        export_static_site(self.export_dir)
+        self.album.very_short_description = "Modal."
+        self.album.save()
+        result = export_static_site(self.export_dir)
+        self.assertIn(f"/music/music/{self.album.id}", result.rendered)
+        self.assertIn("/music/", result.rendered)
+        self.assertIn("/music/rss", result.rendered)
+        self.assertIn("/music/best_of/2024", result.rendered)
+        self.assertNotIn(f"/music/music/{self.other_album.id}", result.rendered)
+        self.assertNotIn("/music/ratings", result.rendered)
+
+    def test_new_comment_renders_album_page(self):
+        """Test that a comment re-renders only the album it was left on."""
+        export_static_site(self.export_dir)
+        Comment.objects.create(text="Great!", author=self.user, album=self.album)
+        result = export_static_site(self.export_dir)
+        self.assertEqual(result.rendered, [f"/music/music/{self.album.id}"])
+        self.assertIn("Great!", self.read(f"/music/music/{self.album.id}"))
+
+    def test_tag_rename_renders_album_page(self):
+        """Test that renaming a tag re-renders the pages of albums carrying it."""
+        export_static_site(self.export_dir)
+        self.tag.name = "Modal Jazz"
+        self.tag.save()
+        result = export_static_site(self.export_dir)
+        self.assertIn(f"/music/music/{self.album.id}", result.rendered)
+        self.assertNotIn(f"/music/music/{self.other_album.id}", result.rendered)
+
+    def test_deleted_album_page_is_removed(self):
+        """Test that the page of a deleted album is deleted from the export."""
+        export_static_site(self.export_dir)
+        url = f"/music/music/{self.other_album.id}"
+        self.other_album.delete()
+        result = export_static_site(self.export_dir)
+        self.assertEqual(result.removed, [url])
+        self.assertFalse(
+            os.path.exists(os.path.join(self.export_dir, output_path(url)))
+        )
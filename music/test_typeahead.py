@@ -0,0 +1,156 @@
+"""Unit tests for the in-memory typeahead index."""
+
+from datetime import datetime, timezone
+
+from django.test import TestCase
+from django.urls import reverse
+
+from . import typeahead
+from .models import Music, Musician, Tag
+from .typeahead import (
+    KIND_ALBUM,
+    KIND_MUSICIAN,
+    KIND_TAG,
+    PrefixIndex,
+    Suggestion,
+    get_index,
+    invalidate_index,
+    suggest,
+)
+
+
+class PrefixIndexTests(TestCase):
+    """Tests for matching prefixes against the sorted keys."""
+
+    def setUp(self):
+        """An index over a few names."""
+        self.miles = Suggestion(KIND_MUSICIAN, "Miles Davis", "/miles")
+        self.mingus = Suggestion(KIND_MUSICIAN, "Charles Mingus", "/mingus")
+        self.alcest = Suggestion(KIND_MUSICIAN, "Alcést", "/alcest")
+        self.the_the = Suggestion(KIND_MUSICIAN, "The The", "/the-the")
+        self.index = PrefixIndex([self.miles, self.mingus, self.alcest, self.the_the])
+
+    def test_matches_the_start_of_any_word(self):
+        """Test that a prefix matches the first or a later word of a name."""
+        self.assertEqual(self.index.lookup("mi"), [self.miles, self.mingus])
+        self.assertEqual(self.index.lookup("dav"), [self.miles])
+
+    def test_matches_across_words(self):
+        """Test that a prefix spanning several words matches."""
+        self.assertEqual(self.index.lookup("miles  d"), [self.miles])
+        self.assertEqual(self.index.lookup("miles x"), [])
+
+    def test_ignores_case_and_accents(self):
+        """Test that case and accents don't matter on either side."""
+        self.assertEqual(self.index.lookup("ALCEST"), [self.alcest])
+        self.assertEqual(self.index.lookup("Mílés"), [self.miles])
+
+    def test_each_suggestion_appears_once(self):
+        """Test that a name matching the prefix at several words is suggested once."""
+        self.assertEqual(self.index.lookup("the"), [self.the_the])
+
+    def test_limit_and_blank_prefix(self):
+        """Test that results are capped and a blank prefix suggests nothing."""
+        self.assertEqual(self.index.lookup("mi", limit=1), [self.miles])
+        self.assertEqual(self.index.lookup("   "), [])
+
+
+class TypeaheadTests(TestCase):
+    """Tests for loading the index from the catalog and keeping it fresh."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.jazz = Tag.objects.create(name="Jazz")
+        cls.miles = Musician.objects.create(name="Miles Davis")
+        cls.miles.tags.add(cls.jazz)
+        Musician.objects.create(name="Nobody Without Albums")
+        cls.album = Music.objects.create(
+            name="Kind of Blue",
+            musician=cls.miles,
+            rating=3,
+            reviewed_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+
+    def setUp(self):
+        """Start every test from an index built from this test's data."""
+        invalidate_index()
+
+    def test_suggests_albums_musicians_and_tags(self):
+        """Test that albums link to their page and musicians and tags to a search."""
+        self.assertEqual(
+            suggest("kind"),
+            [
+                Suggestion(
+                    KIND_ALBUM,
+                    "Kind of Blue",
+                    reverse("music:music_detailed", args=[self.album.id]),
+                    detail="Miles Davis",
+                )
+            ],
+        )
+        self.assertEqual(
+            suggest("miles")[0].url,
+            reverse("music:search") + "?search_term=Miles+Davis",
+        )
+        self.assertEqual(suggest("jaz")[0].kind, KIND_TAG)
+
+    def test_musicians_without_albums_are_not_suggested(self):
+        """Test that a musician the search can't find anything for is left out."""
+        self.assertEqual(suggest("nobody"), [])
+
+    def test_lookups_do_not_query_the_database(self):
+        """Test that once built, the index answers without a query."""
+        get_index()
+        with self.assertNumQueries(0):
+            suggest("kind")
+
+    def test_saving_an_album_refreshes_the_index(self):
+        """Test that a new album is suggested once its transaction commits."""
+        get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            Music.objects.create(
+                name="Bitches Brew",
+                musician=self.miles,
+                rating=2,
+                reviewed_at=datetime(2024, 2, 1, tzinfo=timezone.utc),
+            )
+        self.assertEqual([s.name for s in suggest("bitches")], ["Bitches Brew"])
+
+    def test_renaming_a_tag_refreshes_the_index(self):
+        """Test that a renamed tag is suggested under its new name only."""
+        get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jazz.name = "Modal Jazz"
+            self.jazz.save()
+        self.assertEqual([s.name for s in suggest("modal")], ["Modal Jazz"])
+
+    def test_other_processes_see_the_version_file(self):
+        """Test that an index is rebuilt when another process rewrote the version file."""
+        stale = get_index()
+        # What another worker's invalidate_index() leaves behind: a new file, but this process's index still set.
+        invalidate_index()
+        typeahead._index = stale
+        self.assertIsNot(get_index(), stale)
+
+    def test_typeahead_view(self):
+        """Test the JSON shape of the typeahead endpoint."""
+        response = self.client.get(reverse("music:typeahead"), {"q": "kind"})
+        self.assertEqual(
+            response.json(),
+            {
+                "suggestions": [
+                    {
+                        "kind": KIND_ALBUM,
+                        "name": "Kind of Blue",
+                        "detail": "Miles Davis",
+                        "url": reverse("music:music_detailed", args=[self.album.id]),
+                    }
+                ]
+            },
+        )
+
+    def test_typeahead_view_requires_a_prefix(self):
+        """Test that a request without q is a 400."""
+        response = self.client.get(reverse("music:typeahead"))
+        self.assertEqual(response.status_code, 400)
@@ -1,11 +1,15 @@
 """Unit tests for music app views and helper functions."""
 
+import json
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
+from . import feeds
 from .models import BestOf, Comment, Music, Musician, Tag
 from .views import (
     apply_common_preselects_music,
@@ -253,34 +257,40 @@ class BestOfViewTests(TestCase):
             exclude_from_best_of_list=True,
         )
 
+    def setUp(self):
+        """Start every test with an empty cache, so no test sees another's cached lists."""
+        cache.clear()
+
     def test_best_of_filters_by_date_range(self):
         """Test that best_of view filters albums by date range."""
         response = self.client.get(reverse("music:best_of", args=["2023"]))
         self.assertEqual(response.status_code, 200)
 
         # Get all albums in the response context
-        all_albums = (
-            list(response.context["best_albums"])
-            + list(response.context["great_albums"])
-            + list(response.context["good_albums"])
-        )
+        all_album_ids = [
+            album["id"]
+            for album in response.context["best_albums"]
+            + response.context["great_albums"]
+            + response.context["good_albums"]
+        ]
 
         # Should not include album outside the period
-        self.assertNotIn(self.album_outside_period, all_albums)
+        self.assertNotIn(self.album_outside_period.id, all_album_ids)
 
     def test_best_of_excludes_flagged_albums(self):
         """Test that albums with exclude_from_best_of_list=True are excluded."""
         response = self.client.get(reverse("music:best_of", args=["2023"]))
         self.assertEqual(response.status_code, 200)
 
-        all_albums = (
-            list(response.context["best_albums"])
-            + list(response.context["great_albums"])
-            + list(response.context["good_albums"])
-        )
+        all_album_ids = [
+            album["id"]
+            for album in response.context["best_albums"]
+            + response.context["great_albums"]
+            + response.context["good_albums"]
+        ]
 
         # Should not include excluded album
-        self.assertNotIn(self.excluded_album, all_albums)
+        self.assertNotIn(self.excluded_album.id, all_album_ids)
 
     def test_best_of_partitions_by_rating(self):
         """Test that albums are partitioned by rating (albums_by_score)."""
@@ -288,9 +298,15 @@ class BestOfViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
 
         # Check that albums are in correct rating categories
-        self.assertIn(self.best_album, response.context["best_albums"])
-        self.assertIn(self.great_album, response.context["great_albums"])
-        self.assertIn(self.good_album, response.context["good_albums"])
+        self.assertIn(
+            self.best_album.id, [a["id"] for a in response.context["best_albums"]]
+        )
+        self.assertIn(
+            self.great_album.id, [a["id"] for a in response.context["great_albums"]]
+        )
+        self.assertIn(
+            self.good_album.id, [a["id"] for a in response.context["good_albums"]]
+        )
 
     def test_best_of_sorts_by_reviewed_at(self):
         """Test that albums within each rating are sorted by reviewed_at."""
@@ -309,12 +325,12 @@ class BestOfViewTests(TestCase):
         )
 
         response = self.client.get(reverse("music:best_of", args=["2023"]))
-        best_albums = list(response.context["best_albums"])
+        best_albums = [album["id"] for album in response.context["best_albums"]]
 
         # Should be sorted chronologically (earliest first)
-        self.assertEqual(best_albums[0], album1)
+        self.assertEqual(best_albums[0], album1.id)
         # album2 should come after album1
-        self.assertTrue(best_albums.index(album2) > best_albums.index(album1))
+        self.assertTrue(best_albums.index(album2.id) > best_albums.index(album1.id))
 
     def test_best_of_includes_tags_with_quantity(self):
         """Test that tags are counted and included in context."""
@@ -332,6 +348,13 @@ class BestOfViewTests(TestCase):
             self.assertIsInstance(count, int)
             self.assertGreater(count, 0)
 
+    def test_best_of_renders_from_one_query(self):
+        """Test that a BestOf with a stored snapshot is rendered without touching the albums."""
+        self.client.get(reverse("music:best_of", args=["2023"]))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("music:best_of", args=["2023"]))
+        self.assertContains(response, "Best Album")
+
     def test_best_of_404_on_invalid_name(self):
         """Test that best_of returns 404 for non-existent BestOf name."""
         response = self.client.get(reverse("music:best_of", args=["nonexistent"]))
@@ -377,3 +400,199 @@ class SearchViewTests(TestCase):
         response = self.client.get(reverse("music:search"), {"search_term": "MILES"})
         self.assertEqual(response.status_code, 200)
         self.assertIn(self.album, response.context["albums"])
+
+
+class FeedViewTests(TestCase):
+    """Tests for the cached RSS, Atom and JSON feeds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.musician = Musician.objects.create(name="Miles Davis")
+        cls.album = Music.objects.create(
+            name="Kind of Blue",
+            musician=cls.musician,
+            rating=3,
+            reviewed_at=datetime(2024, 1, 15, tzinfo=timezone.utc),
+            review_excerpt="A landmark record.",
+        )
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_rss_contains_album(self):
+        """Test that the RSS feed lists the album with its description."""
+        response = self.client.get(reverse("music:rss"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/rss+xml; charset=utf-8")
+        self.assertContains(response, "Kind of Blue")
+        self.assertContains(response, "A landmark record.")
+
+    def test_atom_contains_album(self):
+        """Test that the Atom feed is built from the same entries."""
+        response = self.client.get(reverse("music:atom"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"http://www.w3.org/2005/Atom", response.content)
+        self.assertContains(response, "Kind of Blue")
+
+    def test_json_feed_contains_album(self):
+        """Test that the JSON feed is built from the same entries."""
+        response = self.client.get(reverse("music:json_feed"))
+        self.assertEqual(response.status_code, 200)
+        document = json.loads(response.content)
+        self.assertEqual(document["version"], "https://jsonfeed.org/version/1.1")
+        self.assertEqual(document["items"][0]["title"], "Kind of Blue")
+        self.assertEqual(document["items"][0]["tags"], ["score__3"])
+
+    def test_feed_sets_validators(self):
+        """Test that feeds carry ETag and Last-Modified headers."""
+        response = self.client.get(reverse("music:rss"))
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        self.assertNotEqual(
+            response["ETag"], self.client.get(reverse("music:atom"))["ETag"]
+        )
+
+    def test_matching_etag_returns_304(self):
+        """Test that If-None-Match with the current ETag returns 304."""
+        etag = self.client.get(reverse("music:rss"))["ETag"]
+        response = self.client.get(reverse("music:rss"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since_returns_304(self):
+        """Test that If-Modified-Since at or after Last-Modified returns 304."""
+        last_modified = self.client.get(reverse("music:rss"))["Last-Modified"]
+        response = self.client.get(
+            reverse("music:rss"), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_feed_skips_rendering(self):
+        """Test that a repeat request is served from the cache."""
+        self.client.get(reverse("music:rss"))
+        with patch("music.feeds.build_feed_entries") as mock_build:
+            response = self.client.get(reverse("music:rss"))
+        mock_build.assert_not_called()
+        self.assertContains(response, "Kind of Blue")
+
+    def test_entries_are_shared_between_formats(self):
+        """Test that the entry list is built once for all three formats."""
+        with patch(
+            "music.feeds.build_feed_entries", wraps=feeds.build_feed_entries
+        ) as mock_build:
+            self.client.get(reverse("music:rss"))
+            self.client.get(reverse("music:atom"))
+            self.client.get(reverse("music:json_feed"))
+        self.assertEqual(mock_build.call_count, 1)
+
+    def test_editing_an_album_invalidates_feed(self):
+        """Test that saving an album changes the ETag and the cached content."""
+        etag = self.client.get(reverse("music:rss"))["ETag"]
+
+        self.album.name = "Kind of Blue (Legacy Edition)"
+        self.album.save()
+
+        response = self.client.get(reverse("music:rss"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Legacy Edition")
+
+    def test_editing_musician_tags_invalidates_feed(self):
+        """Test that tagging or renaming a tag of the album's musician changes the ETag."""
+        etag = self.client.get(reverse("music:rss"))["ETag"]
+
+        tag = Tag.objects.create(name="Modal Jazz")
+        self.musician.tags.add(tag)
+
+        response = self.client.get(reverse("music:rss"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Modal Jazz")
+        etag = response["ETag"]
+
+        tag.name = "Cool Jazz"
+        tag.save()
+
+        response = self.client.get(reverse("music:rss"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Cool Jazz")
+
+    def test_deleting_an_album_invalidates_feed(self):
+        """Test that deleting an album changes the ETag."""
+        other_album = Music.objects.create(
+            name="Sketches of Spain",
+            musician=self.musician,
+            rating=2,
+            reviewed_at=datetime(2024, 1, 10, tzinfo=timezone.utc),
+        )
+        etag = self.client.get(reverse("music:rss"))["ETag"]
+
+        other_album.delete()
+
+        response = self.client.get(reverse("music:rss"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Sketches of Spain")
+
+
+class PageCacheTests(TestCase):
+    """Tests for the tag-invalidated caching of the home and album pages."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.user = User.objects.create_user(username="commenter", password="testpass")
+        cls.tag = Tag.objects.create(name="Jazz")
+        cls.musician = Musician.objects.create(name="Miles Davis")
+        cls.musician.tags.add(cls.tag)
+        cls.album = Music.objects.create(
+            name="Kind of Blue",
+            musician=cls.musician,
+            rating=3,
+            reviewed_at=datetime(2024, 1, 15, tzinfo=timezone.utc),
+        )
+        cls.album_url = reverse("music:music_detailed", args=[cls.album.id])
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_repeat_visits_skip_the_database(self):
+        """Test that anonymous visitors are served the home and album pages from the cache."""
+        for url in (reverse("music:home"), self.album_url):
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertContains(response, "Kind of Blue")
+
+    def test_saving_an_album_invalidates_the_home_page(self):
+        """Test that a new review shows up on the home page right away."""
+        self.client.get(reverse("music:home"))
+        Music.objects.create(
+            name="Sketches of Spain",
+            musician=self.musician,
+            rating=2,
+            reviewed_at=datetime(2024, 2, 1, tzinfo=timezone.utc),
+        )
+        self.assertContains(self.client.get(reverse("music:home")), "Sketches of Spain")
+
+    def test_comment_invalidates_the_album_page(self):
+        """Test that a new comment shows up on the album page right away."""
+        self.client.get(self.album_url)
+        Comment.objects.create(
+            text="What a record.", author=self.user, album=self.album
+        )
+        self.assertContains(self.client.get(self.album_url), "What a record.")
+
+    def test_renaming_a_tag_invalidates_the_album_page(self):
+        """Test that pages displaying a tag pick up its new name."""
+        self.client.get(self.album_url)
+        self.tag.name = "Modal Jazz"
+        self.tag.save()
+        self.assertContains(self.client.get(self.album_url), "Modal Jazz")
+
+    def test_logged_in_users_are_not_served_the_cache(self):
+        """Test that logged-in users, who see the comment form, get a fresh page."""
+        self.client.get(self.album_url)
+        self.client.login(username="commenter", password="testpass")
+        self.assertContains(self.client.get(self.album_url), "comment_submission_form")
@@ -0,0 +1,178 @@
+"""
+Search-as-you-type suggestions over album, musician and tag names, answered from memory.
+
+Each worker process keeps a sorted array of lowercased keys: every name is indexed once per word, so "davis" finds
+"Miles Davis" as well as "miles" does. A lookup bisects to the first key starting with the typed prefix and walks
+forward, so suggestions never touch Postgres. A worker builds its index on its first lookup, not at startup, so a
+worker can boot even while the database is unreachable.
+
+Several gunicorn workers (and management commands) can change the catalog, so a change doesn't just mark the local
+index stale: music.signals also rewrites a version file, and every lookup stats it and rebuilds the index when it moved.
+"""
+
+import os
+import threading
+import unicodedata
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .constants import TYPEAHEAD_LIMIT, TYPEAHEAD_VERSION_PATH
+from .models import Music, Tag
+
+KIND_ALBUM = "album"
+KIND_MUSICIAN = "musician"
+KIND_TAG = "tag"
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """One thing a search prefix can complete to."""
+
+    kind: str
+    name: str
+    url: str
+    # For albums, the musician who made it.
+    detail: str = ""
+
+    def to_dict_for_api(self) -> dict[str, str]:
+        """Returns the suggestion as it appears in the typeahead response."""
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "detail": self.detail,
+            "url": self.url,
+        }
+
+
+def normalize(text: str) -> str:
+    """Lowercases text and strips accents, so "Alcest" and "alcést" match the same prefixes."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class PrefixIndex:
+    """A sorted array of (key, suggestion) pairs, searched with bisect."""
+
+    def __init__(self, suggestions: list[Suggestion]):
+        pairs: list[tuple[str, Suggestion]] = []
+        for suggestion in suggestions:
+            words = normalize(suggestion.name).split()
+            # One key per word start, each running to the end of the name, so multi-word prefixes still match.
+            pairs.extend(
+                (" ".join(words[start:]), suggestion) for start in range(len(words))
+            )
+        pairs.sort(key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.suggestions = [suggestion for _, suggestion in pairs]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, prefix: str, limit: int = TYPEAHEAD_LIMIT) -> list[Suggestion]:
+        """Returns up to limit suggestions with a word starting with prefix, in alphabetical order of the match."""
+        prefix = " ".join(normalize(prefix).split())
+        if not prefix:
+            return []
+        results: list[Suggestion] = []
+        for position in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[position].startswith(prefix) or len(results) >= limit:
+                break
+            suggestion = self.suggestions[position]
+            # A name whose words share the prefix ("The The") has several matching keys.
+            if suggestion not in results:
+                results.append(suggestion)
+        return results
+
+
+def load_suggestions() -> list[Suggestion]:
+    """Reads every album, musician and tag name from the database."""
+    search_url = reverse("music:search")
+    suggestions: list[Suggestion] = []
+    musicians: set[str] = set()
+    for album_id, name, musician_name in Music.objects.values_list(
+        "id", "name", "musician__name"
+    ):
+        suggestions.append(
+            Suggestion(
+                KIND_ALBUM,
+                name,
+                reverse("music:music_detailed", args=[album_id]),
+                detail=musician_name,
+            )
+        )
+        musicians.add(musician_name)
+    # Musicians and tags have no pages of their own, so they complete to a search. Only musicians with an album are
+    # suggested, since the search can't find anything for the others.
+    for musician_name in musicians:
+        suggestions.append(
+            Suggestion(
+                KIND_MUSICIAN,
+                musician_name,
+                f"{search_url}?{urlencode({'search_term': musician_name})}",
+            )
+        )
+    for tag_name in Tag.objects.values_list("name", flat=True):
+        suggestions.append(
+            Suggestion(
+                KIND_TAG,
+                tag_name,
+                f"{search_url}?{urlencode({'search_term': tag_name})}",
+            )
+        )
+    return suggestions
+
+
+def version_path() -> str:
+    """Returns the absolute path of the version file shared by every process."""
+    return os.path.join(settings.BASE_DIR, TYPEAHEAD_VERSION_PATH)
+
+
+def current_version() -> tuple[int, int] | None:
+    """Identifies the version file's latest contents, or returns None if nothing has changed since deploy."""
+    try:
+        stat = os.stat(version_path())
+    except FileNotFoundError:
+        return None
+    # Every rewrite is a new inode, so two changes within one mtime tick are still told apart.
+    return stat.st_ino, stat.st_mtime_ns
+
+
+_lock = threading.Lock()
+_index: PrefixIndex | None = None
+_index_version: tuple[int, int] | None = None
+
+
+def get_index() -> PrefixIndex:
+    """Returns this process's index, rebuilding it if the catalog changed since it was built."""
+    global _index, _index_version
+    version = current_version()
+    index = _index
+    if index is not None and version == _index_version:
+        return index
+    with _lock:
+        if _index is None or version != _index_version:
+            _index = PrefixIndex(load_suggestions())
+            _index_version = version
+        return _index
+
+
+def invalidate_index() -> None:
+    """Tells every process that its index is stale."""
+    global _index
+    _index = None
+    path = version_path()
+    temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    # Readers only stat the file; os.replace swaps in a new one atomically.
+    with open(temporary_path, "w", encoding="utf-8") as version_file:
+        version_file.write(uuid.uuid4().hex)
+    os.replace(temporary_path, path)
+
+
+def suggest(prefix: str, limit: int = TYPEAHEAD_LIMIT) -> list[Suggestion]:
+    """Returns the suggestions for a search prefix."""
+    return get_index().lookup(prefix, limit)
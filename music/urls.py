@@ -8,7 +8,12 @@ urlpatterns = [
     path("music/<int:music_id>", views.music, name="music_detailed"),
     path("music/<int:music_id>/comment", views.comment, name="comment"),
     path("search", views.search, name="search"),
+    path("typeahead.json", views.typeahead, name="typeahead"),
+    path("archive", views.archive, name="archive"),
+    path("archive.json", views.archive_json, name="archive_json"),
     path("ratings", views.ratings, name="ratings"),
     path("rss", views.rss, name="rss"),
+    path("atom", views.atom, name="atom"),
+    path("feed.json", views.json_feed, name="json_feed"),
     path("best_of/<name>", views.best_of, name="best_of"),
 ]
@@ -1,22 +1,28 @@
-from collections import Counter, defaultdict
 from typing import Any
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 from django.db.utils import IntegrityError
-from django.http import HttpRequest, HttpResponse, HttpResponseNotAllowed
-from django.shortcuts import get_object_or_404, redirect, render, reverse
-from feedgen.feed import FeedGenerator
-
-from .constants import (
-    MY_EMAIL,
-    MY_NAME,
-    PHOTO_DISPLAY_LIMIT,
-    RSS_FEED_QUANTITY,
-    URL_ROOT,
-    MusicRating,
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    JsonResponse,
 )
-from .models import BestOf, Comment, Music, Tag
+from django.shortcuts import get_object_or_404, redirect, render, reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from tagged_cache.decorators import cache_page_by_tags
+
+from . import feeds
+from .archive import ArchiveCursor, archive_albums
+from .best_of_snapshots import get_snapshot
+from .cache_tags import album_page_tags, best_of_page_tags, home_page_tags
+from .constants import ALBUM_PAGE_CACHE_SECONDS, REVIEW_BODY_FIELDS, MusicRating
+from .models import BestOf, Comment, Music, RelatedAlbum, Tag
+from .search_index import SearchCursor, search_albums
+from .typeahead import suggest
 
 
 def update_context_with_album(
@@ -41,11 +47,23 @@ def apply_common_preselects_music(music_queryset: QuerySet[Music]) -> QuerySet[M
 
 def get_recent_music(quantity: int = 10) -> QuerySet[Music]:
     """Returns the most recently reviewed albums with optimized preselects."""
-    return apply_common_preselects_music(Music.objects.order_by("-reviewed_at"))[
-        :quantity
-    ]
+    return apply_common_preselects_music(
+        Music.objects.order_by("-reviewed_at").defer(*REVIEW_BODY_FIELDS)
+    )[:quantity]
+
+
+def get_related_albums(album: Music) -> list[Music]:
+    """Returns the precomputed related albums of an album, best match first."""
+    entries = (
+        RelatedAlbum.objects.filter(album=album)
+        .select_related("related__musician")
+        .defer(*[f"related__{field}" for field in REVIEW_BODY_FIELDS])
+        .order_by("rank")
+    )
+    return [entry.related for entry in entries]
 
 
+@cache_page_by_tags(home_page_tags)
 def home(request: HttpRequest) -> HttpResponse:
     """Renders the homepage for the music app."""
     recent_music = get_recent_music()
@@ -61,12 +79,14 @@ def home(request: HttpRequest) -> HttpResponse:
     return render(request, "music/home.html", context)
 
 
+@cache_page_by_tags(album_page_tags, timeout=ALBUM_PAGE_CACHE_SECONDS)
 def music(request: HttpRequest, music_id: int) -> HttpResponse:
     """Displays a detailed view of a piece of music."""
     album = get_object_or_404(Music, pk=music_id)
 
     context: dict[str, Any] = {}
     update_context_with_album(context, album)
+    context["related_albums"] = get_related_albums(album)
 
     return render(request, "music/music.html", context)
 
@@ -91,103 +111,163 @@ def comment(request: HttpRequest, music_id: int) -> HttpResponse:
 
 
 def search(request: HttpRequest) -> HttpResponse:
-    """Searches for a particular search term in our set of musicians, music, and tags."""
+    """Searches album names, musicians, tags and reviews for a search term, best matches first.
+
+    Results are paginated; ?after=<cursor> continues from the end of the previous page.
+    """
     search_term = request.GET["search_term"]
+    after = request.GET.get("after")
+    try:
+        cursor = SearchCursor.decode(after) if after else None
+    except ValueError:
+        return HttpResponse(reason="Invalid cursor", status=400)
 
-    albums = apply_common_preselects_music(
-        Music.objects.filter(
-            Q(name__istartswith=search_term)
-            | Q(musician__name__istartswith=search_term)
-            | Q(musician__tags__name__iexact=search_term)
-        )
-    )
+    albums, next_cursor = search_albums(search_term, after=cursor)
 
-    context = {"albums": albums, "search_term": search_term}
+    context = {
+        "albums": albums,
+        "search_term": search_term,
+        "next_cursor": next_cursor.encode() if next_cursor else None,
+    }
     return render(request, "music/search.html", context)
 
 
+def typeahead(request: HttpRequest) -> HttpResponse:
+    """Suggests albums, musicians and tags completing ?q=, from an in-memory index: {"suggestions": [...]}."""
+    if "q" not in request.GET:
+        return HttpResponse(reason="Invalid input to GET", status=400)
+    suggestions = suggest(request.GET["q"])
+    return JsonResponse(
+        {"suggestions": [suggestion.to_dict_for_api() for suggestion in suggestions]}
+    )
+
+
+def parse_archive_params(
+    request: HttpRequest,
+) -> tuple[ArchiveCursor | None, int | None, str | None]:
+    """Reads the cursor, rating and tag filters of an archive request, raising ValueError if any are malformed."""
+    after = request.GET.get("after")
+    cursor = ArchiveCursor.decode(after) if after else None
+
+    rating = None
+    if request.GET.get("rating"):
+        rating = int(request.GET["rating"])
+        if rating not in (MusicRating.GOOD, MusicRating.GREAT, MusicRating.BEST):
+            raise ValueError(f"Unknown rating: {rating}")
+
+    tag = request.GET.get("tag") or None
+    return cursor, rating, tag
+
+
+def next_archive_query(
+    request: HttpRequest, next_cursor: ArchiveCursor | None
+) -> str | None:
+    """Returns the query string of the next archive page, keeping the current filters."""
+    if next_cursor is None:
+        return None
+    params = request.GET.copy()
+    params["after"] = next_cursor.encode()
+    return params.urlencode()
+
+
+def archive(request: HttpRequest) -> HttpResponse:
+    """Lists every album, most recently reviewed first, optionally filtered by rating and tag.
+
+    Results are paginated; ?after=<cursor> continues from the end of the previous page.
+    """
+    try:
+        cursor, rating, tag = parse_archive_params(request)
+    except ValueError:
+        return HttpResponse(reason="Invalid input to GET", status=400)
+
+    albums, next_cursor = archive_albums(after=cursor, rating=rating, tag=tag)
+
+    context = {
+        "albums": albums,
+        "rating": rating,
+        "tag": tag,
+        "ratings": [MusicRating.BEST, MusicRating.GREAT, MusicRating.GOOD],
+        "tags": Tag.objects.order_by("name"),
+        "next_query": next_archive_query(request, next_cursor),
+    }
+    return render(request, "music/archive.html", context)
+
+
+def archive_json(request: HttpRequest) -> HttpResponse:
+    """The archive as JSON: {"albums": [...], "next": <URL of the next page, or null>}."""
+    try:
+        cursor, rating, tag = parse_archive_params(request)
+    except ValueError:
+        return HttpResponse(reason="Invalid input to GET", status=400)
+
+    albums, next_cursor = archive_albums(after=cursor, rating=rating, tag=tag)
+
+    next_query = next_archive_query(request, next_cursor)
+    return JsonResponse(
+        {
+            "albums": [album.to_dict_for_api() for album in albums],
+            "next": (
+                f"{reverse('music:archive_json')}?{next_query}" if next_query else None
+            ),
+        }
+    )
+
+
 def ratings(request: HttpRequest) -> HttpResponse:
     """Displays the page that explains my ratings philosophy."""
     context: dict[str, Any] = {}
     return render(request, "music/ratings.html", context)
 
 
-def rss(_: HttpRequest) -> HttpResponse:
-    """Returns the XML content of my RSS feed for the music part of the website.
-
-    NOTE: We are doing no caching here at all right now, because this function is very fast and the website has
-    no traffic. If this situation changes, then I should cache it so that I don't build this object from scratch every
-    time."""
-    generator = FeedGenerator()
-
-    # Add basic metadata.
-    generator.title("Paul's Music Feed")
-    generator.author(name=MY_NAME, email=MY_EMAIL)
-    generator.contributor(name=MY_NAME, email=MY_EMAIL)
-    # RSS requires that we point to our own feed here. Not sure why.
-    generator.link(href=f"{URL_ROOT}rss", rel="self")
-    favicon_path = f"{URL_ROOT}static/favicon.png"
-    generator.icon(favicon_path)
-    generator.logo(favicon_path)
-    generator.subtitle("A feed for anyone who wants to know what albums I'm liking.")
-    generator.language("en")
-
-    albums = get_recent_music(quantity=RSS_FEED_QUANTITY)
-    for album in albums:
-        entry = generator.add_entry()
-        entry.title(album.name)
-        relative_path = reverse("music:music_detailed", args=[album.id])
-        path_to_album = f"{URL_ROOT}{relative_path.lstrip('/')}"
-        entry.guid(path_to_album, permalink=True)
-        entry.description(album.description())
-        entry.updated(album.reviewed_at)
-        entry.published(album.reviewed_at)
-        entry.author(name=MY_NAME, email=MY_EMAIL)
-        entry.link(href=path_to_album, rel="alternate")
-        entry.category(term=f"score__{album.rating}")
-
-    return HttpResponse(generator.rss_str())
+def feed_response(request: HttpRequest, feed_format: str) -> HttpResponse:
+    """Serves a cached feed document, or a 304 if the reader already has the latest version.
 
+    Readers revalidate with If-None-Match/If-Modified-Since, which we can answer from one aggregate query without
+    rendering anything. See music/feeds.py for how the cache is keyed."""
+    version = feeds.get_feed_version()
+    etag = quote_etag(version.etag(feed_format))
+    last_modified = (
+        int(version.last_modified.timestamp()) if version.last_modified else None
+    )
 
-def best_of(request: HttpRequest, name: str) -> HttpResponse:
-    """Displays a curated list of albums for a specific time period."""
-    best_of = get_object_or_404(BestOf, name=name)
-    relevant_albums = apply_common_preselects_music(
-        Music.objects.filter(
-            reviewed_at__gt=best_of.start_date,
-            reviewed_at__lt=best_of.end_date,
-            exclude_from_best_of_list=False,
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(
+            feeds.get_rendered_feed(feed_format, version),
+            content_type=feeds.CONTENT_TYPES[feed_format],
         )
-    )
-    albums_by_score: defaultdict[int, list[Music]] = defaultdict(list)
-    # Partition by rating.
-    for album in relevant_albums:
-        albums_by_score[album.rating].append(album)
-    # Sort according to review date.
-    for value in albums_by_score.values():
-        value.sort(key=lambda x: x.reviewed_at)
-    albums_with_photos = (
-        albums_by_score[MusicRating.BEST]
-        + albums_by_score[MusicRating.GREAT]
-        + albums_by_score[MusicRating.GOOD]
-    )
-    albums_with_photos = [album for album in albums_with_photos if album.image_src()]
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def rss(request: HttpRequest) -> HttpResponse:
+    """Returns the XML content of my RSS feed for the music part of the website."""
+    return feed_response(request, feeds.FORMAT_RSS)
 
-    tag_counter: Counter[Tag] = Counter()
-    for album in relevant_albums:
-        for tag in album.musician.tags.all():
-            tag_counter[tag] += 1
 
-    tags_by_popularity = list(tag_counter.keys())
-    tags_by_popularity.sort(key=lambda x: tag_counter[x], reverse=True)
-    corresponding_values = [tag_counter[tag] for tag in tags_by_popularity]
+def atom(request: HttpRequest) -> HttpResponse:
+    """Returns the same feed as rss(), in Atom format."""
+    return feed_response(request, feeds.FORMAT_ATOM)
 
+
+def json_feed(request: HttpRequest) -> HttpResponse:
+    """Returns the same feed as rss(), in JSON Feed format."""
+    return feed_response(request, feeds.FORMAT_JSON)
+
+
+def best_of(request: HttpRequest, name: str) -> HttpResponse:
+    """Displays a curated list of albums for a specific time period."""
+    best_of = get_object_or_404(BestOf.objects.select_related("snapshot"), name=name)
+    snapshot = get_snapshot(best_of)
     context = {
         "best_of": best_of,
-        "best_albums": albums_by_score[MusicRating.BEST],
-        "great_albums": albums_by_score[MusicRating.GREAT],
-        "good_albums": albums_by_score[MusicRating.GOOD],
-        "tags_with_quantity": zip(tags_by_popularity, corresponding_values),
-        "albums_with_photos": albums_with_photos[:PHOTO_DISPLAY_LIMIT],
+        "best_albums": snapshot.best_albums,
+        "great_albums": snapshot.great_albums,
+        "good_albums": snapshot.good_albums,
+        "tags_with_quantity": snapshot.tags_with_quantity,
+        "albums_with_photos": snapshot.albums_with_photos,
+        "cache_tags": best_of_page_tags(best_of.name),
     }
     return render(request, "music/best_of.html", context)
@@ -0,0 +1,5 @@
+from django.apps import AppConfig
+
+
+class RequestProfilingConfig(AppConfig):
+    name = "request_profiling"
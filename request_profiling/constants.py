@@ -0,0 +1,11 @@
+# A query template that runs at least this many times in one request is reported as a likely N+1.
+REPEATED_QUERY_THRESHOLD = 3
+
+# How many statements, by total time, the slow-request log lists.
+SLOW_LOG_TOP_STATEMENTS = 5
+
+# Longer statements are cut down to this many characters in the slow-request log.
+SLOW_LOG_MAX_SQL_LENGTH = 500
+
+# Name of the logger the slow-request log is written to.
+SLOW_REQUEST_LOGGER = "request_profiling.slow"
@@ -0,0 +1,105 @@
+"""
+Counts and times the SQL of a sample of requests.
+
+Sampled responses to staff (or any sampled response with DEBUG on) get a Server-Timing header, shown in the browser's
+network panel, and sampled requests that are slow or look like they have an N+1 query are written to the slow-request
+log. Requests that aren't sampled cost one
+random number.
+"""
+
+import json
+import logging
+import random
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+from .constants import (
+    SLOW_LOG_MAX_SQL_LENGTH,
+    SLOW_LOG_TOP_STATEMENTS,
+    SLOW_REQUEST_LOGGER,
+)
+from .profiling import RequestProfile, StatementStats
+
+logger = logging.getLogger(SLOW_REQUEST_LOGGER)
+
+
+def truncated(stats: StatementStats) -> dict:
+    """Returns a statement for the slow-request log, with its SQL cut down to a readable length."""
+    entry = stats.to_dict_for_api()
+    entry["sql"] = entry["sql"][:SLOW_LOG_MAX_SQL_LENGTH]
+    return entry
+
+
+def log_slow_request(
+    request: HttpRequest,
+    response: HttpResponse,
+    profile: RequestProfile,
+    total_ms: float,
+) -> None:
+    """Writes one line describing a slow or query-heavy request to the slow-request log."""
+    match = request.resolver_match
+    entry = {
+        "method": request.method,
+        "path": request.path,
+        "view": match.view_name if match else None,
+        "status": response.status_code,
+        "total_ms": round(total_ms, 2),
+        "db_ms": round(profile.db_ms, 2),
+        "queries": profile.query_count,
+        "duplicates": profile.duplicates,
+        "repeated": [truncated(stats) for stats in profile.repeated_statements()],
+        "top": [
+            truncated(stats) for stats in profile.statements()[:SLOW_LOG_TOP_STATEMENTS]
+        ],
+    }
+    logger.warning("Slow request: %s", json.dumps(entry))
+
+
+def shows_server_timing(request: HttpRequest) -> bool:
+    """Returns whether the response to a request may reveal its query counts and timings."""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+class QueryProfilingMiddleware:
+    """
+    Profiles REQUEST_PROFILING_SAMPLE_RATE of all requests. Put it first in MIDDLEWARE, so the time and queries of the
+    other middleware (sessions, authentication) are included.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        # For streaming responses this stops at the first byte, since the body is produced after we return.
+        total_ms = (time.perf_counter() - start) * 1000
+
+        if shows_server_timing(request):
+            server_timing = profile.server_timing(total_ms)
+            if "Server-Timing" in response.headers:
+                server_timing = f"{response.headers['Server-Timing']}, {server_timing}"
+            response.headers["Server-Timing"] = server_timing
+
+        if (
+            total_ms >= settings.REQUEST_PROFILING_SLOW_MS
+            or profile.repeated_statements()
+        ):
+            log_slow_request(request, response, profile, total_ms)
+        return response
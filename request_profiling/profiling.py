@@ -0,0 +1,99 @@
+"""
+Records the SQL statements a request runs, for the Server-Timing header and the slow-request log.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .constants import REPEATED_QUERY_THRESHOLD
+
+
+@dataclass
+class StatementStats:
+    """How often one SQL template ran during a request, and for how long in total."""
+
+    sql: str
+    count: int
+    total_ms: float
+
+    def to_dict_for_api(self) -> dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+        }
+
+
+@dataclass
+class RequestProfile:
+    """
+    The queries run during one request. Pass an instance to connection.execute_wrapper() to fill it in.
+
+    Queries are grouped by their SQL template (parameters left out), so the same query run once per row of a list shows
+    up as one statement with a high count. Queries repeated with identical parameters are counted as duplicates.
+    """
+
+    queries: list[tuple[str, float]] = field(default_factory=list)
+    duplicates: int = 0
+    _seen: set[tuple[str, str]] = field(default_factory=set, repr=False)
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: Any,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, params, (time.perf_counter() - start) * 1000)
+
+    def record(self, sql: str, params: Any, duration_ms: float) -> None:
+        """Records one query and how long it took."""
+        key = (sql, repr(params))
+        if key in self._seen:
+            self.duplicates += 1
+        else:
+            self._seen.add(key)
+        self.queries.append((sql, duration_ms))
+
+    @property
+    def query_count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_ms(self) -> float:
+        return sum(duration_ms for _, duration_ms in self.queries)
+
+    def statements(self) -> list[StatementStats]:
+        """Returns the SQL templates that ran, slowest in total first."""
+        by_sql: dict[str, StatementStats] = {}
+        for sql, duration_ms in self.queries:
+            stats = by_sql.setdefault(sql, StatementStats(sql, 0, 0.0))
+            stats.count += 1
+            stats.total_ms += duration_ms
+        return sorted(by_sql.values(), key=lambda stats: stats.total_ms, reverse=True)
+
+    def repeated_statements(self) -> list[StatementStats]:
+        """Returns the SQL templates that ran often enough to suggest an N+1 query."""
+        return [
+            stats
+            for stats in self.statements()
+            if stats.count >= REPEATED_QUERY_THRESHOLD
+        ]
+
+    def server_timing(self, total_ms: float) -> str:
+        """Returns a Server-Timing header value splitting the request's time between the database and the app."""
+        description = f"{self.query_count} queries, {self.duplicates} duplicates"
+        return ", ".join(
+            [
+                f"total;dur={total_ms:.1f}",
+                f'db;dur={self.db_ms:.1f};desc="{description}"',
+                f"app;dur={max(total_ms - self.db_ms, 0):.1f}",
+            ]
+        )
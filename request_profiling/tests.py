@@ -0,0 +1,145 @@
+"""Unit tests for the query-profiling middleware."""
+
+import json
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from .middleware import QueryProfilingMiddleware
+from .profiling import RequestProfile
+
+
+class RequestProfileTests(TestCase):
+    """Tests for grouping and counting the recorded queries."""
+
+    def test_statements_are_grouped_by_template(self):
+        """Test that the same template with different parameters is one statement."""
+        profile = RequestProfile()
+        profile.record("SELECT %s", (1,), 1.0)
+        profile.record("SELECT %s", (2,), 2.0)
+        profile.record("SELECT 1", (), 5.0)
+        statements = profile.statements()
+        self.assertEqual([stats.sql for stats in statements], ["SELECT 1", "SELECT %s"])
+        self.assertEqual(statements[1].count, 2)
+        self.assertEqual(statements[1].total_ms, 3.0)
+        self.assertEqual(profile.duplicates, 0)
+
+    def test_identical_queries_are_duplicates(self):
+        """Test that repeating a query with the same parameters counts as a duplicate."""
+        profile = RequestProfile()
+        profile.record("SELECT %s", (1,), 1.0)
+        profile.record("SELECT %s", (1,), 1.0)
+        self.assertEqual(profile.duplicates, 1)
+
+    def test_repeated_statements(self):
+        """Test that a template run once per row is reported as repeated."""
+        profile = RequestProfile()
+        for i in range(3):
+            profile.record("SELECT %s", (i,), 1.0)
+        profile.record("SELECT 1", (), 1.0)
+        self.assertEqual(
+            [stats.sql for stats in profile.repeated_statements()], ["SELECT %s"]
+        )
+
+    def test_server_timing(self):
+        """Test that the header splits the time between the database and the app."""
+        profile = RequestProfile()
+        profile.record("SELECT 1", (), 4.0)
+        self.assertEqual(
+            profile.server_timing(10.0),
+            'total;dur=10.0, db;dur=4.0;desc="1 queries, 0 duplicates", app;dur=6.0',
+        )
+
+
+@override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0, REQUEST_PROFILING_SLOW_MS=1000)
+class QueryProfilingMiddlewareTests(TestCase):
+    """Tests for the Server-Timing header and the slow-request log."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.users = [
+            User.objects.create_user(username=f"user{i}", password="pw")
+            for i in range(3)
+        ]
+        cls.staff = User.objects.create_user(
+            username="staff", password="pw", is_staff=True
+        )
+
+    def view(self, request):
+        """Looks up each user on its own, like an N+1 query would."""
+        for user in self.users:
+            User.objects.get(pk=user.pk)
+        return HttpResponse("ok")
+
+    def get(self, view=None, user=None):
+        """Runs a request through the middleware, as staff unless another user is given."""
+        request = RequestFactory().get("/page")
+        request.user = user or self.staff
+        return QueryProfilingMiddleware(view or self.view)(request)
+
+    def test_sampled_responses_have_server_timing(self):
+        """Test that a sampled response to staff reports its query count."""
+        response = self.get()
+        self.assertIn('desc="3 queries, 0 duplicates"', response["Server-Timing"])
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+    def test_server_timing_is_hidden_from_the_public(self):
+        """Test that other users' responses don't reveal query counts and timings."""
+        self.assertNotIn("Server-Timing", self.get(user=AnonymousUser()))
+        self.assertNotIn("Server-Timing", self.get(user=self.users[0]))
+
+    @override_settings(DEBUG=True)
+    def test_server_timing_is_shown_to_everyone_in_debug(self):
+        """Test that with DEBUG on every sampled response gets the header."""
+        self.assertIn("Server-Timing", self.get(user=AnonymousUser()))
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_responses_are_left_alone(self):
+        """Test that requests that aren't sampled aren't profiled."""
+        self.assertNotIn("Server-Timing", self.get())
+
+    def test_existing_server_timing_is_kept(self):
+        """Test that the view's own Server-Timing entries are kept."""
+
+        def view(request):
+            response = HttpResponse("ok")
+            response["Server-Timing"] = "render;dur=1"
+            return response
+
+        self.assertTrue(self.get(view)["Server-Timing"].startswith("render;dur=1, "))
+
+    def test_repeated_queries_are_logged(self):
+        """Test that a likely N+1 query is logged with its statement, even if the request was fast."""
+        with self.assertLogs("request_profiling.slow", level="WARNING") as logs:
+            self.get()
+        entry = json.loads(logs.records[0].args[0])
+        self.assertEqual(entry["queries"], 3)
+        self.assertEqual(entry["repeated"][0]["count"], 3)
+        self.assertIn("auth_user", entry["repeated"][0]["sql"])
+
+    @override_settings(REQUEST_PROFILING_SLOW_MS=0)
+    def test_slow_requests_are_logged(self):
+        """Test that requests over the threshold are logged with their top statements."""
+
+        def view(request):
+            User.objects.count()
+            return HttpResponse("ok")
+
+        with self.assertLogs("request_profiling.slow", level="WARNING") as logs:
+            self.get(view)
+        entry = json.loads(logs.records[0].args[0])
+        self.assertEqual(entry["path"], "/page")
+        self.assertEqual(entry["status"], 200)
+        self.assertEqual(len(entry["top"]), 1)
+
+    def test_fast_requests_are_not_logged(self):
+        """Test that fast requests without repeated queries aren't logged."""
+
+        def view(request):
+            User.objects.count()
+            return HttpResponse("ok")
+
+        with self.assertNoLogs("request_profiling.slow"):
+            self.get(view)
@@ -0,0 +1,5 @@
+from django.apps import AppConfig
+
+
+class ResponsiveImagesConfig(AppConfig):
+    name = "responsive_images"
@@ -0,0 +1,26 @@
+# Apps whose static/ directories hold images that templates display
+IMAGE_SOURCE_APPS = ("bio", "music", "scavenger_hunt")
+IMAGE_SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Derivatives are written into this app's static directory so that collectstatic picks them up like any other file.
+DERIVATIVES_STATIC_PREFIX = "responsive_images/derivatives/"
+DERIVATIVES_DIR = "responsive_images/static/" + DERIVATIVES_STATIC_PREFIX
+DERIVATIVES_MANIFEST_PATH = "responsive_images/derivatives.json"
+
+# Widths (in pixels) to generate; sources narrower than a width get a derivative at their own width instead.
+DERIVATIVE_WIDTHS = (320, 640, 960, 1280)
+
+# Maps the Pillow format name to the MIME type used in <source type="...">. Listed in the order browsers should try.
+FORMAT_AVIF = "AVIF"
+FORMAT_WEBP = "WEBP"
+DERIVATIVE_MIME_TYPES = {FORMAT_AVIF: "image/avif", FORMAT_WEBP: "image/webp"}
+DERIVATIVE_EXTENSIONS = {FORMAT_AVIF: ".avif", FORMAT_WEBP: ".webp"}
+DERIVATIVE_QUALITY = {FORMAT_AVIF: 55, FORMAT_WEBP: 75}
+
+# Placeholders are inlined into the page as data URIs, so they are kept tiny and blurred.
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_BLUR_RADIUS = 1
+PLACEHOLDER_QUALITY = 30
+
+# Characters of the source's SHA-256 kept in derivative filenames
+CONTENT_HASH_LENGTH = 16
@@ -0,0 +1,262 @@
+"""
+Resized, re-encoded copies of the site's images for use in srcset.
+
+The build_image_derivatives command walks the static directories of IMAGE_SOURCE_APPS and, for every JPEG or PNG,
+writes WebP (and optionally AVIF) copies at each of DERIVATIVE_WIDTHS plus a tiny blurred placeholder, then records
+them in a JSON manifest. Derivative filenames embed a hash of the source's contents, so they can be cached forever and a
+replaced image automatically gets new URLs.
+
+Builds are incremental: a source whose size and mtime match the previous manifest isn't even re-read, and a derivative
+that already exists on disk is never re-encoded. Derivatives no longer referenced by any source are deleted.
+"""
+
+import base64
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+
+from django.conf import settings
+from PIL import Image, ImageFilter, ImageOps
+
+from .constants import (
+    CONTENT_HASH_LENGTH,
+    DERIVATIVE_EXTENSIONS,
+    DERIVATIVE_MIME_TYPES,
+    DERIVATIVE_QUALITY,
+    DERIVATIVE_WIDTHS,
+    DERIVATIVES_MANIFEST_PATH,
+    DERIVATIVES_STATIC_PREFIX,
+    IMAGE_SOURCE_APPS,
+    IMAGE_SOURCE_EXTENSIONS,
+    PLACEHOLDER_BLUR_RADIUS,
+    PLACEHOLDER_QUALITY,
+    PLACEHOLDER_WIDTH,
+)
+
+HASH_CHUNK_SIZE = 1 << 16
+
+
+@dataclass(frozen=True)
+class ResponsiveImage:
+    """The derivatives of one source image, and what is needed to tell whether they are stale."""
+
+    content_hash: str
+    size: int
+    mtime_ns: int
+    width: int
+    height: int
+    # A data: URI, small enough to inline into the page.
+    placeholder: str
+    # MIME type -> (static path, width) of each derivative, narrowest first.
+    srcsets: dict[str, list[tuple[str, int]]]
+
+
+@dataclass
+class DerivativeBuildResult:
+    """The outcome of a build_derivatives() run."""
+
+    images: dict[str, ResponsiveImage] = field(default_factory=dict)
+    encoded: int = 0
+    removed: int = 0
+
+
+def find_source_images() -> dict[str, str]:
+    """Maps the static path of every source image (e.g. bio/images/owl.jpg) to its location on disk."""
+    sources = {}
+    for app in IMAGE_SOURCE_APPS:
+        static_root = os.path.join(settings.BASE_DIR, app, "static")
+        for dirpath, _, filenames in os.walk(static_root):
+            for filename in filenames:
+                if not filename.lower().endswith(IMAGE_SOURCE_EXTENSIONS):
+                    continue
+                full_path = os.path.join(dirpath, filename)
+                static_path = os.path.relpath(full_path, static_root).replace(
+                    os.sep, "/"
+                )
+                sources[static_path] = full_path
+    return sources
+
+
+def hash_file(path: str) -> str:
+    """Returns the truncated SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as source_file:
+        while chunk := source_file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()[:CONTENT_HASH_LENGTH]
+
+
+def derivative_widths(source_width: int) -> list[int]:
+    """Returns the widths to generate for a source, never upscaling it."""
+    widths = [width for width in DERIVATIVE_WIDTHS if width < source_width]
+    if source_width <= DERIVATIVE_WIDTHS[-1]:
+        widths.append(source_width)
+    return widths
+
+
+def load_source(path: str) -> Image.Image:
+    """Decodes a source image, upright and in a mode every output format can encode."""
+    with Image.open(path) as opened:
+        # Derivatives don't carry EXIF, so bake the orientation into the pixels.
+        image = ImageOps.exif_transpose(opened)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    return image
+
+
+def resize_to_width(image: Image.Image, width: int) -> Image.Image:
+    """Scales an image to a width, keeping its aspect ratio."""
+    if width == image.width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def make_placeholder(image: Image.Image) -> str:
+    """Returns a tiny blurred copy of an image as a data: URI."""
+    small = resize_to_width(image, min(PLACEHOLDER_WIDTH, image.width))
+    small = small.filter(ImageFilter.GaussianBlur(PLACEHOLDER_BLUR_RADIUS))
+    buffer = io.BytesIO()
+    small.save(buffer, format="WEBP", quality=PLACEHOLDER_QUALITY)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def encode_derivative(
+    image: Image.Image, width: int, image_format: str, output_path: str
+) -> None:
+    """Writes one resized derivative, atomically so an interrupted build never leaves a truncated file behind."""
+    temporary_path = output_path + ".tmp"
+    resize_to_width(image, width).save(
+        temporary_path, format=image_format, quality=DERIVATIVE_QUALITY[image_format]
+    )
+    os.replace(temporary_path, output_path)
+
+
+def build_image(
+    source_path: str,
+    previous: ResponsiveImage | None,
+    output_dir: str,
+    formats: list[str],
+) -> tuple[ResponsiveImage, int]:
+    """Brings one source's derivatives up to date, returning its manifest entry and how many files were encoded."""
+    stat = os.stat(source_path)
+    if (
+        previous is not None
+        and previous.size == stat.st_size
+        and previous.mtime_ns == stat.st_mtime_ns
+    ):
+        content_hash = previous.content_hash
+    else:
+        content_hash = hash_file(source_path)
+
+    image = None
+    if previous is not None and previous.content_hash == content_hash:
+        width, height, placeholder = (
+            previous.width,
+            previous.height,
+            previous.placeholder,
+        )
+    else:
+        image = load_source(source_path)
+        width, height = image.size
+        placeholder = make_placeholder(image)
+
+    encoded = 0
+    srcsets = {}
+    for image_format in formats:
+        srcset = []
+        for derivative_width in derivative_widths(width):
+            filename = f"{content_hash}-{derivative_width}{DERIVATIVE_EXTENSIONS[image_format]}"
+            output_path = os.path.join(output_dir, filename)
+            if not os.path.exists(output_path):
+                # Only decode the source if something actually needs encoding.
+                if image is None:
+                    image = load_source(source_path)
+                encode_derivative(image, derivative_width, image_format, output_path)
+                encoded += 1
+            srcset.append((DERIVATIVES_STATIC_PREFIX + filename, derivative_width))
+        srcsets[DERIVATIVE_MIME_TYPES[image_format]] = srcset
+
+    entry = ResponsiveImage(
+        content_hash=content_hash,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        width=width,
+        height=height,
+        placeholder=placeholder,
+        srcsets=srcsets,
+    )
+    return entry, encoded
+
+
+def build_derivatives(
+    sources: dict[str, str],
+    output_dir: str,
+    previous: dict[str, ResponsiveImage],
+    formats: list[str],
+) -> DerivativeBuildResult:
+    """Generates any missing derivatives for the given sources and deletes ones nothing refers to."""
+    os.makedirs(output_dir, exist_ok=True)
+    result = DerivativeBuildResult()
+    for static_path, source_path in sorted(sources.items()):
+        try:
+            entry, encoded = build_image(
+                source_path, previous.get(static_path), output_dir, formats
+            )
+        except OSError:
+            logging.warning(f"Skipping unreadable image: {source_path}")
+            continue
+        result.images[static_path] = entry
+        result.encoded += encoded
+
+    referenced = {
+        os.path.basename(path)
+        for entry in result.images.values()
+        for srcset in entry.srcsets.values()
+        for path, _ in srcset
+    }
+    for filename in os.listdir(output_dir):
+        if filename not in referenced:
+            os.remove(os.path.join(output_dir, filename))
+            result.removed += 1
+    return result
+
+
+def write_derivatives_manifest(
+    images: dict[str, ResponsiveImage], manifest_path: str
+) -> None:
+    """Writes the manifest of derivatives as JSON."""
+    serialized = {path: asdict(entry) for path, entry in sorted(images.items())}
+    with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(serialized, manifest_file, indent=2)
+
+
+def read_derivatives_manifest(manifest_path: str) -> dict[str, ResponsiveImage] | None:
+    """Loads a manifest written by write_derivatives_manifest(), or returns None if there isn't one."""
+    try:
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            serialized = json.load(manifest_file)
+    except IOError:
+        return None
+    images = {}
+    for path, info in serialized.items():
+        info["srcsets"] = {
+            mime_type: [(static_path, width) for static_path, width in srcset]
+            for mime_type, srcset in info["srcsets"].items()
+        }
+        images[path] = ResponsiveImage(**info)
+    return images
+
+
+@functools.cache
+def get_derivatives_manifest() -> dict[str, ResponsiveImage]:
+    """Returns this process's copy of the manifest, loading it on first use."""
+    # Without a manifest (e.g. in local development) templates fall back to the original images.
+    manifest = read_derivatives_manifest(
+        os.path.join(settings.BASE_DIR, DERIVATIVES_MANIFEST_PATH)
+    )
+    return manifest or {}
@@ -0,0 +1,52 @@
+import os
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from PIL import features
+
+from responsive_images.constants import (
+    DERIVATIVES_DIR,
+    DERIVATIVES_MANIFEST_PATH,
+    FORMAT_AVIF,
+    FORMAT_WEBP,
+)
+from responsive_images.derivatives import (
+    build_derivatives,
+    find_source_images,
+    read_derivatives_manifest,
+    write_derivatives_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = "Generates resized WebP copies and blurred placeholders of site images, re-encoding only changed sources."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--avif",
+            action="store_true",
+            help="Also generate AVIF derivatives (smaller, but much slower to encode).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        formats = [FORMAT_WEBP]
+        if options["avif"]:
+            if not features.check("avif"):
+                raise CommandError("This build of Pillow can't encode AVIF.")
+            formats.insert(0, FORMAT_AVIF)
+
+        manifest_path = os.path.join(settings.BASE_DIR, DERIVATIVES_MANIFEST_PATH)
+        result = build_derivatives(
+            find_source_images(),
+            os.path.join(settings.BASE_DIR, DERIVATIVES_DIR),
+            read_derivatives_manifest(manifest_path) or {},
+            formats,
+        )
+        write_derivatives_manifest(result.images, manifest_path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(result.images)} images: encoded {result.encoded} derivatives, "
+                f"removed {result.removed} stale ones."
+            )
+        )
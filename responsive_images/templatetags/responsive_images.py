@@ -0,0 +1,65 @@
+from typing import Any
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import SafeString
+
+from ..constants import DERIVATIVE_MIME_TYPES, FORMAT_WEBP
+from ..derivatives import get_derivatives_manifest
+
+register = template.Library()
+
+
+def render_attrs(attrs: dict[str, Any]) -> SafeString:
+    """Renders keyword arguments as escaped HTML attributes."""
+    return format_html_join("", ' {}="{}"', attrs.items())
+
+
+@register.simple_tag
+def srcset(path: str, mime_type: str = DERIVATIVE_MIME_TYPES[FORMAT_WEBP]) -> str:
+    """Returns the srcset of a static image's derivatives in one format, or "" if there are none."""
+    image = get_derivatives_manifest().get(path)
+    if image is None:
+        return ""
+    return ", ".join(
+        f"{static(derivative)} {width}w"
+        for derivative, width in image.srcsets.get(mime_type, [])
+    )
+
+
+@register.simple_tag
+def responsive_img(path: str, sizes: str = "100vw", **attrs: Any) -> SafeString:
+    """
+    Renders a static image as a <picture> offering its resized derivatives, over a blurred placeholder.
+
+    Extra keyword arguments become attributes of the <img>. Images without derivatives get a plain <img>.
+    """
+    image = get_derivatives_manifest().get(path)
+    if image is None:
+        return format_html('<img src="{}"{}>', static(path), render_attrs(attrs))
+
+    attrs.setdefault("width", image.width)
+    attrs.setdefault("height", image.height)
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    # Painted behind the image, so it shows until the real one has loaded on top of it.
+    attrs["style"] = (
+        f"background: url({image.placeholder}) center / cover no-repeat; "
+        + attrs.get("style", "")
+    ).strip()
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime_type, srcset(path, mime_type), sizes)
+            for mime_type in DERIVATIVE_MIME_TYPES.values()
+            if mime_type in image.srcsets
+        ),
+    )
+    return format_html(
+        '<picture>{}<img src="{}"{}></picture>',
+        sources,
+        static(path),
+        render_attrs(attrs),
+    )
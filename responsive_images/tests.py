@@ -0,0 +1,153 @@
+"""Unit tests for the responsive image derivatives and template tags."""
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase
+from PIL import Image
+
+from .constants import DERIVATIVES_DIR, DERIVATIVES_MANIFEST_PATH
+from .derivatives import (
+    derivative_widths,
+    get_derivatives_manifest,
+    read_derivatives_manifest,
+)
+
+
+class BuildImageDerivativesTests(SimpleTestCase):
+    """Tests for the build_image_derivatives command."""
+
+    def setUp(self):
+        """Point BASE_DIR at a temporary directory with one image per source app."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.album_path = self.make_image(
+            "music/static/music/images/band/album.jpg", (700, 700)
+        )
+        self.bio_path = self.make_image("bio/static/bio/images/me.png", (200, 300))
+
+        base_dir_patcher = patch.object(settings, "BASE_DIR", self.temp_dir)
+        base_dir_patcher.start()
+        self.addCleanup(base_dir_patcher.stop)
+        get_derivatives_manifest.cache_clear()
+        self.addCleanup(get_derivatives_manifest.cache_clear)
+
+    def make_image(self, relative_path, size, color="red"):
+        """Writes a solid-color image under the temporary BASE_DIR."""
+        path = os.path.join(self.temp_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.new("RGB", size, color).save(path)
+        return path
+
+    def build(self, *args):
+        """Runs the command and returns its output."""
+        out = StringIO()
+        call_command("build_image_derivatives", *args, stdout=out)
+        return out.getvalue()
+
+    def derivative_files(self):
+        """Returns the names of the files in the derivatives directory."""
+        return sorted(os.listdir(os.path.join(self.temp_dir, DERIVATIVES_DIR)))
+
+    def manifest(self):
+        """Reads the manifest the command wrote."""
+        return read_derivatives_manifest(
+            os.path.join(self.temp_dir, DERIVATIVES_MANIFEST_PATH)
+        )
+
+    def test_derivative_widths_never_upscale(self):
+        """Test that small sources get a single derivative at their own width."""
+        self.assertEqual(derivative_widths(200), [200])
+        self.assertEqual(derivative_widths(700), [320, 640, 700])
+        self.assertEqual(derivative_widths(5000), [320, 640, 960, 1280])
+
+    def test_build_writes_webp_derivatives_and_placeholders(self):
+        """Test that every source gets resized WebP copies and a placeholder."""
+        output = self.build()
+        self.assertIn("2 images: encoded 4 derivatives", output)
+
+        manifest = self.manifest()
+        album = manifest["music/images/band/album.jpg"]
+        self.assertEqual((album.width, album.height), (700, 700))
+        self.assertEqual(
+            [width for _, width in album.srcsets["image/webp"]], [320, 640, 700]
+        )
+        self.assertTrue(album.placeholder.startswith("data:image/webp;base64,"))
+
+        path, width = album.srcsets["image/webp"][0]
+        self.assertIn(album.content_hash, path)
+        with Image.open(
+            os.path.join(self.temp_dir, "responsive_images/static", path)
+        ) as derivative:
+            self.assertEqual(derivative.format, "WEBP")
+            self.assertEqual(derivative.size, (320, 320))
+
+    def test_rebuild_is_incremental(self):
+        """Test that unchanged sources are not re-encoded and changed ones get new names."""
+        self.build()
+        files_before = self.derivative_files()
+        self.assertIn("encoded 0 derivatives, removed 0", self.build())
+        self.assertEqual(self.derivative_files(), files_before)
+
+        self.make_image("music/static/music/images/band/album.jpg", (700, 700), "blue")
+        self.assertIn("encoded 3 derivatives, removed 3", self.build())
+        self.assertNotEqual(self.derivative_files(), files_before)
+
+    def test_removed_sources_are_pruned(self):
+        """Test that derivatives of deleted sources are removed."""
+        self.build()
+        os.remove(self.bio_path)
+        self.assertIn("1 images: encoded 0 derivatives, removed 1", self.build())
+        self.assertNotIn("bio/images/me.png", self.manifest())
+
+    def test_exif_orientation_is_applied(self):
+        """Test that rotated photos produce upright derivatives."""
+        path = os.path.join(self.temp_dir, "bio/static/bio/images/rotated.jpg")
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        Image.new("RGB", (300, 200)).save(path, exif=exif)
+        self.build()
+        rotated = self.manifest()["bio/images/rotated.jpg"]
+        self.assertEqual((rotated.width, rotated.height), (200, 300))
+
+    def test_unreadable_images_are_skipped(self):
+        """Test that a corrupt source doesn't stop the build."""
+        with open(
+            os.path.join(self.temp_dir, "bio/static/bio/images/broken.jpg"), "w"
+        ) as broken:
+            broken.write("not an image")
+        with self.assertLogs(level="WARNING"):
+            self.build()
+        self.assertNotIn("bio/images/broken.jpg", self.manifest())
+
+    def test_responsive_img_renders_picture(self):
+        """Test that an image with derivatives renders sources, dimensions and a placeholder."""
+        self.build()
+        rendered = Template(
+            "{% load responsive_images %}"
+            "{% responsive_img 'music/images/band/album.jpg' sizes='25vw' alt='Cover' %}"
+        ).render(Context())
+        self.assertTrue(rendered.startswith('<picture><source type="image/webp"'))
+        self.assertIn('sizes="25vw"', rendered)
+        self.assertIn("320w, ", rendered)
+        self.assertIn('src="/static/music/images/band/album.jpg"', rendered)
+        self.assertIn('width="700" height="700"', rendered)
+        self.assertIn('alt="Cover"', rendered)
+        self.assertIn("background: url(data:image/webp;base64,", rendered)
+
+    def test_responsive_img_falls_back_without_derivatives(self):
+        """Test that an image missing from the manifest renders as a plain <img>."""
+        rendered = Template(
+            "{% load responsive_images %}"
+            "{% responsive_img 'scavenger_hunt/img/new.jpg' class='max-size-img' %}"
+        ).render(Context())
+        self.assertEqual(
+            rendered,
+            '<img src="/static/scavenger_hunt/img/new.jpg" class="max-size-img">',
+        )
@@ -0,0 +1,5 @@
+from django.apps import AppConfig
+
+
+class TaggedCacheConfig(AppConfig):
+    name = "tagged_cache"
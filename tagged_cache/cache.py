@@ -0,0 +1,87 @@
+"""
+Cache entries that can be invalidated by tag, on top of any Django cache backend.
+
+Every tag (e.g. "album:12" or "music:list") has a version token stored in the cache. An entry is stored under a key
+that hashes its name together with the current version of each of its tags, so invalidating a tag is a matter of
+dropping its version: the next read mints a new one, every key built from the old version stops matching, and the
+orphaned entries simply age out. Reading an entry costs two cache round trips (the versions, then the entry) no matter
+how many entries share a tag, and it works the same on locmem, the file backend, memcached or Redis.
+
+Tags are also part of the key, so an entry tagged "album:12" can never be served for "album:13".
+"""
+
+import hashlib
+import uuid
+from collections.abc import Callable, Iterable
+from typing import Any, TypeVar
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import (
+    DEFAULT_TAGGED_CACHE_SECONDS,
+    TAG_VERSION_KEY_PREFIX,
+    TAGGED_ENTRY_KEY_PREFIX,
+)
+
+T = TypeVar("T")
+
+# Distinguishes "not cached" from a cached None.
+_MISSING = object()
+
+
+def version_key(tag: str) -> str:
+    """Returns the cache key holding a tag's current version."""
+    # Tags can contain spaces (e.g. a Best Of's name), which memcached doesn't accept in keys.
+    return TAG_VERSION_KEY_PREFIX + hashlib.sha256(tag.encode("utf-8")).hexdigest()
+
+
+def get_tag_versions(tags: Iterable[str]) -> dict[str, str]:
+    """Returns the current version of each tag, minting versions for tags that have none yet."""
+    tags = sorted(set(tags))
+    keys = {version_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        # add() doesn't overwrite, so if another process minted a version first, everyone ends up reading theirs.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+    if len(found) < len(keys):
+        found = cache.get_many(keys)
+    return {keys[key]: found.get(key) or "" for key in keys}
+
+
+def tagged_key(name: str, tags: Iterable[str]) -> str:
+    """Returns the key an entry is stored under while its tags have their current versions."""
+    versions = get_tag_versions(tags)
+    parts = [name] + [f"{tag}={version}" for tag, version in versions.items()]
+    return (
+        TAGGED_ENTRY_KEY_PREFIX
+        + hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    )
+
+
+def get_or_set(
+    name: str,
+    tags: Iterable[str],
+    compute: Callable[[], T],
+    timeout: int = DEFAULT_TAGGED_CACHE_SECONDS,
+) -> T:
+    """Returns the entry cached under name and tags, computing and storing it on a miss."""
+    key = tagged_key(name, tags)
+    value: Any = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Makes every entry carrying any of the tags unreachable.
+
+    Call this from inside the transaction that changed the data. Versions are dropped right away, so the rest of
+    the transaction sees fresh results, and again once it commits, in case another process cached the old rows in
+    between."""
+    if not tags:
+        return
+    keys = [version_key(tag) for tag in tags]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,6 @@
+# Cache key prefixes for tag versions and for the entries that depend on them
+TAG_VERSION_KEY_PREFIX = "tag-version:"
+TAGGED_ENTRY_KEY_PREFIX = "tagged:"
+
+# Entries are invalidated through their tags, so this only bounds how long unreachable versions linger in the cache.
+DEFAULT_TAGGED_CACHE_SECONDS = 60 * 60 * 24
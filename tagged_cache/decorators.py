@@ -0,0 +1,75 @@
+"""
+Whole-page caching for views, invalidated through tags (see tagged_cache.cache).
+"""
+
+import functools
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from .cache import tagged_key
+from .constants import DEFAULT_TAGGED_CACHE_SECONDS
+
+ViewFunction = Callable[..., HttpResponse]
+
+# Response headers worth keeping in the cache. Cookies are deliberately left out: a cached response must never hand
+# one visitor's session or CSRF cookie to another.
+CACHED_HEADERS = ("Content-Type", "Content-Language", "Vary")
+
+
+def cache_page_by_tags(
+    get_tags: Callable[..., list[str]],
+    timeout: int = DEFAULT_TAGGED_CACHE_SECONDS,
+    per_user: bool = False,
+) -> Callable[[ViewFunction], ViewFunction]:
+    """
+    Caches the successful GET responses of a view until one of its tags is invalidated.
+
+    get_tags is called with the view's arguments and returns the tags the page depends on. By default only anonymous
+    visitors are served from the cache, since logged-in users may see forms and their own name. With per_user, each
+    user gets their own entry instead; it is also keyed on their CSRF cookie so cached forms keep working after the
+    cookie rotates, e.g. on login.
+    """
+
+    def decorator(view: ViewFunction) -> ViewFunction:
+        @functools.wraps(view)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            if per_user:
+                if not request.user.is_authenticated:
+                    return view(request, *args, **kwargs)
+                audience = f"user:{request.user.pk}:{request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')}"
+            elif request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            else:
+                audience = "anonymous"
+
+            name = f"view:{view.__module__}.{view.__name__}:{audience}:{request.get_full_path()}"
+            key = tagged_key(name, get_tags(request, *args, **kwargs))
+            cached = cache.get(key)
+            if cached is not None:
+                status, headers, content = cached
+                response = HttpResponse(content, status=status)
+                for header, value in headers.items():
+                    response.headers[header] = value
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                headers = {
+                    header: response.headers[header]
+                    for header in CACHED_HEADERS
+                    if header in response.headers
+                }
+                cache.set(
+                    key, (response.status_code, headers, response.content), timeout
+                )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,57 @@
+from typing import Any
+
+from django import template
+from django.template.base import FilterExpression, NodeList, Parser, Token
+from django.template.context import Context
+from django.utils.safestring import SafeString, mark_safe
+
+from ..cache import get_or_set
+
+register = template.Library()
+
+
+class TaggedCacheNode(template.Node):
+    def __init__(
+        self, nodelist: NodeList, name: FilterExpression, tags: list[FilterExpression]
+    ):
+        self.nodelist = nodelist
+        self.name = name
+        self.tags = tags
+
+    def render(self, context: Context) -> SafeString:
+        name = str(self.name.resolve(context))
+        tags: list[str] = []
+        for expression in self.tags:
+            value = expression.resolve(context)
+            if isinstance(value, (list, tuple)):
+                tags.extend(str(tag) for tag in value)
+            else:
+                tags.append(str(value))
+        # The fragment was rendered (and escaped) before it was cached, so it is as safe as it was then.
+        return mark_safe(
+            get_or_set(f"fragment:{name}", tags, lambda: self.nodelist.render(context))
+        )
+
+
+@register.tag("tagged_cache")
+def do_tagged_cache(parser: Parser, token: Token) -> Any:
+    """
+    Caches a template fragment until one of its tags is invalidated:
+
+        {% tagged_cache "best-of-lists" "music:list" more_tags %} ... {% endtagged_cache %}
+
+    The first argument names the fragment and the rest are its tags, each a string or a list of strings. Tags are part
+    of the cache key, so anything else the fragment varies on has to be in its name or tags.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' takes a fragment name and at least one tag."
+        )
+    nodelist = parser.parse(("endtagged_cache",))
+    parser.delete_first_token()
+    return TaggedCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -0,0 +1,167 @@
+"""Unit tests for the tag-invalidated cache, view decorator and template tag."""
+
+import warnings
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+
+from .cache import get_or_set, invalidate_tags
+from .decorators import cache_page_by_tags
+
+
+class TaggedCacheTests(TestCase):
+    """Tests for storing entries and invalidating them by tag."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        """Counts how often an entry had to be computed."""
+        self.calls += 1
+        return f"value {self.calls}"
+
+    def test_entry_is_computed_once(self):
+        """Test that a second read is served from the cache."""
+        self.assertEqual(get_or_set("entry", ["a"], self.compute), "value 1")
+        self.assertEqual(get_or_set("entry", ["a"], self.compute), "value 1")
+        self.assertEqual(self.calls, 1)
+
+    def test_invalidating_a_tag_recomputes_its_entries(self):
+        """Test that an entry is recomputed after any one of its tags is invalidated."""
+        get_or_set("entry", ["a", "b"], self.compute)
+        invalidate_tags("b")
+        self.assertEqual(get_or_set("entry", ["a", "b"], self.compute), "value 2")
+
+    def test_other_tags_are_unaffected(self):
+        """Test that invalidating one tag leaves entries without it alone."""
+        get_or_set("entry", ["a"], self.compute)
+        invalidate_tags("b")
+        get_or_set("entry", ["a"], self.compute)
+        self.assertEqual(self.calls, 1)
+
+    def test_tags_are_part_of_the_key(self):
+        """Test that the same name with different tags is a different entry."""
+        get_or_set("album page", ["album:1"], self.compute)
+        self.assertEqual(get_or_set("album page", ["album:2"], self.compute), "value 2")
+
+    def test_cached_none_is_a_hit(self):
+        """Test that None is cached like any other value."""
+        get_or_set("entry", ["a"], lambda: None)
+        self.assertIsNone(get_or_set("entry", ["a"], self.compute))
+        self.assertEqual(self.calls, 0)
+
+    def test_tags_with_spaces_make_valid_keys(self):
+        """Test that tags memcached couldn't store as keys are still usable."""
+        tag = "best of:Top Albums of 2024"
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", CacheKeyWarning)
+            get_or_set("entry", [tag], self.compute)
+            invalidate_tags(tag)
+            self.assertEqual(get_or_set("entry", [tag], self.compute), "value 2")
+
+
+class CachePageByTagsTests(TestCase):
+    """Tests for the cache_page_by_tags view decorator."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for all tests in this class."""
+        cls.user = User.objects.create_user(username="reader", password="pw")
+        cls.other_user = User.objects.create_user(username="other", password="pw")
+
+    def setUp(self):
+        """Start every test with an empty cache and a view that counts its renders."""
+        cache.clear()
+        self.renders = 0
+        self.status = 200
+
+        def view(request, page_id):
+            self.renders += 1
+            return HttpResponse(
+                f"page {page_id}, render {self.renders}", status=self.status
+            )
+
+        self.view = view
+
+    def get(self, view, user=None, method="get", page_id=1):
+        """Calls a view as the given user (anonymous by default)."""
+        request = getattr(RequestFactory(), method)("/page")
+        request.user = user or AnonymousUser()
+        return view(request, page_id=page_id)
+
+    def tags(self, request, page_id):
+        """Tags each page with its id."""
+        return [f"page:{page_id}"]
+
+    def test_anonymous_responses_are_cached_until_invalidated(self):
+        """Test that anonymous visitors share one cached render per page."""
+        view = cache_page_by_tags(self.tags)(self.view)
+        self.get(view)
+        response = self.get(view)
+        self.assertEqual(response.content, b"page 1, render 1")
+        invalidate_tags("page:1")
+        self.assertEqual(self.get(view).content, b"page 1, render 2")
+
+    def test_logged_in_users_bypass_the_cache(self):
+        """Test that logged-in users always get a fresh render by default."""
+        view = cache_page_by_tags(self.tags)(self.view)
+        self.get(view, user=self.user)
+        self.get(view, user=self.user)
+        self.assertEqual(self.renders, 2)
+
+    def test_per_user_entries(self):
+        """Test that with per_user, each user gets their own cached render."""
+        view = cache_page_by_tags(self.tags, per_user=True)(self.view)
+        self.get(view, user=self.user)
+        self.assertEqual(self.get(view, user=self.user).content, b"page 1, render 1")
+        self.assertEqual(
+            self.get(view, user=self.other_user).content, b"page 1, render 2"
+        )
+
+    def test_errors_and_posts_are_not_cached(self):
+        """Test that only successful GET responses are cached."""
+        view = cache_page_by_tags(self.tags)(self.view)
+        self.status = 404
+        self.get(view)
+        self.get(view)
+        self.get(view, method="post")
+        self.assertEqual(self.renders, 3)
+
+
+class TaggedCacheTemplateTagTests(TestCase):
+    """Tests for the {% tagged_cache %} template tag."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def render(self, **context):
+        """Renders a fragment tagged with album:<id> and any extra tags."""
+        template = Template(
+            "{% load tagged_cache %}"
+            '{% tagged_cache "fragment" album_tag extra_tags %}{{ value }}{% endtagged_cache %}'
+        )
+        context.setdefault("extra_tags", [])
+        return template.render(Context(context))
+
+    def test_fragment_is_cached_until_invalidated(self):
+        """Test that a fragment renders once, and again after its tag is invalidated."""
+        self.assertEqual(self.render(album_tag="album:1", value="one"), "one")
+        self.assertEqual(self.render(album_tag="album:1", value="two"), "one")
+        invalidate_tags("album:1")
+        self.assertEqual(self.render(album_tag="album:1", value="two"), "two")
+
+    def test_list_of_tags(self):
+        """Test that tags can be given as a list."""
+        self.render(album_tag="album:1", extra_tags=["music:list"], value="one")
+        invalidate_tags("music:list")
+        self.assertEqual(
+            self.render(album_tag="album:1", extra_tags=["music:list"], value="two"),
+            "two",
+        )
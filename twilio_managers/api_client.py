@@ -6,8 +6,7 @@ import abc
 import os
 from typing import Any
 
-import requests
-
+from http_clients import clients
 from twilio_managers import platform_info
 
 
@@ -33,11 +32,13 @@ class RestApiClient:
         resource: str,
         request_type: str = "get",
         payload: dict[str, Any] | None = None,
-        timeout: int = 10,
+        timeout: float | None = None,
         **kwargs: Any,
     ) -> dict[str, Any]:
         """
         Makes a request to the resource (example: sms/webhook) with the specified request_type and payload dict.
+
+        Requests go through the process's shared keep-alive session. timeout defaults to API_READ_TIMEOUT_SECONDS.
         """
         if payload is None:
             payload = {}
@@ -46,10 +47,10 @@ class RestApiClient:
         if url[-1] != "/":
             url += "/"
 
-        client_method = getattr(requests, request_type)
-        response = client_method(
-            url, auth=self.get_auth(), json=payload, timeout=timeout, **kwargs
-        )
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        client_method = getattr(clients.get_api_session(), request_type)
+        response = client_method(url, auth=self.get_auth(), json=payload, **kwargs)
         response.raise_for_status()
         response_dict = response.json()
 
@@ -13,6 +13,7 @@ from datetime import timedelta
 from anthropic import Anthropic
 from twilio.rest import Client as TwilioClient
 
+from http_clients import clients
 from twilio_managers.api_client import TwilioManagerApiClient
 from twilio_managers.daily_goals_app_types import DailyCheckin, User
 from twilio_managers.platform_info import install_environment_variables
@@ -166,10 +167,10 @@ def run_cycle() -> None:
     account_sid = os.environ["TWILIO_ACCOUNT_SID"]
     auth_token = os.environ["TWILIO_AUTH_TOKEN"]
     twilio_phone_number = os.environ["TWILIO_DAILY_GOALS_APP_PHONE_NUMBER"]
-    twilio_client = TwilioClient(account_sid, auth_token)
+    twilio_client = clients.get_twilio_client(account_sid, auth_token)
 
     api_client = TwilioManagerApiClient()
-    anthropic_client = Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
+    anthropic_client = clients.get_anthropic_client()
     serialized_users = api_client.invoke("daily_goals/users")
     users = [User(**serialized_user) for serialized_user in serialized_users["users"]]
 
@@ -188,8 +189,11 @@ def run_cycle() -> None:
                 # One bad user shouldn't break things for everyone.
                 logging.error(f"User {user.id} couldn't be processed: {repr(e)}")
 
+    clients.log_connection_stats()
+
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     install_environment_variables()
     while True:
         try:
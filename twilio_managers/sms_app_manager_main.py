@@ -13,6 +13,7 @@ from datetime import datetime, timedelta, timezone
 import pytz
 from twilio.rest import Client as TwilioClient
 
+from http_clients import clients
 from twilio_managers.api_client import TwilioManagerApiClient
 from twilio_managers.platform_info import install_environment_variables
 from twilio_managers.sms_app_types import User
@@ -80,7 +81,7 @@ def run_cycle() -> None:
     account_sid = os.environ["TWILIO_ACCOUNT_SID"]
     auth_token = os.environ["TWILIO_AUTH_TOKEN"]
     twilio_phone_number = os.environ["TWILIO_SMS_APP_PHONE_NUMBER"]
-    twilio_client = TwilioClient(account_sid, auth_token)
+    twilio_client = clients.get_twilio_client(account_sid, auth_token)
 
     api_client = TwilioManagerApiClient()
     serialized_users = api_client.invoke("sms/users")
@@ -99,8 +100,11 @@ def run_cycle() -> None:
                 # One bad user shouldn't break things for everyone.
                 logging.error(f"User {user.id} couldn't be processed: {repr(e)}")
 
+    clients.log_connection_stats()
+
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     install_environment_variables()
     while True:
         try:
@@ -13,18 +13,37 @@ INSTALLED_APPS = [
     "prayer.apps.PrayerConfig",
     "daily_goals.apps.DailyGoalsConfig",
     "food_tracking.apps.FoodTrackingConfig",
+    "responsive_images.apps.ResponsiveImagesConfig",
+    "content_store.apps.ContentStoreConfig",
+    "tagged_cache.apps.TaggedCacheConfig",
+    "request_profiling.apps.RequestProfilingConfig",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    # Trigram lookups for the food library search.
+    "django.contrib.postgres",
     "django_extensions",
     "phonenumber_field",
     "rest_framework",
 ]
 
+# A per-process cache by default. prod.py switches to a file-based cache that every gunicorn worker shares, and
+# CACHE_BACKEND/CACHE_LOCATION select another backend, e.g. a local memcached or Redis:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
 MIDDLEWARE = [
+    "request_profiling.middleware.QueryProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,6 +53,33 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# The fraction of requests whose SQL is counted and timed (see request_profiling), and how slow a sampled request has to
+# be to land in the slow-request log. prod.py samples a share of requests by default and local.py samples all of them.
+REQUEST_PROFILING_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_PROFILING_SAMPLE_RATE", "0")
+)
+REQUEST_PROFILING_SLOW_MS = float(os.environ.get("REQUEST_PROFILING_SLOW_MS", "500"))
+
+# The slow-request log and the HTTP clients' connection counts go to stderr, which gunicorn and systemd hand to the
+# journal.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "request_profiling.slow": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+        "http_clients": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.BasicAuthentication",
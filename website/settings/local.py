@@ -2,6 +2,9 @@ from .base import *
 
 DEBUG = True
 ALLOWED_HOSTS = ["*"]
+REQUEST_PROFILING_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_PROFILING_SAMPLE_RATE", "1.0")
+)
 
 DATABASES = {
     "default": {
@@ -33,6 +33,19 @@ SECURE_HSTS_PRELOAD = True
 ADMINS = [("Paul", "vpcarroll15@" + "gmail.com")]
 MANAGERS = [("Paul", "vpcarroll15@" + "gmail.com")]
 
+# Tag invalidations (see tagged_cache) have to reach every gunicorn worker, so prod never uses the per-process cache.
+if "CACHE_BACKEND" not in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(BASE_DIR, "cache"),
+        }
+    }
+
+REQUEST_PROFILING_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_PROFILING_SAMPLE_RATE", "0.1")
+)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",